@@ -0,0 +1,65 @@
+"""
+CPU time per track of the audio post-processing under each output profile: a
+stream copy (AAC into m4a, Opus kept as Opus) against a transcode to AAC.
+Needs ffmpeg on PATH to generate the source files.
+
+    python -m benchmarks.bench_audio_profiles
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from src.core.engine import transcode_track
+
+TRACKS = 5
+SECONDS = 180
+
+# (label, profile, source codec args, source container, yt-dlp acodec)
+CASES = [
+    ('aac -> m4a', 'm4a', ['-c:a', 'aac', '-b:a', '128k'], 'm4a', 'mp4a.40.2'),
+    ('opus -> opus', 'opus', ['-c:a', 'libopus', '-b:a', '128k'], 'webm', 'opus'),
+    ('opus -> aac', 'transcode', ['-c:a', 'libopus', '-b:a', '128k'], 'webm', 'opus'),
+]
+
+
+def make_source(path, codec_args):
+    subprocess.run(
+        ['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', f'sine=frequency=440:duration={SECONDS}',
+         *codec_args, path],
+        check=True,
+    )
+
+
+def main():
+    if shutil.which('ffmpeg') is None:
+        print("ffmpeg not found; install it to run this benchmark")
+        return
+    print(f"{TRACKS} tracks of {SECONDS}s per profile")
+    print(f"{'case':>14} | {'copy':>5} {'cpu s/track':>12} {'wall s/track':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, profile, codec_args, ext, acodec in CASES:
+            source = os.path.join(tmp, f"source.{ext}")
+            make_source(source, codec_args)
+            cpu = wall = 0.0
+            copied = True
+            for i in range(TRACKS):
+                # ExtractAudio deletes its input, so each run gets a fresh copy
+                path = os.path.join(tmp, f"{profile}-{i}.{ext}")
+                shutil.copyfile(source, path)
+                start = time.perf_counter()
+                filepath, output, audio = transcode_track(
+                    {'filepath': path, 'ext': ext, 'acodec': acodec, 'title': f'Track {i}'}, profile)
+                wall += time.perf_counter() - start
+                if filepath is None:
+                    print(output)
+                    return
+                cpu += audio['cpu_seconds']
+                copied = copied and audio['copy']
+                os.remove(filepath)
+            print(f"{label:>14} | {str(copied):>5} {cpu / TRACKS:>12.3f} {wall / TRACKS:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
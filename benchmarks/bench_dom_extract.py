@@ -0,0 +1,113 @@
+"""
+Counts WebDriver round trips and wall time for album/search/popup extraction,
+per-element (previous scraper code) versus the bulk execute_script layer,
+against the saved HTML fixtures in benchmarks/fixtures loaded from file://.
+
+Needs Chromium and chromedriver (run inside the Docker image):
+
+    python -m benchmarks.bench_dom_extract
+"""
+import os
+import time
+
+from selenium.webdriver.common.by import By
+
+from src.core.dom_extract import (
+    extract_grid_items, album_urls_from_items, extract_search_results, pick_search_result, POPUP_WORDS,
+)
+from src.core.scraper import MusicScraper
+from src.core.scraper_pool import resolve_driver_path
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class RoundTripCounter:
+    """Wraps driver.execute, which every WebDriver command (including WebElement calls) goes through."""
+
+    def __init__(self, driver):
+        self.count = 0
+        self._execute = driver.execute
+        driver.execute = self._counting_execute
+
+    def _counting_execute(self, *args, **kwargs):
+        self.count += 1
+        return self._execute(*args, **kwargs)
+
+
+def legacy_album_urls(driver):
+    urls = set()
+    for item in driver.find_elements(By.TAG_NAME, "ytmusic-two-row-item-renderer"):
+        for link in item.find_elements(By.TAG_NAME, "a"):
+            href = link.get_attribute("href")
+            if href and ("browse/MPREb" in href or "playlist?list=OL" in href):
+                urls.add(href)
+    return urls
+
+
+def bulk_album_urls(driver):
+    return set(album_urls_from_items(extract_grid_items(driver)))
+
+
+def legacy_popup_scan(driver):
+    return [btn for btn in driver.find_elements(By.TAG_NAME, "button") if any(w in btn.text.lower() for w in POPUP_WORDS)]
+
+
+def bulk_popup_scan(driver):
+    # Same matching as click_popups, without clicking so both variants do identical work
+    return driver.execute_script(
+        "return Array.from(document.querySelectorAll('button')).filter("
+        "(b) => arguments[0].some((w) => (b.innerText || '').toLowerCase().includes(w)));",
+        list(POPUP_WORDS),
+    )
+
+
+def legacy_search(driver):
+    album_url = song_url = None
+    for shelf in driver.find_elements(By.TAG_NAME, "ytmusic-shelf-renderer"):
+        title = shelf.find_element(By.CSS_SELECTOR, "h2.title yt-formatted-string").text.strip().lower()
+        items = shelf.find_elements(By.TAG_NAME, "ytmusic-responsive-list-item-renderer")
+        if not items:
+            continue
+        for link in items[0].find_elements(By.TAG_NAME, "a"):
+            href = link.get_attribute("href")
+            if "albums" in title and href and "browse" in href:
+                album_url = album_url or href
+            if "songs" in title and href and "watch" in href:
+                song_url = song_url or href
+    return (album_url, 'album') if album_url else (song_url, 'song')
+
+
+def bulk_search(driver):
+    return pick_search_result(extract_search_results(driver))
+
+
+CASES = [
+    ("album links", "artist_albums.html", legacy_album_urls, bulk_album_urls),
+    ("popup scan", "artist_albums.html", legacy_popup_scan, bulk_popup_scan),
+    ("search pick", "search_results.html", legacy_search, bulk_search),
+]
+
+
+def main():
+    scraper = MusicScraper(headless=True, driver_path=resolve_driver_path())
+    driver = scraper.driver
+    counter = RoundTripCounter(driver)
+    try:
+        print(f"{'case':>12} | {'legacy trips':>12} {'legacy ms':>10} | {'bulk trips':>10} {'bulk ms':>8} | {'same result':>11}")
+        for name, fixture, legacy, bulk in CASES:
+            driver.get("file://" + os.path.join(FIXTURES, fixture))
+            results = []
+            for fn in (legacy, bulk):
+                counter.count = 0
+                start = time.perf_counter()
+                result = fn(driver)
+                results.append((counter.count, (time.perf_counter() - start) * 1e3, result))
+            (l_trips, l_ms, l_res), (b_trips, b_ms, b_res) = results
+            same = (len(l_res) == len(b_res)) if isinstance(l_res, list) else l_res == b_res
+            print(f"{name:>12} | {l_trips:>12} {l_ms:>10.1f} | {b_trips:>10} {b_ms:>8.1f} | {str(same):>11}")
+    finally:
+        scraper.close()
+
+
+if __name__ == "__main__":
+    main()
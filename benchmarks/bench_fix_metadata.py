@@ -0,0 +1,73 @@
+"""
+Per-file cost of fix_metadata over synthetic mp3/m4a files, split into opening
+the file, planning the tag fixes and the whole call (which saves dirty files),
+plus the cost of normalizing names with and without the memo.
+
+    python -m benchmarks.bench_fix_metadata
+"""
+import io
+import os
+import shutil
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from src.core.downloader import fix_metadata, open_easy, plan_tag_fixes
+from src.core.normalize import normalize_name, normalize_string
+from tests.helpers import write_m4a, write_mp3
+
+FILES = 200
+NAMES = ["Oğuz Aksaç", "Şebnem Ferah", "Sezen Aksu", "Tarkan", "Barış Manço", "MFÖ"]
+CLEAN = {"artist": ["Oğuz Aksaç"], "album": ["Album"], "albumartist": ["Oğuz Aksaç"]}
+DIRTY = {"artist": ["Oguz Aksac, Oğuz Aksaç, Sezen Aksu"], "album": [" Album "]}
+
+def make_files(directory, ext, tags):
+    paths = []
+    for i in range(FILES):
+        path = os.path.join(directory, f"{i}.{ext}")
+        if ext == 'mp3':
+            write_mp3(path, frames=400, **tags)
+        else:
+            write_m4a(path, b'\x00' * 160_000, **tags)
+        paths.append(path)
+    return paths
+
+
+def per_file(func, paths):
+    start = time.perf_counter()
+    for path in paths:
+        func(path)
+    return (time.perf_counter() - start) / len(paths)
+
+
+def main():
+    print(f"{'format':>6} {'tags':>6} | {'open ms':>8} {'plan us':>8} {'fix ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext in ('mp3', 'm4a'):
+            for label, tags in (('clean', CLEAN), ('dirty', DIRTY)):
+                directory = os.path.join(tmp, f"{ext}-{label}")
+                os.makedirs(directory)
+                paths = make_files(directory, ext, tags)
+                opened = [open_easy(path) for path in paths]
+                t_open = per_file(open_easy, paths)
+                t_plan = per_file(lambda audio: plan_tag_fixes(audio, "Oğuz Aksaç"), opened)
+                with redirect_stdout(io.StringIO()):
+                    t_fix = per_file(lambda path: fix_metadata(path, "Oğuz Aksaç"), paths)
+                print(f"{ext:>6} {label:>6} | {t_open * 1e3:>8.3f} {t_plan * 1e6:>8.1f} {t_fix * 1e3:>8.3f}")
+                shutil.rmtree(directory)
+
+    rounds = 20_000
+    names = [NAMES[i % len(NAMES)] for i in range(rounds)]
+    start = time.perf_counter()
+    for name in names:
+        normalize_string(name)
+    t_plain = (time.perf_counter() - start) / rounds
+    start = time.perf_counter()
+    for name in names:
+        normalize_name(name)
+    t_memo = (time.perf_counter() - start) / rounds
+    print(f"normalize_string {t_plain * 1e6:.2f} us/name, normalize_name (memoized) {t_memo * 1e6:.2f} us/name")
+
+
+if __name__ == "__main__":
+    main()
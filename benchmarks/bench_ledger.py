@@ -0,0 +1,71 @@
+"""
+Compares archive lookup cost of the SQLite ledger against yt-dlp's text archive
+as the number of recorded tracks grows.
+
+    python -m benchmarks.bench_ledger
+"""
+import os
+import random
+import string
+import tempfile
+import time
+
+from src.core.ledger import DownloadLedger
+
+SIZES = [1_000, 10_000, 100_000]
+LOOKUPS = 2_000
+
+
+def random_id():
+    return "".join(random.choices(string.ascii_letters + string.digits, k=11))
+
+
+def bench_text_archive(path, ids):
+    # yt-dlp re-reads the whole archive into a set every time a YoutubeDL starts (once per album)
+    start = time.perf_counter()
+    archive = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            archive.add(line.strip())
+    load = time.perf_counter() - start
+    start = time.perf_counter()
+    for vid in ids:
+        f"youtube {vid}" in archive
+    lookup = (time.perf_counter() - start) / len(ids)
+    return load, lookup
+
+
+def bench_ledger(path, ids):
+    start = time.perf_counter()
+    ledger = DownloadLedger(path)
+    ledger.conn
+    load = time.perf_counter() - start
+    start = time.perf_counter()
+    for vid in ids:
+        f"youtube {vid}" in ledger
+    lookup = (time.perf_counter() - start) / len(ids)
+    ledger.close()
+    return load, lookup
+
+
+def main():
+    random.seed(0)
+    print(f"{'entries':>10} | {'text open ms':>12} {'text lookup us':>14} | {'ledger open ms':>14} {'ledger lookup us':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            ids = [random_id() for _ in range(size)]
+            text_path = os.path.join(tmp, f"archive_{size}.txt")
+            with open(text_path, "w", encoding="utf-8") as f:
+                f.writelines(f"youtube {vid}\n" for vid in ids)
+            ledger_path = os.path.join(tmp, f"ledger_{size}.db")
+            DownloadLedger(ledger_path).import_text_archive(text_path)
+
+            # Half hits, half misses
+            probe = random.sample(ids, LOOKUPS // 2) + [random_id() for _ in range(LOOKUPS // 2)]
+            t_load, t_lookup = bench_text_archive(text_path, probe)
+            l_load, l_lookup = bench_ledger(ledger_path, probe)
+            print(f"{size:>10} | {t_load * 1e3:>12.2f} {t_lookup * 1e6:>14.2f} | {l_load * 1e3:>14.2f} {l_lookup * 1e6:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Measures IPC messages and CPU per MB of yt-dlp-style output for the old
+per-write LogCapture versus the batching LogTransport.
+
+    python -m benchmarks.bench_log_transport
+"""
+import io
+import multiprocessing
+import resource
+import time
+
+from src.core.log_transport import LogTransport
+
+TRACKS = 200
+PROGRESS_UPDATES = 300
+
+
+class LegacyLogCapture:
+    """The previous job_manager.LogCapture: one queue.put and one flush per write."""
+
+    def __init__(self, queue, original_stream=None):
+        self.queue = queue
+        self.original_stream = original_stream
+
+    def write(self, msg):
+        if msg.strip():
+            self.queue.put(msg)
+        if self.original_stream:
+            self.original_stream.write(msg)
+            self.original_stream.flush()
+
+    def flush(self):
+        if self.original_stream:
+            self.original_stream.flush()
+
+
+def ytdlp_output():
+    """Yields write() calls shaped like yt-dlp's output for an album."""
+    for track in range(TRACKS):
+        yield f"[youtube] Extracting URL: https://music.youtube.com/watch?v=track{track:05d}\n"
+        yield f"[youtube] track{track:05d}: Downloading webpage\n"
+        yield f"[info] track{track:05d}: Downloading 1 format(s): 251\n"
+        yield f"[download] Destination: music/Artist/Album/Track {track}.webm\n"
+        for i in range(PROGRESS_UPDATES):
+            pct = 100.0 * i / PROGRESS_UPDATES
+            yield f"\r[download] {pct:5.1f}% of    4.21MiB at    2.35MiB/s ETA 00:01"
+        yield "\r[download] 100% of    4.21MiB in 00:00:02 at 2.01MiB/s\n"
+        yield f'[ExtractAudio] Destination: music/Artist/Album/Track {track}.m4a\n'
+
+
+def consume(queue, conn):
+    messages = 0
+    while True:
+        msg = queue.get()
+        if msg is None:
+            break
+        messages += 1
+    conn.send(messages)
+
+
+def run(make_writer):
+    queue = multiprocessing.Queue()
+    parent, child = multiprocessing.Pipe()
+    consumer = multiprocessing.Process(target=consume, args=(queue, child))
+    consumer.start()
+
+    sink = io.StringIO()
+    writer, finish = make_writer(queue, sink)
+    total_bytes = 0
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    for chunk in ytdlp_output():
+        total_bytes += len(chunk)
+        writer.write(chunk)
+    finish()
+    queue.put(None)
+    queue.close()
+    queue.join_thread()
+    producer_cpu = time.process_time() - start_cpu
+
+    messages = parent.recv()
+    consumer.join()
+    consumer_cpu = resource.getrusage(resource.RUSAGE_CHILDREN)
+    wall = time.perf_counter() - start
+    return total_bytes, messages, producer_cpu, consumer_cpu.ru_utime + consumer_cpu.ru_stime, wall
+
+
+def legacy(queue, sink):
+    return LegacyLogCapture(queue, sink), lambda: None
+
+
+def batched(queue, sink):
+    transport = LogTransport(queue)
+    return transport.stream(sink), transport.close
+
+
+def main():
+    print(f"{'transport':>10} | {'MB':>6} {'messages':>9} {'msg/MB':>9} {'producer cpu s/MB':>18} {'consumer cpu s':>15} {'wall s':>7}")
+    baseline_children = 0.0
+    for name, factory in [("legacy", legacy), ("batched", batched)]:
+        size, messages, prod_cpu, children_cpu, wall = run(factory)
+        # RUSAGE_CHILDREN is cumulative, report the delta for this run
+        cons_cpu = children_cpu - baseline_children
+        baseline_children = children_cpu
+        mb = size / 1e6
+        print(f"{name:>10} | {mb:>6.2f} {messages:>9} {messages / mb:>9.0f} {prod_cpu / mb:>18.3f} {cons_cpu:>15.3f} {wall:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
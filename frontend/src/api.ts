@@ -17,6 +17,7 @@ export interface FileNode {
     type: 'directory' | 'file';
     path: string;
     size: number;
+    mtime: number;
 }
 
 export const searchDownload = async (query: string, songLimit?: number) => {
@@ -37,8 +38,29 @@ export const scanLibrary = async () => {
     return api.post('/library/scan');
 };
 
-export const fetchFiles = async (path: string = ''): Promise<FileNode[]> => {
-    const response = await api.get('/library/files', { params: { path } });
+export interface FilePage {
+    path: string;
+    items: FileNode[];
+    next_cursor: string | null;
+    total: number;
+}
+
+export type FileSort = 'name' | '-name' | 'size' | '-size' | 'mtime' | '-mtime';
+
+export const fetchFilePage = async (path: string = '', cursor?: string, limit: number = 500, sort: FileSort = 'name'): Promise<FilePage> => {
+    const response = await api.get('/library/files', { params: { path, cursor, limit, sort } });
+    return response.data;
+};
+
+export interface JobLogPage {
+    offset: number;
+    next_offset: number;
+    total: number;
+    lines: string[];
+}
+
+export const fetchJobLogs = async (jobId: string, offset: number = 0, limit: number = 500): Promise<JobLogPage> => {
+    const response = await api.get(`/jobs/${jobId}/logs`, { params: { offset, limit } });
     return response.data;
 };
 
@@ -1,7 +1,10 @@
-import React, { useEffect, useState } from 'react';
-import { fetchFiles, type FileNode } from '../api';
+import React, { useEffect, useRef, useState } from 'react';
+import { fetchFilePage, type FileNode } from '../api';
 import { X, Folder, FileMusic, ChevronRight, CornerLeftUp, Loader2 } from 'lucide-react';
 
+// Entries fetched per request; later pages load as the list is scrolled
+const PAGE_SIZE = 200;
+
 interface FileBrowserModalProps {
     isOpen: boolean;
     onClose: () => void;
@@ -11,8 +14,15 @@ export const FileBrowserModal: React.FC<FileBrowserModalProps> = ({ isOpen, onCl
     const [path, setPath] = useState('');
     const [history, setHistory] = useState<string[]>([]);
     const [files, setFiles] = useState<FileNode[]>([]);
+    const [total, setTotal] = useState(0);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [loading, setLoading] = useState(false);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [error, setError] = useState<string | null>(null);
+    // Bumped on every navigation so pages of a folder we already left are dropped
+    const requestId = useRef(0);
+    // Scroll events fire faster than state updates; this keeps one page request in flight
+    const fetchingMore = useRef(false);
 
     useEffect(() => {
         if (isOpen) {
@@ -21,16 +31,50 @@ export const FileBrowserModal: React.FC<FileBrowserModalProps> = ({ isOpen, onCl
     }, [isOpen, path]);
 
     const loadFiles = async (currentPath: string) => {
+        const id = ++requestId.current;
         setLoading(true);
+        setLoadingMore(false);
         setError(null);
         try {
-            const data = await fetchFiles(currentPath);
-            setFiles(data);
+            const page = await fetchFilePage(currentPath, undefined, PAGE_SIZE);
+            if (id !== requestId.current) return;
+            setFiles(page.items);
+            setTotal(page.total);
+            setNextCursor(page.next_cursor);
+        } catch (err) {
+            if (id !== requestId.current) return;
+            console.error(err);
+            setError('Failed to load directory contents.');
+        } finally {
+            if (id === requestId.current) setLoading(false);
+        }
+    };
+
+    const loadMore = async () => {
+        if (!nextCursor || loading || fetchingMore.current) return;
+        const id = requestId.current;
+        fetchingMore.current = true;
+        setLoadingMore(true);
+        try {
+            const page = await fetchFilePage(path, nextCursor, PAGE_SIZE);
+            if (id !== requestId.current) return;
+            setFiles((prev) => [...prev, ...page.items]);
+            setTotal(page.total);
+            setNextCursor(page.next_cursor);
         } catch (err) {
+            if (id !== requestId.current) return;
             console.error(err);
             setError('Failed to load directory contents.');
         } finally {
-            setLoading(false);
+            fetchingMore.current = false;
+            if (id === requestId.current) setLoadingMore(false);
+        }
+    };
+
+    const handleScroll = (e: React.UIEvent<HTMLDivElement>) => {
+        const el = e.currentTarget;
+        if (el.scrollHeight - el.scrollTop - el.clientHeight < 200) {
+            loadMore();
         }
     };
 
@@ -80,7 +124,7 @@ export const FileBrowserModal: React.FC<FileBrowserModalProps> = ({ isOpen, onCl
                 </div>
 
                 {/* Content */}
-                <div className="flex-1 overflow-auto p-2 bg-gray-950/50">
+                <div className="flex-1 overflow-auto p-2 bg-gray-950/50" onScroll={handleScroll}>
                     {loading ? (
                         <div className="flex flex-col items-center justify-center h-full text-gray-400">
                             <Loader2 className="w-8 h-8 animate-spin mb-2" />
@@ -124,6 +168,15 @@ export const FileBrowserModal: React.FC<FileBrowserModalProps> = ({ isOpen, onCl
                                     )}
                                 </div>
                             ))}
+                            {nextCursor && (
+                                <button
+                                    onClick={loadMore}
+                                    disabled={loadingMore}
+                                    className="col-span-full flex items-center justify-center gap-2 p-2 text-sm text-gray-400 hover:text-white hover:bg-gray-800 rounded transition-colors">
+                                    {loadingMore && <Loader2 className="w-4 h-4 animate-spin" />}
+                                    Load more ({files.length} of {total})
+                                </button>
+                            )}
                         </div>
                     )}
                 </div>
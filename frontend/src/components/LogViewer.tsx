@@ -1,6 +1,8 @@
 import React, { useEffect, useRef, useState } from 'react';
 import { X, Loader2 } from 'lucide-react';
 
+const LOG_TAIL_LINES = 2000;
+
 interface LogViewerProps {
     jobId: string;
     isOpen: boolean;
@@ -25,7 +27,8 @@ export const LogViewer: React.FC<LogViewerProps> = ({ jobId, isOpen, onClose })
         // const port = '8001'; 
         // Logic should match API base URL logic. 
         // In api.ts we use window.location.hostname:8001
-        const wsUrl = `${protocol}//${window.location.hostname}:8001/api/v1/jobs/${jobId}/logs`;
+        // Long jobs keep older lines on disk; start from the recent tail instead of line 0
+        const wsUrl = `${protocol}//${window.location.hostname}:8001/api/v1/jobs/${jobId}/logs?tail=${LOG_TAIL_LINES}`;
 
         try {
             const ws = new WebSocket(wsUrl);
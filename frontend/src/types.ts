@@ -17,5 +17,8 @@ export interface Job {
     started_at?: number;
     completed_at?: number;
     error?: string;
+    lane?: string;
+    priority?: number;
+    log_count?: number;
     logs?: string[];
 }
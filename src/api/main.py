@@ -1,6 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .routes import downloads, library, jobs
+from src.core.scraper_pool import start_scraper_service
+from src.core.job_manager import job_manager
 
 app = FastAPI(title="YTM Downloader API", version="1.0.0")
 
@@ -17,6 +19,36 @@ app.include_router(downloads.router, prefix="/api/v1/downloads", tags=["Download
 app.include_router(library.router, prefix="/api/v1/library", tags=["Library"])
 app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["Jobs"])
 
+@app.on_event("startup")
+async def start_services():
+    # Jobs cut short by the previous shutdown show up as failed and can be resumed
+    try:
+        job_manager.enable_checkpoints()
+        recovered = job_manager.recover_interrupted()
+        if recovered:
+            print(f"Found {len(recovered)} interrupted jobs; resume them via /api/v1/jobs/{{id}}/resume.")
+    except Exception as e:
+        print(f"Warning: Could not load job checkpoints: {e}")
+
+    # Log spill files are only readable by the run that wrote them; keep them bounded
+    try:
+        job_manager.prune_logs()
+    except Exception as e:
+        print(f"Warning: Could not prune job logs: {e}")
+
+    # Warm browser sessions live in their own process and are shared by all jobs
+    try:
+        app.state.scraper_service = start_scraper_service()
+    except Exception as e:
+        print(f"Warning: Could not start scraper service: {e}")
+        app.state.scraper_service = None
+
+@app.on_event("shutdown")
+async def stop_services():
+    manager = getattr(app.state, "scraper_service", None)
+    if manager is not None:
+        manager.shutdown()
+
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
@@ -1,9 +1,14 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
+from src.core.engine import MAX_CPU_WORKERS, MAX_IO_WORKERS
 
 class SearchRequest(BaseModel):
     query: str
     song_limit: Optional[int] = None
+    priority: Optional[int] = None
+    io_workers: Optional[int] = Field(None, ge=1, le=MAX_IO_WORKERS, description="Threads downloading tracks")
+    cpu_workers: Optional[int] = Field(None, ge=1, le=MAX_CPU_WORKERS, description="Processes transcoding downloaded tracks")
+    audio_profile: Optional[str] = None
 
 class ArtistDownloadRequest(BaseModel):
     artist_url: Optional[str] = None
@@ -11,6 +16,10 @@ class ArtistDownloadRequest(BaseModel):
     limit: Optional[int] = None
     song_limit: Optional[int] = None
     max_album_length: Optional[int] = None
+    priority: Optional[int] = None
+    io_workers: Optional[int] = Field(None, ge=1, le=MAX_IO_WORKERS, description="Threads downloading tracks")
+    cpu_workers: Optional[int] = Field(None, ge=1, le=MAX_CPU_WORKERS, description="Processes transcoding downloaded tracks")
+    audio_profile: Optional[str] = None
 
 class JobResponse(BaseModel):
     message: str
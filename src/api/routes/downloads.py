@@ -1,18 +1,32 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
 from ..models.schemas import SearchRequest, ArtistDownloadRequest, JobResponse
 from src.core.downloader import download_search_query, download_artist_albums
 from src.core.job_manager import job_manager
+from src.core.scraper_pool import connect_scraper_service
+from src.core.resolution_cache import ResolutionCache, artist_key, search_key
+from src.core.rate_limiter import get_rate_limiter
+from src.core.engine import AUDIO_PROFILES
+
+def check_audio_profile(profile: Optional[str]):
+    if profile is not None and profile not in AUDIO_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown audio_profile, choose from: {', '.join(AUDIO_PROFILES)}")
 
 router = APIRouter()
 
 @router.post("/search", response_model=JobResponse)
 async def search_download(request: SearchRequest):
+    check_audio_profile(request.audio_profile)
     job_id = job_manager.create_job(
         "search", 
         request.query, 
         download_search_query, 
         request.query, 
-        request.song_limit
+        request.song_limit,
+        io_workers=request.io_workers,
+        cpu_workers=request.cpu_workers,
+        audio_profile=request.audio_profile,
+        priority=request.priority
     )
     return JobResponse(message="Search download started", job_id=job_id, status="queued")
 
@@ -20,6 +34,7 @@ async def search_download(request: SearchRequest):
 async def artist_download(request: ArtistDownloadRequest):
     if not request.artist_url and not request.artist_name:
         raise HTTPException(status_code=400, detail="Either artist_url or artist_name must be provided")
+    check_audio_profile(request.audio_profile)
     
     job_id = job_manager.create_job(
         "artist",
@@ -29,6 +44,44 @@ async def artist_download(request: ArtistDownloadRequest):
         request.artist_name,
         limit=request.limit,
         song_limit=request.song_limit,
-        max_album_length=request.max_album_length
+        max_album_length=request.max_album_length,
+        io_workers=request.io_workers,
+        cpu_workers=request.cpu_workers,
+        audio_profile=request.audio_profile,
+        priority=request.priority
     )
     return JobResponse(message="Artist download started", job_id=job_id, status="queued")
+
+@router.get("/scraper", response_model=dict)
+async def scraper_stats():
+    service = connect_scraper_service()
+    if service is None:
+        raise HTTPException(status_code=503, detail="Scraper service is not running")
+    return service.stats()
+
+@router.get("/rate-limit", response_model=dict)
+async def rate_limit_state():
+    return get_rate_limiter().state()
+
+@router.get("/cache", response_model=dict)
+async def resolution_cache_stats():
+    return ResolutionCache().stats()
+
+@router.delete("/cache", response_model=dict)
+async def invalidate_resolution_cache(
+    artist_name: Optional[str] = Query(None, description="Forget the albums resolved for this artist name"),
+    artist_url: Optional[str] = Query(None, description="Forget the albums resolved for this artist URL"),
+    query: Optional[str] = Query(None, description="Forget the result resolved for this search query"),
+):
+    """
+    Invalidates cached resolutions. Without parameters the whole cache is cleared.
+    """
+    cache = ResolutionCache()
+    removed = 0
+    if artist_name or artist_url:
+        removed += cache.invalidate("artist", artist_key(artist_url, artist_name))
+    if query:
+        removed += cache.invalidate("search", search_key(query))
+    if not (artist_name or artist_url or query):
+        removed = cache.invalidate()
+    return {"removed": removed}
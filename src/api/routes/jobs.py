@@ -1,7 +1,7 @@
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
 from typing import List, Optional
 import asyncio
-from src.core.job_manager import job_manager, JobStatus
+from src.core.job_manager import job_manager, JobStatus, TERMINAL_STATUSES
 
 router = APIRouter()
 
@@ -10,12 +10,18 @@ async def list_jobs():
     jobs = job_manager.list_jobs()
     return [job.to_dict() for job in jobs]
 
+@router.get("/scheduler", response_model=dict)
+async def scheduler_state():
+    return job_manager.scheduler_state()
+
 @router.get("/{job_id}", response_model=dict)
 async def get_job(job_id: str):
     job = job_manager.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return job.to_dict()
+    data = job.to_dict()
+    data["queue_position"] = job_manager.queue_position(job)
+    return data
 
 @router.post("/{job_id}/cancel", response_model=dict)
 async def cancel_job(job_id: str):
@@ -24,8 +30,52 @@ async def cancel_job(job_id: str):
         raise HTTPException(status_code=400, detail="Job could not be cancelled or not found")
     return {"message": "Job cancelled"}
 
+@router.post("/{job_id}/resume", response_model=dict)
+async def resume_job(job_id: str):
+    job = job_manager.get_job(job_id)
+    if job and job.status not in (JobStatus.FAILED, JobStatus.CANCELLED):
+        raise HTTPException(status_code=400, detail=f"Job is {job.status.value}, only failed or cancelled jobs can be resumed")
+    job = job_manager.resume_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or could not be restored")
+    return {"message": "Job resumed", "job_id": job.id, "status": job.status}
+
+@router.get("/{job_id}/checkpoint", response_model=dict)
+async def get_job_checkpoint(job_id: str):
+    if job_manager.store is None:
+        raise HTTPException(status_code=404, detail="Checkpoints are not enabled")
+    if not job_manager.get_job(job_id) and not job_manager.store.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_manager.store.summary(job_id)
+
+@router.get("/{job_id}/logs", response_model=dict)
+async def get_job_logs(
+    job_id: str,
+    offset: int = Query(0, description="Absolute line offset; negative values count from the end"),
+    limit: int = Query(500, ge=1, le=5000),
+):
+    job = job_manager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    lines, next_offset = job.logs.read(offset, limit)
+    return {
+        "offset": next_offset - len(lines),
+        "next_offset": next_offset,
+        "total": len(job.logs),
+        "lines": lines,
+    }
+
 @router.websocket("/{job_id}/logs")
-async def websocket_endpoint(websocket: WebSocket, job_id: str):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    job_id: str,
+    offset: Optional[int] = None,
+    tail: Optional[int] = None,
+):
+    """
+    Streams job logs. Reconnecting clients pass `offset` (next line they need)
+    to resume, or `tail` to start from the last N lines instead of line 0.
+    """
     await websocket.accept()
     job = job_manager.get_job(job_id)
     
@@ -34,35 +84,41 @@ async def websocket_endpoint(websocket: WebSocket, job_id: str):
         await websocket.close()
         return
 
-    last_log_index = 0
-    
+    # Subscribe before reading the snapshot so no update falls in between
+    sub = job_manager.subscribe(job_id)
+    if offset is not None:
+        last_log_index = offset if offset >= 0 else max(0, len(job.logs) + offset)
+    elif tail is not None:
+        last_log_index = max(0, len(job.logs) - tail)
+    else:
+        last_log_index = 0
+
+    async def send_pending():
+        nonlocal last_log_index
+        while last_log_index < len(job.logs):
+            lines, last_log_index = job.logs.read(last_log_index, 500)
+            if not lines:
+                break
+            for log in lines:
+                await websocket.send_text(log)
+
     try:
         while True:
-            # Refresh logs from queue
-            job_manager.update_job_logs(job_id)
-            
             # Send new logs
-            current_logs = job.logs
-            if len(current_logs) > last_log_index:
-                new_logs = current_logs[last_log_index:]
-                for log in new_logs:
-                    await websocket.send_text(log)
-                last_log_index = len(current_logs)
+            await send_pending()
             
             # Check status
-            if job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]:
+            if job.status in TERMINAL_STATUSES:
                 # Send any remaining logs then close
-                job_manager.update_job_logs(job_id)
-                current_logs = job.logs
-                if len(current_logs) > last_log_index:
-                    for log in current_logs[last_log_index:]:
-                        await websocket.send_text(log)
+                await send_pending()
                 
                 await websocket.send_text(f"JOB_STATUS:{job.status.value}")
                 await websocket.close()
                 break
             
-            await asyncio.sleep(0.5)
+            # Wake up on monitor events; the timeout is only a safety net
+            await sub.get(timeout=5)
+            sub.drain()
             
     except WebSocketDisconnect:
         print(f"Client disconnected from job {job_id} logs")
@@ -72,15 +128,25 @@ async def websocket_endpoint(websocket: WebSocket, job_id: str):
             await websocket.close()
         except:
             pass
+    finally:
+        sub.close()
 
 @router.websocket("")
 async def ws_jobs(websocket: WebSocket):
     await websocket.accept()
+    sub = job_manager.subscribe()
     try:
         while True:
             jobs = job_manager.list_jobs()
             await websocket.send_json([job.to_dict() for job in jobs])
-            await asyncio.sleep(1) # Broadcast every second
+            # Only status changes matter for the feed, log lines are ignored
+            while True:
+                event = await sub.get(timeout=30)
+                if event is None or event["type"] == "job":
+                    break
+            # Coalesce bursts of updates into a single snapshot
+            await asyncio.sleep(0.1)
+            sub.drain()
     except WebSocketDisconnect:
         print("Client disconnected from jobs feed")
     except Exception as e:
@@ -89,3 +155,5 @@ async def ws_jobs(websocket: WebSocket):
             await websocket.close()
         except:
             pass
+    finally:
+        sub.close()
@@ -1,54 +1,131 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from ..models.schemas import JobResponse
-from src.core.downloader import scan_and_fix_library
+from src.core.catalog import MISSING_FIELDS, LibraryCatalog
+from src.core.directory_index import SORTS, InvalidCursor, directory_index
+from src.core.downloader import scan_and_fix_library, find_library_duplicates
 from src.core.job_manager import job_manager
+import hashlib
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 router = APIRouter()
 
 BASE_MUSIC_DIR = "/app/music"
 
+catalog = LibraryCatalog()
+
 @router.post("/scan", response_model=JobResponse)
-async def scan_library():
+async def scan_library(
+    full: bool = Query(False, description="Re-examine every file instead of only new or changed ones"),
+    workers: Optional[int] = Query(None, ge=1, description="Processes fixing tags (lower for spinning disks)"),
+    io_depth: Optional[int] = Query(None, ge=1, description="File chunks in flight at once"),
+    dry_run: bool = Query(False, description="Only list planned tag changes and estimated write volume"),
+):
     job_id = job_manager.create_job(
         "library_scan",
         "Full Library",
-        scan_and_fix_library
+        scan_and_fix_library,
+        full=full,
+        workers=workers,
+        io_depth=io_depth,
+        dry_run=dry_run
     )
     return JobResponse(message="Library scan started", job_id=job_id, status="queued")
 
+@router.post("/duplicates", response_model=JobResponse)
+async def find_duplicates(
+    link: bool = Query(False, description="Replace byte-identical copies with hard links to the kept copy"),
+    workers: Optional[int] = Query(None, ge=1, description="Processes hashing files (lower for spinning disks)"),
+):
+    # Same lane as scans: both read the whole library
+    job_id = job_manager.create_job(
+        "library_scan",
+        "Duplicate Tracks",
+        find_library_duplicates,
+        link=link,
+        workers=workers
+    )
+    return JobResponse(message="Duplicate scan started", job_id=job_id, status="queued")
+
 @router.get("/files")
-async def list_files(path: str = Query("", description="Relative path from music root")):
+def list_files(
+    request: Request,
+    path: str = Query("", description="Relative path from music root"),
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    sort: str = Query("name", description=f"One of {', '.join(SORTS)}; directories always come first"),
+):
     # Security check: prevent directory traversal
     if ".." in path or path.startswith("/"):
         raise HTTPException(status_code=400, detail="Invalid path")
-    
+    if sort not in SORTS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort (choose from {', '.join(SORTS)})")
+
     target_path = os.path.join(BASE_MUSIC_DIR, path)
     
     if not os.path.exists(target_path):
          # If root doesn't exist, create it or return empty
          if path == "":
-             return []
+             return {"path": path, "items": [], "next_cursor": None, "total": 0}
          raise HTTPException(status_code=404, detail="Path not found")
     
     if not os.path.isdir(target_path):
         raise HTTPException(status_code=400, detail="Not a directory")
 
-    items = []
     try:
-        with os.scandir(target_path) as it:
-            for entry in it:
-                items.append({
-                    "name": entry.name,
-                    "type": "directory" if entry.is_dir() else "file",
-                    "path": os.path.join(path, entry.name),
-                    "size": entry.stat().st_size if entry.is_file() else 0
-                })
+        listing = directory_index.listing(target_path, path)
     except PermissionError:
         raise HTTPException(status_code=403, detail="Permission denied")
 
-    # Sort: Directories first, then files
-    items.sort(key=lambda x: (x["type"] != "directory", x["name"].lower()))
-    
-    return items
+    # The listing's content hash plus the page parameters identify the response
+    etag = '"' + hashlib.sha1(f"{listing.etag}:{sort}:{limit}:{cursor}".encode("utf-8")).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        items, next_cursor = listing.page(sort, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return JSONResponse(
+        {"path": path, "items": items, "next_cursor": next_cursor, "total": len(listing.items)},
+        headers=headers,
+    )
+
+def library_path(path: str) -> str:
+    """Catalog paths are absolute; the browser works relative to the music root."""
+    root = os.path.abspath(BASE_MUSIC_DIR) + os.sep
+    return path[len(root):] if path.startswith(root) else path
+
+def catalog_page(items: List[Dict], total: int, offset: int) -> Dict:
+    return {"offset": offset, "next_offset": offset + len(items), "total": total, "items": items}
+
+@router.get("/search")
+def search_library(
+    q: Optional[str] = Query(None, description="Words matched (as prefixes) against artist, album artist, album and title"),
+    artist: Optional[str] = Query(None, description="Exact artist or album artist, case-insensitive"),
+    album: Optional[str] = Query(None, description="Exact album, case-insensitive"),
+    missing: Optional[str] = Query(None, description=f"Only tracks without this tag: {', '.join(MISSING_FIELDS)}"),
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    if missing is not None and missing not in MISSING_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Invalid field (choose from {', '.join(MISSING_FIELDS)})")
+    tracks, total = catalog.search(q=q, artist=artist, album=album, missing=missing, limit=limit, offset=offset)
+    for track in tracks:
+        track["path"] = library_path(track["path"])
+    return catalog_page(tracks, total, offset)
+
+@router.get("/albums")
+def list_albums(
+    artist: Optional[str] = Query(None, description="Exact artist or album artist, case-insensitive"),
+    q: Optional[str] = Query(None, description="Only albums with tracks matching these words"),
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    albums, total = catalog.albums(artist=artist, q=q, limit=limit, offset=offset)
+    for album in albums:
+        album["directory"] = library_path(album["directory"])
+    return catalog_page(albums, total, offset)
@@ -0,0 +1,141 @@
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from .artwork import WRITE_COVER, image_type
+from .checkpoint import TRACK_DONE, TRACK_FAILED
+from .ledger import archive_id_for
+
+# Leftovers of interrupted downloads/conversions
+TEMP_SUFFIXES = ('.part', '.ytdl', '.temp')
+THUMBNAIL_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+COVER_NAME = 'cover'
+
+
+class AlbumState:
+    """
+    Outstanding tracks of one album. The album's post-steps run exactly once,
+    on whichever thread finishes its last track.
+    """
+
+    def __init__(self, url: str, manifest: Dict, artist_name=None, on_complete: Optional[Callable] = None,
+                 checkpoint=None):
+        self.url = url
+        self.manifest = manifest
+        self.artist_name = artist_name
+        self.title = manifest.get('title') or url
+        self.total = len(manifest.get('entries') or [])
+        self.pending = self.total
+        self.filepaths: List[str] = []
+        self.failed = 0
+        self._on_complete = on_complete
+        # JobCheckpoint of the running job, if any; records per-track progress
+        self.checkpoint = checkpoint
+        # Album artwork bytes, fetched once and embedded into every track by the tag stage
+        self.cover: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    def track_done(self, filepath: Optional[str] = None, info: Optional[Dict] = None):
+        if self.checkpoint is not None and info is not None:
+            try:
+                self.checkpoint.track_state(archive_id_for(info), self.url,
+                                            TRACK_DONE if filepath else TRACK_FAILED, filepath)
+            except Exception as e:
+                print(f"Warning: Could not checkpoint track {info.get('title')}: {e}")
+        with self._lock:
+            self.pending -= 1
+            if filepath:
+                self.filepaths.append(filepath)
+            else:
+                self.failed += 1
+            last = self.pending == 0
+        if last:
+            if self.checkpoint is not None and not self.failed:
+                try:
+                    self.checkpoint.album_done(self.url)
+                except Exception as e:
+                    print(f"Warning: Could not checkpoint album {self.title}: {e}")
+            if self._on_complete is not None:
+                try:
+                    self._on_complete(self)
+                except Exception as e:
+                    print(f"Error finalizing album {self.title}: {e}")
+
+    @property
+    def directory(self) -> Optional[str]:
+        if not self.filepaths:
+            return None
+        return os.path.dirname(os.path.abspath(self.filepaths[0]))
+
+
+def existing_cover(directory: str) -> Optional[str]:
+    for ext in THUMBNAIL_EXTENSIONS:
+        path = os.path.join(directory, COVER_NAME + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def write_album_cover(album: AlbumState) -> Optional[str]:
+    """
+    Saves the album's artwork as cover.<ext> in the album folder, once.
+    """
+    directory = album.directory
+    if not WRITE_COVER or not directory or not album.cover:
+        return None
+    path = existing_cover(directory)
+    if path:
+        return path
+    path = os.path.join(directory, COVER_NAME + image_type(album.cover)[0])
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(album.cover)
+    os.replace(tmp, path)
+    return path
+
+
+def clean_album_folder(directory: str, keep_partial: bool = False) -> int:
+    """
+    Removes temp files and per-track thumbnails left next to finished tracks.
+    keep_partial leaves .part files in place so a resumed job can continue them.
+    Returns the number of files removed.
+    """
+    removed = 0
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return 0
+    stems = {os.path.splitext(n)[0] for n in names if not n.lower().endswith(THUMBNAIL_EXTENSIONS + TEMP_SUFFIXES)}
+    for name in names:
+        lower = name.lower()
+        stem = os.path.splitext(name)[0]
+        if keep_partial and (lower.endswith('.part') or '.part-frag' in lower):
+            continue
+        leftover = (
+            lower.endswith(TEMP_SUFFIXES)
+            or '.temp.' in lower
+            or (lower.endswith(THUMBNAIL_EXTENSIONS) and stem in stems and stem != COVER_NAME)
+        )
+        if leftover:
+            try:
+                os.remove(os.path.join(directory, name))
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def finalize_album(album: AlbumState):
+    """
+    Album-level post-steps, run after the last track: album art and folder cleanup.
+    """
+    directory = album.directory
+    if directory:
+        cover = write_album_cover(album)
+        # Failed tracks may be retried by resuming the job; keep their partial downloads
+        removed = clean_album_folder(directory, keep_partial=album.failed > 0)
+        if cover:
+            print(f"Album art saved: {cover}")
+        if removed:
+            print(f"Removed {removed} leftover files from {directory}")
+    print(f"Album finished: {album.title} ({len(album.filepaths)} downloaded, {album.failed} failed or skipped)")
@@ -0,0 +1,269 @@
+import hashlib
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+import urllib.request
+from typing import Dict, Optional, Tuple
+
+from .config import DATA_DIR, journal_mode
+from .log_transport import report_metrics
+from .rate_limiter import get_rate_limiter
+
+ARTWORK_CACHE_DIR = os.path.join(DATA_DIR, "artwork")
+MAX_BYTES = int(os.environ.get("YTM_ARTWORK_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Write cover.<ext> into album folders (Navidrome picks it up as the album image)
+WRITE_COVER = os.environ.get("YTM_WRITE_COVER", "1") not in ("0", "false", "no")
+
+# (offset, magic bytes) that must all match
+IMAGE_SIGNATURES = (
+    (((0, b'\xff\xd8\xff'),), ('.jpg', 'image/jpeg')),
+    (((0, b'\x89PNG'),), ('.png', 'image/png')),
+    (((0, b'RIFF'), (8, b'WEBP')), ('.webp', 'image/webp')),
+)
+# Formats every player shows as embedded art; anything else is converted before caching
+COVER_TYPES = ('.jpg', '.png')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs (last_access);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def sniff_image(data: bytes) -> Optional[Tuple[str, str]]:
+    """(extension, mime type) of image bytes by their magic numbers; None if unknown."""
+    for magic, kind in IMAGE_SIGNATURES:
+        if all(data[offset:offset + len(sig)] == sig for offset, sig in magic):
+            return kind
+    return None
+
+
+def image_type(data: bytes) -> Tuple[str, str]:
+    """(extension, mime type) of image bytes by their magic number; JPEG if unknown."""
+    return sniff_image(data) or ('.jpg', 'image/jpeg')
+
+
+def cover_image(data: bytes) -> Optional[bytes]:
+    """
+    The image as JPEG or PNG: those are returned as they are, anything else (e.g. WebP
+    thumbnails) is converted to JPEG with ffmpeg. None if it can't be converted.
+    """
+    kind = sniff_image(data)
+    if kind is not None and kind[0] in COVER_TYPES:
+        return data
+    try:
+        result = subprocess.run(["ffmpeg", "-v", "error", "-i", "pipe:0", "-frames:v", "1", "-c:v", "mjpeg",
+                                 "-q:v", "2", "-f", "image2", "pipe:1"],
+                                input=data, capture_output=True, timeout=60)
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Warning: Could not convert artwork to JPEG: {e}")
+        return None
+    if result.returncode != 0 or image_type(result.stdout)[0] != '.jpg' or not result.stdout:
+        print(f"Warning: Could not convert artwork to JPEG: {result.stderr.decode('utf-8', 'replace').strip()}")
+        return None
+    return result.stdout
+
+
+def best_thumbnail_url(manifest: Dict) -> Optional[str]:
+    thumbnails = [t for t in manifest.get('thumbnails') or [] if t.get('url')]
+    if not thumbnails:
+        return None
+    # yt-dlp sorts thumbnails worst to best; prefer explicit sizes when present
+    best = max(enumerate(thumbnails), key=lambda it: ((it[1].get('width') or 0) * (it[1].get('height') or 0), it[0]))
+    return best[1]['url']
+
+
+class ArtworkStats:
+    """
+    Per-process artwork counters, reported as the 'artwork' metrics section.
+    Savings are measured against fetching the cover once per track.
+    """
+
+    def __init__(self):
+        self.albums = 0
+        self.requests = 0
+        self.cache_hits = 0
+        self.bytes_fetched = 0
+        self.requests_saved = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def record(self, tracks: int, size: int, fetched: bool):
+        with self._lock:
+            self.albums += 1
+            per_track = tracks * size
+            if fetched:
+                self.requests += 1
+                self.bytes_fetched += size
+                self.requests_saved += max(0, tracks - 1)
+                self.bytes_saved += max(0, per_track - size)
+            else:
+                self.cache_hits += 1
+                self.requests_saved += tracks
+                self.bytes_saved += per_track
+            data = self.to_dict()
+        report_metrics("artwork", data)
+
+    def to_dict(self) -> Dict:
+        return {
+            "albums": self.albums,
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "bytes_fetched": self.bytes_fetched,
+            "requests_saved": self.requests_saved,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+artwork_stats = ArtworkStats()
+
+
+class ArtworkCache:
+    """
+    Content-addressed image store: files named by their SHA-256 under DATA_DIR/artwork,
+    plus a URL → digest map so a cover is downloaded once no matter how many albums,
+    tracks or jobs refer to it. Evicts least recently used images beyond max_bytes.
+    """
+
+    def __init__(self, directory: str = ARTWORK_CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reopen in each process
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, "index.db")
+            conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+            conn.execute(f"PRAGMA journal_mode={journal_mode(path)}")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def blob_path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest + ext)
+
+    def get_url(self, url: str) -> Optional[bytes]:
+        row = self.conn.execute(
+            "SELECT b.digest, b.ext FROM urls u JOIN blobs b ON b.digest = u.digest WHERE u.url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            with open(self.blob_path(*row), 'rb') as f:
+                data = f.read()
+        except OSError:
+            # Removed behind our back; forget it and fetch again
+            self.conn.execute("DELETE FROM blobs WHERE digest = ?", (row[0],))
+            return None
+        self.conn.execute("UPDATE blobs SET last_access = ? WHERE digest = ?", (time.time(), row[0]))
+        return data
+
+    def put(self, data: bytes, url: Optional[str] = None) -> Optional[str]:
+        """
+        Stores image bytes (once per content, converted to JPEG unless JPEG or PNG)
+        and returns their digest. None if the bytes aren't a usable image.
+        """
+        data = cover_image(data)
+        if data is None:
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        ext = image_type(data)[0]
+        path = self.blob_path(digest, ext)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO blobs (digest, ext, size, last_access) VALUES (?, ?, ?, ?)",
+            (digest, ext, len(data), time.time()),
+        )
+        if url:
+            self.conn.execute("INSERT OR REPLACE INTO urls (url, digest) VALUES (?, ?)", (url, digest))
+        self._evict()
+        return digest
+
+    def fetch(self, url: str, timeout: float = 30) -> Tuple[Optional[bytes], bool]:
+        """
+        Returns (image bytes or None, fetched). Served from the cache when possible,
+        otherwise downloaded through the shared rate limiter and stored.
+        """
+        data = self.get_url(url)
+        if data is not None:
+            return data, False
+        get_rate_limiter().acquire()
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                data = response.read()
+        except Exception as e:
+            print(f"Warning: Could not fetch artwork {url}: {e}")
+            return None, False
+        # Converted here already so the bytes returned are the ones cached
+        data = cover_image(data)
+        if data is None:
+            return None, False
+        self.put(data, url)
+        return data, True
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for digest, ext, size in self.conn.execute(
+                "SELECT digest, ext, size FROM blobs ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self.blob_path(digest, ext))
+            except OSError:
+                pass
+            self.conn.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+            self.conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            total -= size
+
+    def stats(self) -> Dict:
+        count, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        urls = self.conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+        return {"images": count, "urls": urls, "bytes": size, "max_bytes": self.max_bytes}
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._pid = None
+
+
+def fetch_album_art(manifest: Dict, tracks: int, cache: Optional[ArtworkCache] = None) -> Optional[bytes]:
+    """
+    The album's cover, fetched once per album (or not at all when cached).
+    tracks is the number of tracks it replaces per-track thumbnail downloads for.
+    """
+    url = best_thumbnail_url(manifest)
+    if not url:
+        return None
+    own = cache is None
+    cache = cache or ArtworkCache()
+    try:
+        data, fetched = cache.fetch(url)
+    finally:
+        if own:
+            cache.close()
+    if data is not None:
+        artwork_stats.record(tracks, len(data), fetched)
+    return data
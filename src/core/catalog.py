@@ -0,0 +1,314 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .config import DATA_DIR, journal_mode
+from .normalize import normalize_name
+
+CATALOG_PATH = os.path.join(DATA_DIR, "catalog.db")
+
+# Fields that can be queried for being empty ("tracks missing album artist")
+MISSING_FIELDS = ('artist', 'albumartist', 'album', 'title', 'year')
+
+TRACK_COLUMNS = ('path', 'artist', 'albumartist', 'album', 'title', 'year', 'duration', 'codec', 'size')
+
+# Codec names for containers whose stream info doesn't carry one
+CODECS = {'MP3': 'mp3', 'EasyMP3': 'mp3', 'OggOpus': 'opus', 'OggVorbis': 'vorbis', 'FLAC': 'flac'}
+
+# artist_key/album_key are normalized names (album artist, or the artist when it's missing)
+# grouping tracks into albums; tracks without an album tag have no album_key. albums is a
+# per-album summary refreshed on every write, so listing albums never groups all tracks.
+# tracks_fts is an external-content FTS5 index over tracks, kept in sync by triggers.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    artist TEXT,
+    albumartist TEXT,
+    album TEXT,
+    title TEXT,
+    year INTEGER,
+    duration REAL,
+    codec TEXT,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    artist_key TEXT NOT NULL,
+    track_artist_key TEXT NOT NULL,
+    album_key TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tracks_album ON tracks (artist_key, album_key);
+CREATE INDEX IF NOT EXISTS idx_tracks_artist ON tracks (track_artist_key);
+CREATE TABLE IF NOT EXISTS albums (
+    artist_key TEXT NOT NULL,
+    album_key TEXT NOT NULL,
+    albumartist TEXT,
+    album TEXT NOT NULL,
+    year INTEGER,
+    tracks INTEGER NOT NULL,
+    duration REAL,
+    size INTEGER NOT NULL,
+    directory TEXT NOT NULL,
+    PRIMARY KEY (artist_key, album_key)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5(
+    artist, albumartist, album, title,
+    content='tracks', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS tracks_ai AFTER INSERT ON tracks BEGIN
+    INSERT INTO tracks_fts (rowid, artist, albumartist, album, title)
+    VALUES (new.id, new.artist, new.albumartist, new.album, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS tracks_ad AFTER DELETE ON tracks BEGIN
+    INSERT INTO tracks_fts (tracks_fts, rowid, artist, albumartist, album, title)
+    VALUES ('delete', old.id, old.artist, old.albumartist, old.album, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS tracks_au AFTER UPDATE ON tracks BEGIN
+    INSERT INTO tracks_fts (tracks_fts, rowid, artist, albumartist, album, title)
+    VALUES ('delete', old.id, old.artist, old.albumartist, old.album, old.title);
+    INSERT INTO tracks_fts (rowid, artist, albumartist, album, title)
+    VALUES (new.id, new.artist, new.albumartist, new.album, new.title);
+END;
+"""
+
+ALBUM_COLUMNS = ('albumartist', 'album', 'year', 'tracks', 'duration', 'size', 'directory')
+
+
+def track_fields(audio) -> Dict:
+    """
+    Catalog fields of an open (easy) mutagen file: text tags, year, duration and codec.
+    """
+    def text(key):
+        values = [str(v).strip() for v in audio.get(key) or [] if str(v).strip()]
+        return ', '.join(values) or None
+
+    year = re.match(r'\d{4}', text('date') or '')
+    info = getattr(audio, 'info', None)
+    codec = getattr(info, 'codec', None) or CODECS.get(type(audio).__name__)
+    return {
+        'artist': text('artist'),
+        'albumartist': text('albumartist'),
+        'album': text('album'),
+        'title': text('title'),
+        'year': int(year.group()) if year else None,
+        'duration': round(info.length, 3) if getattr(info, 'length', None) else None,
+        'codec': codec,
+    }
+
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for free text: every word must match as a prefix.
+    Words are quoted so user input can't inject query syntax. None if there are no words.
+    """
+    words = re.findall(r'\w+', text or '')
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+class LibraryCatalog:
+    """
+    Persistent, queryable catalog of the library's tracks, filled from the tags read
+    while fixing metadata (library scans and new downloads). Full-text search over
+    artist, album artist, album and title, plus album listings, without touching the files.
+    """
+
+    def __init__(self, path: str = CATALOG_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        # Shared by the API's worker threads
+        self._lock = threading.RLock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reopen in each process
+        if self._conn is None or self._pid != os.getpid():
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute(f"PRAGMA journal_mode={journal_mode(self.path)}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _query(self, sql: str, params=()) -> List[tuple]:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _transaction(self, work):
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                result = work(self.conn)
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return result
+
+    @staticmethod
+    def _album_keys(conn, paths: List[str]) -> Set[Tuple[str, str]]:
+        keys = set()
+        for i in range(0, len(paths), 500):
+            batch = paths[i:i + 500]
+            keys.update(conn.execute(
+                f"SELECT artist_key, album_key FROM tracks WHERE album_key IS NOT NULL "
+                f"AND path IN ({', '.join('?' * len(batch))})", batch).fetchall())
+        return keys
+
+    @staticmethod
+    def _refresh_albums(conn, keys: Set[Tuple[str, str]]):
+        """Recomputes the album summaries of the given (artist_key, album_key) groups."""
+        for key in keys:
+            *summary, tracks, duration, size, path = conn.execute(
+                "SELECT COALESCE(MIN(albumartist), MIN(artist)), MIN(album), MIN(year), COUNT(*), SUM(duration), "
+                "SUM(size), MIN(path) FROM tracks WHERE artist_key = ? AND album_key = ?", key).fetchone()
+            if not tracks:
+                conn.execute("DELETE FROM albums WHERE artist_key = ? AND album_key = ?", key)
+                continue
+            conn.execute(
+                "INSERT OR REPLACE INTO albums (artist_key, album_key, albumartist, album, year, tracks, duration, size, directory) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, *summary, tracks, duration, size, os.path.dirname(path)),
+            )
+
+    def record_many(self, rows: Iterable[Tuple[str, os.stat_result, Dict]]):
+        """Stores (path, stat_result, track_fields) rows in one transaction."""
+        values = []
+        for path, st, fields in rows:
+            album_artist = fields.get('albumartist') or fields.get('artist')
+            values.append((
+                path, fields.get('artist'), fields.get('albumartist'), fields.get('album'), fields.get('title'),
+                fields.get('year'), fields.get('duration'), fields.get('codec'), st.st_size, st.st_mtime_ns,
+                normalize_name(album_artist), normalize_name(fields.get('artist')),
+                normalize_name(fields['album']) if fields.get('album') else None,
+            ))
+        if not values:
+            return
+
+        def work(conn):
+            # Albums the tracks leave (retagged) and join both need new summaries
+            keys = self._album_keys(conn, [v[0] for v in values])
+            keys.update((v[10], v[12]) for v in values if v[12] is not None)
+            conn.executemany(
+                "INSERT INTO tracks (path, artist, albumartist, album, title, year, duration, codec, size, mtime_ns, "
+                "artist_key, track_artist_key, album_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET artist = excluded.artist, albumartist = excluded.albumartist, "
+                "album = excluded.album, title = excluded.title, year = excluded.year, duration = excluded.duration, "
+                "codec = excluded.codec, size = excluded.size, mtime_ns = excluded.mtime_ns, "
+                "artist_key = excluded.artist_key, track_artist_key = excluded.track_artist_key, "
+                "album_key = excluded.album_key",
+                values,
+            )
+            self._refresh_albums(conn, keys)
+
+        self._transaction(work)
+
+    def record(self, path: str, st: os.stat_result, fields: Dict):
+        self.record_many([(path, st, fields)])
+
+    def paths(self, prefix: str = "") -> Set[str]:
+        if not prefix:
+            return {row[0] for row in self._query("SELECT path FROM tracks")}
+        return {row[0] for row in self._query(
+            "SELECT path FROM tracks WHERE path >= ? AND path < ?", (prefix, prefix + "\U0010ffff"))}
+
+    def prune(self, seen: Set[str], prefix: str = "") -> int:
+        """Drops tracks under prefix whose files no longer exist. Returns the number removed."""
+        gone = list(self.paths(prefix) - seen)
+        if gone:
+            def work(conn):
+                keys = self._album_keys(conn, gone)
+                conn.executemany("DELETE FROM tracks WHERE path = ?", [(path,) for path in gone])
+                self._refresh_albums(conn, keys)
+            self._transaction(work)
+        return len(gone)
+
+    def search(self, q: Optional[str] = None, artist: Optional[str] = None, album: Optional[str] = None,
+               missing: Optional[str] = None, limit: int = 50, offset: int = 0) -> Tuple[List[Dict], int]:
+        """
+        Tracks matching free text q (best matches first), an artist (track or album artist)
+        and album compared as normalized names, and/or an empty field.
+        Returns (page of tracks, total matches).
+        """
+        match = fts_query(q)
+        if q is not None and match is None:
+            return [], 0
+        where, params = [], []
+        if artist:
+            where.append("(t.artist_key = ? OR t.track_artist_key = ?)")
+            params += [normalize_name(artist)] * 2
+        if album:
+            where.append("t.album_key = ?")
+            params.append(normalize_name(album))
+        if missing:
+            if missing not in MISSING_FIELDS:
+                raise ValueError(f"Unknown field '{missing}' (choose from {', '.join(MISSING_FIELDS)})")
+            where.append(f"(t.{missing} IS NULL OR t.{missing} = '')")
+        if match:
+            # Drive the query from the full-text index and rank by bm25
+            source = "tracks_fts f JOIN tracks t ON t.id = f.rowid"
+            where.insert(0, "tracks_fts MATCH ?")
+            params.insert(0, match)
+            order = "f.rank"
+        else:
+            source = "tracks t"
+            order = "t.artist_key, t.album_key, t.path"
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        total = self._query(f"SELECT COUNT(*) FROM {source} {clause}", params)[0][0]
+        rows = self._query(
+            f"SELECT {', '.join('t.' + c for c in TRACK_COLUMNS)} FROM {source} {clause} ORDER BY {order} LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        )
+        return [dict(zip(TRACK_COLUMNS, row)) for row in rows], total
+
+    def albums(self, artist: Optional[str] = None, q: Optional[str] = None,
+               limit: int = 50, offset: int = 0) -> Tuple[List[Dict], int]:
+        """
+        Albums in the library (tracks grouped by album artist and album), optionally only
+        those by artist (album artist, or a track artist on it) or with tracks matching
+        free text q. Returns (page of albums, total).
+        """
+        match = fts_query(q)
+        if q is not None and match is None:
+            return [], 0
+        where, params = [], []
+        if artist:
+            key = normalize_name(artist)
+            where.append("(artist_key = ? OR (artist_key, album_key) IN "
+                         "(SELECT artist_key, album_key FROM tracks WHERE track_artist_key = ?))")
+            params += [key, key]
+        if match:
+            where.append("(artist_key, album_key) IN (SELECT t.artist_key, t.album_key FROM tracks_fts f "
+                         "JOIN tracks t ON t.id = f.rowid WHERE tracks_fts MATCH ?)")
+            params.append(match)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        total = self._query(f"SELECT COUNT(*) FROM albums {clause}", params)[0][0]
+        rows = self._query(
+            f"SELECT {', '.join(ALBUM_COLUMNS)} FROM albums {clause} ORDER BY artist_key, album_key LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        )
+        albums = [dict(zip(ALBUM_COLUMNS, row)) for row in rows]
+        for album in albums:
+            if album["duration"] is not None:
+                album["duration"] = round(album["duration"], 3)
+        return albums, total
+
+    def stats(self) -> Dict:
+        return {"tracks": len(self), "albums": self._query("SELECT COUNT(*) FROM albums")[0][0]}
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM tracks")[0][0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._pid = None
@@ -0,0 +1,330 @@
+import importlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .config import DATA_DIR, journal_mode
+
+CHECKPOINT_PATH = os.path.join(DATA_DIR, "checkpoints.db")
+
+# Album states
+ALBUM_PENDING = "pending"
+ALBUM_EXPANDED = "expanded"
+ALBUM_DONE = "done"
+
+# Track states
+TRACK_PENDING = "pending"
+TRACK_DOWNLOADING = "downloading"
+TRACK_DONE = "done"
+TRACK_FAILED = "failed"
+
+# Minimum seconds between partial-offset writes for one track
+PARTIAL_WRITE_INTERVAL = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    target TEXT,
+    func TEXT NOT NULL,
+    args TEXT NOT NULL,
+    kwargs TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_state (
+    job_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (job_id, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS job_albums (
+    job_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    manifest TEXT,
+    PRIMARY KEY (job_id, url)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS job_tracks (
+    job_id TEXT NOT NULL,
+    archive_id TEXT NOT NULL,
+    album_url TEXT,
+    state TEXT NOT NULL,
+    filepath TEXT,
+    partial_path TEXT,
+    partial_bytes INTEGER,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, archive_id)
+) WITHOUT ROWID;
+"""
+
+
+def func_path(func) -> str:
+    return f"{func.__module__}:{func.__qualname__}"
+
+
+def resolve_func(path: str):
+    module, _, name = path.partition(":")
+    obj = importlib.import_module(module)
+    for part in name.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+class CheckpointStore:
+    """
+    Persistent job records and per-job progress (albums, manifests, track states,
+    partial download offsets) so an interrupted job can resume where it stopped.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        # Download and tag threads share the connection
+        self._lock = threading.RLock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reopen in each process
+        if self._conn is None or self._pid != os.getpid():
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute(f"PRAGMA journal_mode={journal_mode(self.path)}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params)
+
+    def _query(self, sql: str, params=()) -> List[tuple]:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    # Job records
+
+    def save_job(self, job_id, job_type, target, func, args, kwargs, priority=0, status="queued"):
+        now = time.time()
+        self._execute(
+            """
+            INSERT INTO jobs (id, job_type, target, func, args, kwargs, priority, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET status = excluded.status, error = NULL, updated_at = excluded.updated_at
+            """,
+            (job_id, job_type, target, func_path(func), json.dumps(list(args)), json.dumps(kwargs),
+             priority, status, now, now),
+        )
+
+    def set_job_status(self, job_id, status, error=None):
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, error, time.time(), job_id),
+        )
+
+    def get_job(self, job_id) -> Optional[Dict]:
+        rows = self._query(
+            "SELECT id, job_type, target, func, args, kwargs, priority, status, error, created_at, updated_at "
+            "FROM jobs WHERE id = ?", (job_id,))
+        return self._job_row(rows[0]) if rows else None
+
+    def jobs_with_status(self, statuses) -> List[Dict]:
+        marks = ",".join("?" for _ in statuses)
+        rows = self._query(
+            "SELECT id, job_type, target, func, args, kwargs, priority, status, error, created_at, updated_at "
+            f"FROM jobs WHERE status IN ({marks}) ORDER BY created_at", tuple(statuses))
+        return [self._job_row(row) for row in rows]
+
+    @staticmethod
+    def _job_row(row) -> Dict:
+        keys = ("id", "job_type", "target", "func", "args", "kwargs", "priority", "status", "error", "created_at", "updated_at")
+        job = dict(zip(keys, row))
+        job["args"] = json.loads(job["args"])
+        job["kwargs"] = json.loads(job["kwargs"])
+        return job
+
+    # Progress
+
+    def get_state(self, job_id, key) -> Optional[str]:
+        rows = self._query("SELECT value FROM job_state WHERE job_id = ? AND key = ?", (job_id, key))
+        return rows[0][0] if rows else None
+
+    def set_state(self, job_id, key, value):
+        self._execute("INSERT OR REPLACE INTO job_state (job_id, key, value) VALUES (?, ?, ?)", (job_id, key, value))
+
+    def save_albums(self, job_id, urls: List[str]):
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                for position, url in enumerate(urls):
+                    self.conn.execute(
+                        "INSERT OR IGNORE INTO job_albums (job_id, url, position, state) VALUES (?, ?, ?, ?)",
+                        (job_id, url, position, ALBUM_PENDING),
+                    )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO job_state (job_id, key, value) VALUES (?, 'albums_resolved', ?)",
+                    (job_id, str(time.time())),
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def albums(self, job_id, include_done: bool = True) -> Optional[List[str]]:
+        """The resolved album list, or None if the job never got that far."""
+        if self.get_state(job_id, "albums_resolved") is None:
+            return None
+        sql = "SELECT url FROM job_albums WHERE job_id = ?"
+        if not include_done:
+            sql += f" AND state != '{ALBUM_DONE}'"
+        return [row[0] for row in self._query(sql + " ORDER BY position", (job_id,))]
+
+    def save_manifest(self, job_id, url, manifest: Dict):
+        self._execute(
+            """
+            INSERT INTO job_albums (job_id, url, position, state, manifest) VALUES (?, ?, 0, ?, ?)
+            ON CONFLICT (job_id, url) DO UPDATE SET state = excluded.state, manifest = excluded.manifest
+            """,
+            (job_id, url, ALBUM_EXPANDED, json.dumps(manifest)),
+        )
+
+    def manifest(self, job_id, url) -> Optional[Dict]:
+        rows = self._query("SELECT manifest FROM job_albums WHERE job_id = ? AND url = ?", (job_id, url))
+        return json.loads(rows[0][0]) if rows and rows[0][0] else None
+
+    def set_album_state(self, job_id, url, state):
+        self._execute("UPDATE job_albums SET state = ? WHERE job_id = ? AND url = ?", (state, job_id, url))
+
+    def set_track_state(self, job_id, archive_id, album_url, state, filepath=None):
+        self._execute(
+            """
+            INSERT INTO job_tracks (job_id, archive_id, album_url, state, filepath, updated_at) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (job_id, archive_id) DO UPDATE SET
+                state = excluded.state,
+                filepath = COALESCE(excluded.filepath, filepath),
+                updated_at = excluded.updated_at
+            """,
+            (job_id, archive_id, album_url, state, filepath, time.time()),
+        )
+
+    def set_partial(self, job_id, archive_id, path, downloaded_bytes):
+        self._execute(
+            "UPDATE job_tracks SET partial_path = ?, partial_bytes = ?, updated_at = ? WHERE job_id = ? AND archive_id = ?",
+            (path, downloaded_bytes, time.time(), job_id, archive_id),
+        )
+
+    def tracks(self, job_id, album_url=None) -> Dict[str, Dict]:
+        sql = "SELECT archive_id, state, filepath, partial_path, partial_bytes FROM job_tracks WHERE job_id = ?"
+        params = [job_id]
+        if album_url is not None:
+            sql += " AND album_url = ?"
+            params.append(album_url)
+        return {
+            row[0]: {"state": row[1], "filepath": row[2], "partial_path": row[3], "partial_bytes": row[4]}
+            for row in self._query(sql, tuple(params))
+        }
+
+    def summary(self, job_id) -> Dict:
+        albums = dict(self._query("SELECT state, COUNT(*) FROM job_albums WHERE job_id = ? GROUP BY state", (job_id,)))
+        tracks = dict(self._query("SELECT state, COUNT(*) FROM job_tracks WHERE job_id = ? GROUP BY state", (job_id,)))
+        partial = self._query(
+            "SELECT COUNT(*), COALESCE(SUM(partial_bytes), 0) FROM job_tracks "
+            "WHERE job_id = ? AND state != ? AND partial_bytes > 0", (job_id, TRACK_DONE))[0]
+        return {
+            "albums_resolved": self.get_state(job_id, "albums_resolved") is not None,
+            "albums": albums,
+            "tracks": tracks,
+            "partial_downloads": partial[0],
+            "partial_bytes": partial[1],
+        }
+
+    def clear_progress(self, job_id):
+        """Drops the progress rows of a finished job; the job record stays."""
+        with self._lock:
+            for table in ("job_state", "job_albums", "job_tracks"):
+                self.conn.execute(f"DELETE FROM {table} WHERE job_id = ?", (job_id,))
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._pid = None
+
+
+class JobCheckpoint:
+    """
+    The checkpoint of the job running in this process, bound to its id.
+    """
+
+    def __init__(self, job_id: str, store: Optional[CheckpointStore] = None):
+        self.job_id = job_id
+        self.store = store or CheckpointStore()
+        self._partial_written: Dict[str, float] = {}
+
+    def albums(self, include_done: bool = True) -> Optional[List[str]]:
+        return self.store.albums(self.job_id, include_done)
+
+    def save_albums(self, urls: List[str]):
+        self.store.save_albums(self.job_id, urls)
+
+    def manifest(self, url) -> Optional[Dict]:
+        return self.store.manifest(self.job_id, url)
+
+    def save_manifest(self, url, manifest: Dict):
+        self.store.save_manifest(self.job_id, url, manifest)
+
+    def album_done(self, url):
+        self.store.set_album_state(self.job_id, url, ALBUM_DONE)
+
+    def tracks(self, album_url=None) -> Dict[str, Dict]:
+        return self.store.tracks(self.job_id, album_url)
+
+    def track_state(self, archive_id, album_url, state, filepath=None):
+        if archive_id:
+            self.store.set_track_state(self.job_id, archive_id, album_url, state, filepath)
+
+    def progress_hook(self, archive_id):
+        """yt-dlp progress hook recording the .part file and offset of a track, throttled."""
+        def hook(d):
+            if not archive_id or d.get("status") != "downloading":
+                return
+            now = time.monotonic()
+            if now - self._partial_written.get(archive_id, 0) < PARTIAL_WRITE_INTERVAL:
+                return
+            self._partial_written[archive_id] = now
+            try:
+                self.store.set_partial(self.job_id, archive_id, d.get("tmpfilename"), d.get("downloaded_bytes"))
+            except Exception as e:
+                print(f"Warning: Could not checkpoint download offset: {e}")
+        return hook
+
+    def summary(self) -> Dict:
+        return self.store.summary(self.job_id)
+
+    def clear(self):
+        self.store.clear_progress(self.job_id)
+
+
+_current: Optional[JobCheckpoint] = None
+
+
+def set_current_checkpoint(checkpoint: Optional[JobCheckpoint]):
+    global _current
+    _current = checkpoint
+
+
+def current_checkpoint() -> Optional[JobCheckpoint]:
+    """The running job's checkpoint, or None outside of checkpointed jobs (e.g. CLI usage)."""
+    return _current
@@ -0,0 +1,63 @@
+import functools
+import os
+from typing import Optional
+
+# Root of the music library (mounted as a volume in docker)
+MUSIC_DIR = os.environ.get("YTM_MUSIC_DIR", "/app/music")
+
+# Internal state (ledger, caches, indexes). Its SQLite databases want a local disk: the
+# library is often a network share, so this is a volume of its own (see docker-compose).
+# Installs that still have the old hidden folder inside the library keep using it.
+LEGACY_DATA_DIR = os.path.join(MUSIC_DIR, ".ytm")
+DATA_DIR = os.environ.get("YTM_DATA_DIR") or (LEGACY_DATA_DIR if os.path.isdir(LEGACY_DATA_DIR) else "/app/data")
+
+# Legacy yt-dlp text archive, kept only so it can be imported into the ledger
+LEGACY_ARCHIVE_PATH = os.path.join(MUSIC_DIR, "download_archive.txt")
+
+LEDGER_PATH = os.path.join(DATA_DIR, "ledger.db")
+
+
+def data_path(*parts):
+    """
+    Returns a path inside DATA_DIR, creating the parent folder if needed.
+    """
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+# Filesystems whose locking can't back SQLite's WAL shared memory (the -shm file)
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afs", "ceph", "glusterfs",
+                       "fuse.glusterfs", "fuse.sshfs"}
+
+
+@functools.lru_cache(maxsize=None)
+def filesystem_type(directory: str) -> Optional[str]:
+    """
+    Type of the filesystem holding directory, from the longest matching mount point in
+    /proc/mounts. None where that isn't available.
+    """
+    directory = os.path.realpath(directory)
+    best, fstype = None, None
+    try:
+        with open("/proc/mounts") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount = fields[1].replace("\\040", " ")
+                inside = directory == mount or directory.startswith(mount.rstrip("/") + "/")
+                if inside and (best is None or len(mount) > len(best)):
+                    best, fstype = mount, fields[2]
+    except OSError:
+        return None
+    return fstype
+
+
+def journal_mode(db_path: str) -> str:
+    """
+    SQLite journal mode for a database file: WAL, unless it lives on a network filesystem
+    where WAL is unsafe and the rollback journal is used instead.
+    """
+    directory = os.path.dirname(os.path.abspath(db_path))
+    return "DELETE" if filesystem_type(directory) in NETWORK_FILESYSTEMS else "WAL"
@@ -0,0 +1,483 @@
+import filecmp
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import struct
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import redirect_stderr, redirect_stdout
+from multiprocessing import cpu_count
+from typing import BinaryIO, Dict, Iterable, List, Optional, Set, Tuple
+
+from .config import DATA_DIR, journal_mode
+from .library_scan import walk_audio_files
+from .log_transport import report_metrics
+from .normalize import normalize_name
+
+DEDUP_INDEX_PATH = os.path.join(DATA_DIR, "dedup.db")
+
+# Processes hashing files
+DEDUP_WORKERS = int(os.environ.get("YTM_DEDUP_WORKERS", str(cpu_count())))
+# Bytes per read while hashing; the whole payload is never held in memory
+HASH_CHUNK_SIZE = int(os.environ.get("YTM_HASH_CHUNK_SIZE", str(1024 * 1024)))
+# Files handed to a worker at a time
+HASH_BATCH_SIZE = 32
+# Index rows written per transaction
+DEDUP_BATCH_SIZE = 500
+# Minimum seconds between progress reports
+REPORT_INTERVAL = 1.0
+
+# Folders yt-dlp falls back to when album or artist metadata is missing (NA, channel ids);
+# copies there lose to copies in properly named folders
+FALLBACK_FOLDER = re.compile(r'^(NA|UC[\w-]{22})$')
+
+# Header packets (identification, comments, setup) at the start of an Ogg stream, by the
+# magic of the first one; audio starts on the page after them
+OGG_HEADER_PACKETS = {b'OpusHead': 2, b'\x01vorbis': 3}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    track_key TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_hashes_file ON hashes (inode, size, mtime_ns);
+"""
+
+
+def _id3v2_size(header: bytes) -> int:
+    """Total size of an ID3v2 tag from its 10-byte header (0 if there is none)."""
+    if len(header) < 10 or not header.startswith(b'ID3'):
+        return 0
+    size = 0
+    for byte in header[6:10]:
+        size = (size << 7) | (byte & 0x7f)
+    # Footer present
+    return size + (20 if header[5] & 0x10 else 10)
+
+
+def _trailing_tags(f: BinaryIO, start: int, end: int) -> int:
+    """End of the audio once ID3v1 and APEv2 tags at the end of the file are cut off."""
+    while end - start >= 32:
+        f.seek(end - 32)
+        footer = f.read(32)
+        if footer.startswith(b'APETAGEX'):
+            size, flags = struct.unpack('<I4xI', footer[12:24])
+            end -= size + (32 if flags & 0x80000000 else 0)
+            continue
+        if end - start >= 128:
+            f.seek(end - 128)
+            if f.read(3) == b'TAG':
+                end -= 128
+                continue
+        break
+    return max(start, end)
+
+
+def _mp4_ranges(f: BinaryIO, size: int) -> List[Tuple[int, int]]:
+    # Tags live in moov/udta; the encoded audio is the mdat payload
+    ranges, offset = [], 0
+    while offset + 8 <= size:
+        f.seek(offset)
+        length, kind = struct.unpack('>I4s', f.read(8))
+        header = 8
+        if length == 1:
+            length = struct.unpack('>Q', f.read(8))[0]
+            header = 16
+        elif length == 0:
+            length = size - offset
+        if length < header:
+            break
+        if kind == b'mdat':
+            ranges.append((offset + header, min(length, size - offset) - header))
+        offset += length
+    return ranges
+
+
+def _ogg_ranges(f: BinaryIO, size: int) -> List[Tuple[int, int]]:
+    # Page headers carry sequence numbers and CRCs that change when a retag resizes the
+    # comment header, so only page bodies count, and the codec's header packets not at all
+    ranges, offset, packets, header_packets = [], 0, 0, None
+    while offset + 27 <= size:
+        f.seek(offset)
+        header = f.read(27)
+        if not header.startswith(b'OggS'):
+            break
+        segments = f.read(header[26])
+        body = sum(segments)
+        start = offset + 27 + len(segments)
+        if header_packets is None:
+            first = f.read(8)
+            header_packets = next((n for magic, n in OGG_HEADER_PACKETS.items() if first.startswith(magic)), 1)
+        if packets >= header_packets:
+            ranges.append((start, min(body, size - start)))
+        # A lacing value below 255 ends a packet
+        packets += sum(1 for lacing in segments if lacing < 255)
+        offset = start + body
+    return ranges
+
+
+def _flac_ranges(f: BinaryIO, start: int, size: int) -> List[Tuple[int, int]]:
+    # Metadata blocks (Vorbis comments, pictures, padding) come before the frames
+    offset = start + 4
+    while offset + 4 <= size:
+        f.seek(offset)
+        block = f.read(4)
+        offset += 4 + int.from_bytes(block[1:4], 'big')
+        if block[0] & 0x80:
+            break
+    end = _trailing_tags(f, offset, size)
+    return [(offset, end - offset)]
+
+
+def payload_ranges(f: BinaryIO, size: int) -> List[Tuple[int, int]]:
+    """
+    (offset, length) ranges holding a file's encoded audio, leaving out tag blocks
+    (ID3v2/ID3v1/APEv2, MP4 metadata atoms, Ogg and FLAC headers), so retagging a
+    file doesn't change the bytes they cover. Unknown formats are covered whole.
+    """
+    f.seek(0)
+    head = f.read(12)
+    if head[4:8] == b'ftyp':
+        return _mp4_ranges(f, size)
+    if head.startswith(b'OggS'):
+        return _ogg_ranges(f, size)
+    start = _id3v2_size(head[:10])
+    if start:
+        f.seek(start)
+        head = f.read(4)
+    if head[:4] == b'fLaC':
+        return _flac_ranges(f, start, size)
+    end = _trailing_tags(f, start, size)
+    return [(start, end - start)]
+
+
+def payload_digest(path: str, chunk_size: Optional[int] = None) -> str:
+    """Hash of a file's audio payload, read in fixed-size chunks."""
+    chunk_size = chunk_size or HASH_CHUNK_SIZE
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        for offset, length in payload_ranges(f, size):
+            f.seek(offset)
+            while length > 0:
+                data = f.read(min(chunk_size, length))
+                if not data:
+                    break
+                digest.update(data)
+                length -= len(data)
+    return digest.hexdigest()
+
+
+def track_key(artist, title) -> Optional[str]:
+    """
+    Normalized 'artist - title' of a track, for finding the same song across releases
+    (album vs single) whose audio differs. None without both tags.
+    """
+    if not artist or not title:
+        return None
+    # The first of several artists is the main one
+    artist = normalize_name(re.split(r',|;| feat\.? | ft\.? ', artist, maxsplit=1)[0])
+    title = normalize_name(title)
+    return f"{artist} - {title}" if artist and title else None
+
+
+def hash_chunk(paths: List[str]) -> Tuple[List[Tuple[str, Optional[str], Optional[str], Optional[os.stat_result]]], str]:
+    """
+    Runs in the hashing pool: payload digest and track key of each path.
+    Returns ([(path, digest or None, track key, stat)], captured output).
+    """
+    from .downloader import open_easy
+
+    output = io.StringIO()
+    results = []
+    with redirect_stdout(output), redirect_stderr(output):
+        for path in paths:
+            try:
+                st = os.stat(path)
+                digest = payload_digest(path)
+            except Exception as e:
+                print(f"Error hashing {path}: {e}")
+                results.append((path, None, None, None))
+                continue
+            key = None
+            try:
+                audio = open_easy(path)
+                if audio is not None:
+                    key = track_key((audio.get('artist') or [None])[0], (audio.get('title') or [None])[0])
+            except Exception as e:
+                print(f"Warning: Could not read tags of {path}: {e}")
+            results.append((path, digest, key, st))
+    return results, output.getvalue()
+
+
+class DedupIndex:
+    """
+    Persistent cache of payload digests and track keys, valid while a file's inode,
+    size and mtime are unchanged. A file is looked up by path first, then by
+    (inode, size, mtime) so hard links and moved files aren't hashed again.
+    """
+
+    def __init__(self, path: str = DEDUP_INDEX_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reopen in each process
+        if self._conn is None or self._pid != os.getpid():
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute(f"PRAGMA journal_mode={journal_mode(self.path)}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def lookup(self, path: str, st: os.stat_result) -> Optional[Tuple[str, Optional[str]]]:
+        """(digest, track key) if cached for this exact file state, else None."""
+        row = self.conn.execute(
+            "SELECT digest, track_key FROM hashes WHERE path = ? AND inode = ? AND size = ? AND mtime_ns = ?",
+            (path, st.st_ino, st.st_size, st.st_mtime_ns),
+        ).fetchone() or self.conn.execute(
+            "SELECT digest, track_key FROM hashes WHERE inode = ? AND size = ? AND mtime_ns = ? LIMIT 1",
+            (st.st_ino, st.st_size, st.st_mtime_ns),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def record_many(self, rows: Iterable[Tuple[str, os.stat_result, str, Optional[str]]]):
+        """Stores (path, stat_result, digest, track_key) rows in one transaction."""
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO hashes (path, inode, size, mtime_ns, digest, track_key) VALUES (?, ?, ?, ?, ?, ?)",
+                [(path, st.st_ino, st.st_size, st.st_mtime_ns, digest, key) for path, st, digest, key in rows],
+            )
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def paths(self, prefix: str = "") -> Set[str]:
+        if not prefix:
+            return {row[0] for row in self.conn.execute("SELECT path FROM hashes")}
+        return {row[0] for row in self.conn.execute(
+            "SELECT path FROM hashes WHERE path >= ? AND path < ?", (prefix, prefix + "\U0010ffff"))}
+
+    def prune(self, seen: Set[str], prefix: str = "") -> int:
+        """Drops entries under prefix for files that no longer exist. Returns the number removed."""
+        gone = self.paths(prefix) - seen
+        if gone:
+            self.conn.execute("BEGIN")
+            self.conn.executemany("DELETE FROM hashes WHERE path = ?", [(path,) for path in gone])
+            self.conn.execute("COMMIT")
+        return len(gone)
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._pid = None
+
+
+def keeper_rank(path: str) -> Tuple:
+    """Sort key choosing which copy of a duplicate to keep: named folders first, then the shortest path."""
+    fallback = sum(1 for part in path.split(os.sep) if FALLBACK_FOLDER.match(part))
+    return (fallback, len(path), path)
+
+
+def hard_link(keeper: str, duplicate: str):
+    """Atomically replaces duplicate with a hard link to keeper."""
+    tmp = f"{duplicate}.{os.getpid()}.link"
+    os.link(keeper, tmp)
+    try:
+        os.replace(tmp, duplicate)
+    except OSError:
+        os.remove(tmp)
+        raise
+
+
+class DedupProgress:
+    """Duplicate scan counters, reported as the 'dedup' metrics section."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.files = 0
+        self.cached = 0
+        self.hashed = 0
+        self.errors = 0
+        self.duplicate_groups = 0
+        self.duplicate_files = 0
+        self.reclaimable_bytes = 0
+        self.same_song_groups = 0
+        self.linked = 0
+        self.bytes_reclaimed = 0
+        self._last_report = 0.0
+
+    def to_dict(self) -> Dict:
+        elapsed = time.perf_counter() - self.started_at
+        return {
+            "files": self.files,
+            "cached": self.cached,
+            "hashed": self.hashed,
+            "errors": self.errors,
+            "duplicate_groups": self.duplicate_groups,
+            "duplicate_files": self.duplicate_files,
+            "reclaimable_bytes": self.reclaimable_bytes,
+            "same_song_groups": self.same_song_groups,
+            "linked": self.linked,
+            "bytes_reclaimed": self.bytes_reclaimed,
+            "files_per_second": round(self.hashed / elapsed, 2) if elapsed > 0 else 0.0,
+            "elapsed": round(elapsed, 1),
+        }
+
+    def report(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_report < REPORT_INTERVAL:
+            return
+        self._last_report = now
+        report_metrics("dedup", self.to_dict())
+
+
+def find_duplicates(base_path: str, link: bool = False, index: Optional[DedupIndex] = None,
+                    workers: Optional[int] = None) -> Dict:
+    """
+    Hashes the audio payload of every library file (in a process pool, reusing cached
+    digests of unchanged files) and reports copies of the same audio, plus songs
+    (same artist/title key) present with different audio.
+
+    With link, duplicates that are byte-for-byte identical to the kept copy are replaced
+    by hard links to it. Copies whose tags differ are only reported: linking them would
+    change one copy's tags.
+    """
+    index = DedupIndex() if index is None else index
+    workers = max(1, workers or DEDUP_WORKERS)
+    progress = DedupProgress()
+    prefix = os.path.abspath(base_path) + os.sep
+    files: Dict[str, Tuple[os.stat_result, str, Optional[str]]] = {}
+    pending_rows = []
+
+    def collect(results, output):
+        nonlocal pending_rows
+        if output:
+            print(output, end="" if output.endswith("\n") else "\n")
+        for path, digest, key, st in results:
+            if digest is None:
+                progress.errors += 1
+                continue
+            progress.hashed += 1
+            files[path] = (st, digest, key)
+            pending_rows.append((path, st, digest, key))
+        if len(pending_rows) >= DEDUP_BATCH_SIZE:
+            index.record_many(pending_rows)
+            pending_rows = []
+        progress.report()
+
+    def chunks():
+        chunk = []
+        for filepath, _, st in walk_audio_files(base_path):
+            path = os.path.abspath(filepath)
+            progress.files += 1
+            cached = index.lookup(path, st)
+            if cached is not None:
+                progress.cached += 1
+                files[path] = (st, *cached)
+                continue
+            chunk.append(path)
+            if len(chunk) >= HASH_BATCH_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    if workers == 1:
+        for chunk in chunks():
+            collect(*hash_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = {}
+            for chunk in chunks():
+                in_flight[pool.submit(hash_chunk, chunk)] = chunk
+                # Bounded: the walk waits while two chunks per worker are outstanding
+                while len(in_flight) >= workers * 2:
+                    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        chunk = in_flight.pop(future)
+                        try:
+                            collect(*future.result())
+                        except Exception as e:
+                            print(f"Error in hashing worker: {e}")
+                            progress.errors += len(chunk)
+            for future, chunk in list(in_flight.items()):
+                try:
+                    collect(*future.result())
+                except Exception as e:
+                    print(f"Error in hashing worker: {e}")
+                    progress.errors += len(chunk)
+
+    if pending_rows:
+        index.record_many(pending_rows)
+    index.prune(set(files), prefix)
+
+    by_digest: Dict[str, List[str]] = {}
+    by_key: Dict[str, Set[str]] = {}
+    for path, (st, digest, key) in files.items():
+        by_digest.setdefault(digest, []).append(path)
+        if key:
+            by_key.setdefault(key, set()).add(digest)
+
+    groups = []
+    for digest, paths in by_digest.items():
+        # Hard links of one file are a single copy
+        copies = {}
+        for path in sorted(paths, key=keeper_rank):
+            st = files[path][0]
+            copies.setdefault((st.st_dev, st.st_ino), path)
+        if len(copies) < 2:
+            continue
+        keeper, *duplicates = copies.values()
+        progress.duplicate_groups += 1
+        progress.duplicate_files += len(duplicates)
+        progress.reclaimable_bytes += sum(files[path][0].st_size for path in duplicates)
+        groups.append({"digest": digest, "keep": keeper, "duplicates": duplicates})
+
+        print(f"Duplicate audio ({len(duplicates) + 1} copies): keeping {keeper}")
+        for path in duplicates:
+            if not link:
+                print(f"  duplicate: {path}")
+                continue
+            st = files[path][0]
+            if st.st_dev != files[keeper][0].st_dev or not filecmp.cmp(keeper, path, shallow=False):
+                print(f"  duplicate (tags differ, not linked): {path}")
+                continue
+            try:
+                hard_link(keeper, path)
+            except OSError as e:
+                print(f"  Error linking {path}: {e}")
+                continue
+            progress.linked += 1
+            progress.bytes_reclaimed += st.st_size
+            print(f"  linked: {path}")
+
+    same_song = {key: digests for key, digests in by_key.items() if len(digests) > 1}
+    progress.same_song_groups = len(same_song)
+    for key, digests in sorted(same_song.items()):
+        paths = sorted(path for digest in digests for path in by_digest[digest])
+        print(f"Same song, different audio: {key}")
+        for path in paths:
+            print(f"  {path}")
+
+    progress.report(force=True)
+    return {**progress.to_dict(), "groups": groups}
@@ -0,0 +1,174 @@
+import base64
+import bisect
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Directories whose listings are kept in memory
+CACHE_SIZE = int(os.environ.get("YTM_DIR_CACHE_SIZE", "256"))
+# A directory's mtime only changes when entries are added, removed or renamed, not when a
+# file inside is rewritten, so sizes and file mtimes are re-read at least this often (seconds)
+CACHE_TTL = float(os.environ.get("YTM_DIR_CACHE_TTL", "60"))
+
+SORT_FIELDS = ('name', 'size', 'mtime')
+SORTS = SORT_FIELDS + tuple('-' + field for field in SORT_FIELDS)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def sort_key(item: Dict, sort: str) -> Tuple:
+    """
+    Total order of a listing: directories first, then by the sort field, then by name.
+    Descending sorts are served by walking the ascending order backwards, so the
+    directory group is flipped for them to stay on top.
+    """
+    field = sort.lstrip('-')
+    is_dir = item['type'] == 'directory'
+    group = int(is_dir) if sort.startswith('-') else int(not is_dir)
+    primary = item['name'].lower() if field == 'name' else item[field]
+    return (group, primary, item['name'].lower(), item['name'])
+
+
+def encode_cursor(sort: str, key: Tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort, list(key)]).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple:
+    try:
+        cursor_sort, key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise InvalidCursor("Malformed cursor")
+    if cursor_sort != sort:
+        raise InvalidCursor(f"Cursor was issued for sort '{cursor_sort}', not '{sort}'")
+    # Same shape as sort_key, or comparing it with the listing's keys raises TypeError
+    primary = str if sort.lstrip('-') == 'name' else int
+    types = (int, primary, str, str)
+    if not isinstance(key, list) or len(key) != len(types) or \
+            not all(type(value) is kind for value, kind in zip(key, types)):
+        raise InvalidCursor("Malformed cursor")
+    return tuple(key)
+
+
+class Listing:
+    """One scanned directory, with its entries ordered lazily per sort."""
+
+    def __init__(self, mtime_ns: int, items: List[Dict]):
+        self.mtime_ns = mtime_ns
+        self.items = items
+        self.scanned_at = time.monotonic()
+        digest = hashlib.sha1()
+        for item in sorted(items, key=lambda it: it['name']):
+            digest.update(f"{item['name']}\0{item['type']}\0{item['size']}\0{item['mtime']}\n".encode('utf-8', 'surrogateescape'))
+        # Content-based, so a rescan that finds nothing new keeps client caches valid
+        self.etag = digest.hexdigest()
+        self._orders: Dict[str, Tuple[List[Tuple], List[Dict]]] = {}
+
+    def order(self, sort: str) -> Tuple[List[Tuple], List[Dict]]:
+        """(ascending keys, items in the same order) for a sort field."""
+        field = sort.lstrip('-')
+        group = 'desc' if sort.startswith('-') else 'asc'
+        cached = self._orders.get(f"{group}:{field}")
+        if cached is None:
+            keyed = sorted((sort_key(item, sort), item) for item in self.items)
+            cached = ([k for k, _ in keyed], [item for _, item in keyed])
+            self._orders[f"{group}:{field}"] = cached
+        return cached
+
+    def page(self, sort: str, limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Up to limit items after the cursor and the cursor for the next page (None on the last).
+        Cursors hold the sort key of the last item returned, so pages stay consistent
+        when entries are added or removed between requests.
+        """
+        keys, items = self.order(sort)
+        descending = sort.startswith('-')
+        if descending:
+            # Walk the ascending order backwards: start below the cursor key
+            end = bisect.bisect_left(keys, decode_cursor(cursor, sort)) if cursor else len(keys)
+            start = max(0, end - limit)
+            page_keys, page = keys[start:end][::-1], items[start:end][::-1]
+            more = start > 0
+        else:
+            start = bisect.bisect_right(keys, decode_cursor(cursor, sort)) if cursor else 0
+            page_keys, page = keys[start:start + limit], items[start:start + limit]
+            more = start + limit < len(keys)
+        next_cursor = encode_cursor(sort, page_keys[-1]) if more and page_keys else None
+        return page, next_cursor
+
+
+class DirectoryIndex:
+    """
+    In-memory cache of directory listings for the library browser. A listing is reused
+    while the directory's mtime is unchanged and it is younger than the TTL, so browsing
+    costs one stat per request instead of a scandir plus a stat per entry.
+    Least recently used directories are dropped beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._listings: "OrderedDict[str, Listing]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def listing(self, directory: str, relative: str = "") -> Listing:
+        """
+        The (possibly cached) listing of directory. Entry paths are joined onto relative.
+        Raises OSError like os.scandir.
+        """
+        mtime_ns = os.stat(directory).st_mtime_ns
+        with self._lock:
+            listing = self._listings.get(directory)
+            if listing is not None and listing.mtime_ns == mtime_ns and time.monotonic() - listing.scanned_at < self.ttl:
+                self._listings.move_to_end(directory)
+                self.hits += 1
+                return listing
+            self.misses += 1
+        listing = Listing(mtime_ns, self._scan(directory, relative))
+        with self._lock:
+            self._listings[directory] = listing
+            self._listings.move_to_end(directory)
+            while len(self._listings) > self.max_entries:
+                self._listings.popitem(last=False)
+        return listing
+
+    @staticmethod
+    def _scan(directory: str, relative: str) -> List[Dict]:
+        items = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                    st = entry.stat()
+                except OSError:
+                    # Vanished or dangling symlink
+                    continue
+                items.append({
+                    "name": entry.name,
+                    "type": "directory" if is_dir else "file",
+                    "path": os.path.join(relative, entry.name),
+                    "size": 0 if is_dir else st.st_size,
+                    "mtime": int(st.st_mtime),
+                })
+        return items
+
+    def invalidate(self, directory: Optional[str] = None):
+        with self._lock:
+            if directory is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(directory, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"directories": len(self._listings), "hits": self.hits, "misses": self.misses}
+
+
+directory_index = DirectoryIndex()
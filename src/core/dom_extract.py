@@ -0,0 +1,156 @@
+# Bulk DOM extraction for YouTube Music pages.
+# Each helper runs a single execute_script call and returns plain records,
+# instead of one WebDriver round trip per element/attribute.
+
+# Album/single release links: browse pages and OL (album) playlists
+ALBUM_URL_MARKERS = ("browse/MPREb", "playlist?list=OL")
+
+POPUP_WORDS = ("no thanks", "reject", "dismiss")
+
+ALBUM_SHELF_TITLES = ("Albums", "Albümler", "Singles", "Tekliler")
+
+_TEXT_HELPERS_JS = """
+const text = (el) => el ? (el.textContent || '').replace(/\\s+/g, ' ').trim() : null;
+const shelfTitle = (el) => {
+    const shelf = el.closest('ytmusic-carousel-shelf-renderer, ytmusic-shelf-renderer, ytmusic-grid-renderer');
+    if (!shelf) return null;
+    return text(shelf.querySelector('h2.title yt-formatted-string, h2 yt-formatted-string, h2'));
+};
+"""
+
+GRID_ITEMS_JS = _TEXT_HELPERS_JS + """
+const root = arguments[0] || document;
+return Array.from(root.querySelectorAll('ytmusic-two-row-item-renderer')).map((item) => ({
+    hrefs: Array.from(item.querySelectorAll('a[href]')).map((a) => a.href),
+    title: text(item.querySelector('.title')),
+    subtitle: text(item.querySelector('.subtitle')),
+    shelf: shelfTitle(item),
+}));
+"""
+
+SHELVES_JS = _TEXT_HELPERS_JS + """
+return Array.from(document.querySelectorAll('ytmusic-carousel-shelf-renderer, ytmusic-shelf-renderer')).map((shelf) => {
+    const more = shelf.querySelector('.more-button');
+    return {
+        element: shelf,
+        title: text(shelf.querySelector('h2.title yt-formatted-string')) || '',
+        more: more && more.offsetParent !== null ? more : null,
+    };
+});
+"""
+
+SEARCH_RESULTS_JS = _TEXT_HELPERS_JS + """
+const shelves = Array.from(document.querySelectorAll('ytmusic-shelf-renderer')).map((shelf) => {
+    const first = shelf.querySelector('ytmusic-responsive-list-item-renderer');
+    return {
+        title: text(shelf.querySelector('h2.title yt-formatted-string')) || '',
+        hrefs: first ? Array.from(first.querySelectorAll('a[href]')).map((a) => a.href) : [],
+    };
+});
+const card = document.querySelector('ytmusic-card-shelf-renderer');
+let top = null;
+if (card) {
+    const link = card.querySelector('a');
+    top = {title: text(card.querySelector('.title')) || '', href: link ? (link.href || null) : null};
+}
+return {shelves: shelves, top: top};
+"""
+
+CLICK_POPUPS_JS = """
+const words = arguments[0];
+const clicked = [];
+for (const btn of document.querySelectorAll('button')) {
+    const label = (btn.innerText || '').toLowerCase();
+    if (words.some((w) => label.includes(w))) {
+        btn.click();
+        clicked.push(btn);
+    }
+}
+return clicked;
+"""
+
+
+def extract_grid_items(driver, root=None):
+    """
+    Returns one record per ytmusic-two-row-item-renderer under root (or the whole page):
+    {'hrefs': [...], 'title': str, 'subtitle': str, 'shelf': str}
+    """
+    return driver.execute_script(GRID_ITEMS_JS, root) or []
+
+
+def album_urls_from_items(items):
+    urls = []
+    for item in items:
+        for href in item.get("hrefs") or []:
+            if href and any(marker in href for marker in ALBUM_URL_MARKERS):
+                urls.append(href)
+    return urls
+
+
+def extract_shelves(driver):
+    """
+    Returns [{'element': WebElement, 'title': str, 'more': WebElement or None}] for every shelf.
+    """
+    return driver.execute_script(SHELVES_JS) or []
+
+
+def find_album_shelf(shelves):
+    for shelf in shelves:
+        title = shelf.get("title") or ""
+        # Check for English or Turkish or loose match
+        if title in ALBUM_SHELF_TITLES or "Album" in title:
+            return shelf
+    return None
+
+
+def extract_search_results(driver):
+    """
+    Returns {'shelves': [{'title', 'hrefs'}], 'top': {'title', 'href'} or None}.
+    hrefs are the links of the first item in each shelf.
+    """
+    return driver.execute_script(SEARCH_RESULTS_JS) or {"shelves": [], "top": None}
+
+
+def pick_search_result(results):
+    """
+    Chooses (url, type) from extract_search_results output, prioritizing albums over songs,
+    then falling back to the top result card.
+    """
+    album_url = None
+    song_url = None
+    for shelf in results.get("shelves") or []:
+        title = shelf.get("title", "").lower()
+        hrefs = shelf.get("hrefs") or []
+        if "albums" in title or "albümler" in title:
+            album_url = next((h for h in hrefs if h and "browse" in h), None)
+            if album_url:
+                break
+        if ("songs" in title or "şarkılar" in title) and not song_url:
+            song_url = next((h for h in hrefs if h and "watch" in h), None)
+
+    if album_url:
+        return album_url, 'album'
+    if song_url:
+        return song_url, 'song'
+
+    top = results.get("top")
+    if not top or not top.get("href"):
+        return None, None
+    link, title = top["href"], top.get("title", "").lower()
+    if "watch" in link:
+        return link, 'song'
+    if "browse" in link and "channel" not in link:
+        # Albums often have MPREb or OLAK
+        return link, 'album'
+    if "album" in title or "albüm" in title:
+        return link, 'album'
+    if "song" in title or "şarkı" in title:
+        return link, 'song'
+    return None, None
+
+
+def click_popups(driver, words=POPUP_WORDS):
+    """
+    Clicks every dismiss/reject button in one call. Returns the clicked elements.
+    """
+    return driver.execute_script(CLICK_POPUPS_JS, list(words)) or []
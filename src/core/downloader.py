@@ -1,29 +1,15 @@
 import os
-import yt_dlp
-import random
-import time
-import subprocess
-from multiprocessing import Pool, cpu_count
+import functools
+from .ytdl import ThrottledYoutubeDL
 from mutagen.mp4 import MP4, MP4Tags
+from mutagen.easymp4 import EasyMP4
 from mutagen.easyid3 import EasyID3
 from mutagen.id3 import ID3, ID3NoHeaderError
 from mutagen import File as MutagenFile
-import unicodedata
-
-def normalize_string(s):
-    """
-    Normalizes a string to ASCII, lowercased, stripped of diacritics.
-    Useful for comparing 'Oğuz Aksaç' and 'Oguz Aksac'.
-    """
-    if not s:
-        return ""
-    # Normalize unicode characters to NFD (decomposed)
-    nfd_form = unicodedata.normalize('NFD', str(s))
-    # Filter out non-spacing mark characters (diacritics)
-    normalized = "".join(c for c in nfd_form if unicodedata.category(c) != 'Mn')
-    # Collapse whitespace and lowercase
-    return " ".join(normalized.split()).lower()
-
+from .normalize import normalize_string, normalize_name
+from .library_index import tag_hash
+from .catalog import track_fields
+from .tag_writer import write_tags, cover_tag
 
 def download_album(album_url):
     """
@@ -41,129 +27,152 @@ def download_album(album_url):
         'ignoreerrors': True,
     }
     
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+    with ThrottledYoutubeDL(ydl_opts) as ydl:
         try:
             ydl.download([album_url])
         except Exception as e:
             print(f"Error downloading album {album_url}: {e}")
             print(f"Error downloading album {album_url}: {e}")
 
-def fix_metadata(filepath, main_artist):
+# Bump whenever fix_metadata's rules change, so the incremental library scan
+# re-examines files that were fixed under the old rules
+FIX_RULES_VERSION = 1
+
+def plan_tag_fixes(tags, main_artist):
+    """
+    Computes the tag changes fix_metadata would make, in one pass over the current
+    (easy) tags. Returns {key: new_values}; empty when the file is already clean.
+    1. Deduplicates Artist tag (e.g. 'Artist, Artist' -> 'Artist'), preferring main_artist's spelling
+    2. Trims whitespace around Album names
+    3. Sets Album Artist to main_artist to group albums correctly.
+    """
+    changes = {}
+    norm_main = normalize_name(main_artist) if main_artist else None
+
+    artists = tags.get('artist')
+    if artists:
+        if isinstance(artists, str):
+            artists = [artists]
+        unique_artists = []
+        seen_normalized = set()
+        for value in artists:
+            # Flatten comma separated values inside list items
+            for art in value.split(','):
+                art = art.strip()
+                norm_art = normalize_name(art)
+                if norm_art in seen_normalized:
+                    continue
+                seen_normalized.add(norm_art)
+                # A variation of the main artist is replaced by the official spelling
+                unique_artists.append(main_artist if norm_art == norm_main else art)
+        if unique_artists != list(artists):
+            changes['artist'] = unique_artists
+
+    albums = tags.get('album')
+    if albums:
+        if isinstance(albums, str):
+            albums = [albums]
+        clean_albums = [x.strip() for x in albums]
+        if clean_albums != list(albums):
+            changes['album'] = clean_albums
+
+    if main_artist:
+        current_aa = tags.get('albumartist')
+        if isinstance(current_aa, str):
+            current_aa = [current_aa]
+        if not current_aa or current_aa[0] != main_artist:
+            changes['albumartist'] = [main_artist]
+
+    return changes
+
+FIX_LABELS = {'artist': 'Artist', 'album': 'Album Name', 'albumartist': 'Album Artist'}
+
+def open_easy(filepath):
+    """
+    Opens a file with mutagen's easy tag interface, or returns None if it isn't supported audio.
+    """
+    audio = MutagenFile(filepath, easy=True)
+    if audio is None and filepath.lower().endswith('.m4a'):
+        # Type detection can fail on unusual m4a headers; the MP4 parser may still cope
+        audio = EasyMP4(filepath)
+    return audio
+
+def fix_metadata(filepath, main_artist, reserve_padding=False, dry_run=False, cover=None):
     """
-    Cleans up metadata using mutagen.
-    1. Deduplicates Artist tag (e.g. 'Artist, Artist' -> 'Artist')
-    2. Sets Album Artist to main_artist to group albums correctly.
+    Cleans up metadata using mutagen (see plan_tag_fixes for the rules).
+    The file is opened once and only written when there is something to change, in place
+    when the tag padding allows. reserve_padding writes freshly created files once to leave
+    padding for later edits; dry_run only reports what would be written. cover (image
+    bytes) is embedded as the front cover unless the file already carries it.
+    Returns {'rewritten': bool, 'changes': dict, 'in_place': bool, 'bytes_written': int, 'tag_hash': str,
+    'track': catalog fields} or None if the file could not be processed.
     """
     try:
-        audio = MutagenFile(filepath, easy=True)
+        audio = open_easy(filepath)
         if audio is None:
-            # Try manual MP4 check if auto detection failed for m4a
-            if filepath.lower().endswith('.m4a'):
-                audio = MP4(filepath)
-            else:
-                print(f"Warning: Could not open {filepath} for metadata fixing.")
-                return
-        
-        saved = False
-        
-        # 1. Fix Artist Name
-        # EasyID3/EasyMP4 keys are usually 'artist', 'albumartist', 'title', 'album'
-        
-        # Check 'artist'
-        if 'artist' in audio:
-            artists = audio['artist']
-            # It might be a list of strings or a single string
-            if isinstance(artists, list):
-                # Flatten comma separated values inside list items if any
-                raw_artists = []
-                for a in artists:
-                    raw_artists.extend([x.strip() for x in a.split(',')])
-            else:
-                raw_artists = [x.strip() for x in str(artists).split(',')]
-            
-            # Deduplicate preserving order with normalization check
-            unique_artists = []
-            seen_normalized = set()
-            
-            # If we know the main artist, add its normalized form to 'seen' 
-            # so slight variations of it are ignored/replaced by it.
-            if main_artist:
-                norm_main = normalize_string(main_artist)
-                # We don't add to seen immediately, because we want to prioritize the main_artist string 
-                # if it appears in the list, OR replace the variation with it.
-            
-            for art in raw_artists:
-                norm_art = normalize_string(art)
-                
-                # Check if this artist matches main_artist loosely
-                if main_artist and norm_art == normalize_string(main_artist):
-                    # It's a variation of the main artist. 
-                    # Use the official 'main_artist' string instead of this variation.
-                    # Only add if we haven't added the main artist yet.
-                    if norm_art not in seen_normalized:
-                        unique_artists.append(main_artist)
-                        seen_normalized.add(norm_art)
-                else:
-                    if norm_art not in seen_normalized:
-                        unique_artists.append(art)
-                        seen_normalized.add(norm_art)
-            
-            new_artist_val = unique_artists
-            
-            # If it was a list and now it's the same list, don't save. 
-            # But compare carefully.
-            
-            if new_artist_val != artists:
-                audio['artist'] = new_artist_val
-                saved = True
-                print(f"Fixed Artist: {artists} -> {new_artist_val}")
-
-        # 1.5 Fix Album Name (Trim whitespace)
-        if 'album' in audio:
-            albums = audio['album']
-            if isinstance(albums, list):
-                clean_albums = [x.strip() for x in albums]
+            print(f"Warning: Could not open {filepath} for metadata fixing.")
+            return None
+
+        changes = plan_tag_fixes(audio, main_artist)
+        embed = cover_tag(audio, cover) if cover else None
+        if embed and audio.get(embed[0]) != embed[1]:
+            changes[embed[0]] = embed[1]
+        for key, value in changes.items():
+            if embed and key == embed[0]:
+                print(f"{'Would embed' if dry_run else 'Embedded'} album art ({len(cover)} bytes)")
             else:
-                clean_albums = str(albums).strip()
-            
-            if clean_albums != albums:
-                audio['album'] = clean_albums
-                saved = True
-                print(f"Fixed Album Name: '{albums}' -> '{clean_albums}'")
-
-        # 2. Fix Album Artist
-        # If we have a main_artist context, force it as Album Artist.
-        if main_artist:
-            current_aa = audio.get('albumartist')
-            # If missing or different, update it
-            # Note: current_aa might be a list
-            if not current_aa or (isinstance(current_aa, list) and current_aa[0] != main_artist) or (isinstance(current_aa, str) and current_aa != main_artist):
-                audio['albumartist'] = main_artist
-                saved = True
-                print(f"Fixed Album Artist: '{current_aa}' -> '{main_artist}'")
-
-        if saved:
-            audio.save()
-            print(f"Metadata saved for {os.path.basename(filepath)}")
+                print(f"{'Would fix' if dry_run else 'Fixed'} {FIX_LABELS[key]}: {audio.get(key)} -> {value}")
+            audio[key] = value
+
+        write = {'in_place': True, 'bytes_written': 0}
+        if changes or reserve_padding:
+            write = write_tags(audio, reserve=reserve_padding, dry_run=dry_run)
+        if changes:
+            mode = 'in place' if write['in_place'] else 'full rewrite'
+            print(f"Metadata {'would be ' if dry_run else ''}saved for {os.path.basename(filepath)} "
+                  f"({write['bytes_written']} bytes, {mode})")
+
+        return {'rewritten': bool(changes), 'changes': changes, **write, 'tag_hash': tag_hash(audio),
+                'track': track_fields(audio)}
             
     except Exception as e:
         print(f"Error fixing metadata for {filepath}: {e}")
+        return None
 
-from .scraper import MusicScraper
+from .resolver import get_resolver
+from .ledger import open_ledger, archive_id_for, ArchiveLookup
+from .manifest import get_manifest, filter_manifest
+from .resolution_cache import ResolutionCache
+from .engine import DownloadEngine, get_profile
+from .album import AlbumState, finalize_album
+from .artwork import fetch_album_art
+from .checkpoint import current_checkpoint, TRACK_DONE, TRACK_DOWNLOADING
+from .library_scan import scan_library
+from .dedup import find_duplicates
 
 # get_artist_albums is deprecated/removed in favor of scraper
 
-def download_artist_albums(artist_url, artist_name=None, limit=None, song_limit=None, max_album_length=None, dry_run=False):
+def download_artist_albums(artist_url, artist_name=None, limit=None, song_limit=None, max_album_length=None, dry_run=False, io_workers=None, cpu_workers=None, audio_profile=None):
     """
     Main orchestrator for downloading artist albums.
     """
-    # Use headless=False because running with xvfb (virtual display)
-    # This avoids bot detection that blocks headless browsers.
-    scraper = MusicScraper(headless=False)
-    try:
-        album_urls = scraper.get_artist_albums(artist_url, artist_name)
-    finally:
-        scraper.close()
+    checkpoint = None if dry_run else current_checkpoint()
+    saved_urls = checkpoint.albums() if checkpoint else None
+    if saved_urls is not None:
+        # Resumed job: the album list was resolved (and limited) before the interruption
+        pending = checkpoint.albums(include_done=False)
+        print(f"Resuming from checkpoint: {len(saved_urls) - len(pending)} of {len(saved_urls)} albums already done.")
+        if not pending:
+            print("All albums already processed.")
+            return
+        items = [(url, artist_name, song_limit, max_album_length) for url in pending]
+        with DownloadEngine(io_workers, cpu_workers, profile=audio_profile) as engine:
+            print(f"Using {engine.io_workers} download threads and {engine.cpu_workers} post-processing workers.")
+            engine.run(download_item_wrapper, items)
+        return
+
+    # Lightweight HTTP resolver first, warm browser session as fallback
+    album_urls = get_resolver().get_artist_albums(artist_url, artist_name)
     
     print(f"Found {len(album_urls)} albums.")
     
@@ -190,26 +199,24 @@ def download_artist_albums(artist_url, artist_name=None, limit=None, song_limit=
         print("No albums found.")
         return
 
+    if checkpoint:
+        checkpoint.save_albums(album_urls)
+
     # Prepare items for download wrapper
     # Pass artist_name to enforce correct directory structure
     # Pass song_limit and max_album_length as well
     items = [(url, artist_name, song_limit, max_album_length) for url in album_urls]
 
-    with Pool(processes=cpu_count()) as pool:
-        pool.map(download_item_wrapper, items)
+    # Albums expand into tracks on a shared queue; transcode/tagging runs in a process pool
+    with DownloadEngine(io_workers, cpu_workers, profile=audio_profile) as engine:
+        print(f"Using {engine.io_workers} download threads and {engine.cpu_workers} post-processing workers.")
+        engine.run(download_item_wrapper, items)
 
-    with Pool(processes=cpu_count()) as pool:
-        pool.map(download_item_wrapper, items)
-
-def download_search_query(query, song_limit=None):
+def download_search_query(query, song_limit=None, io_workers=None, cpu_workers=None, audio_profile=None):
     """
     Searches for a query and downloads the result.
     """
-    scraper = MusicScraper(headless=False)
-    try:
-        url, result_type = scraper.get_search_results(query)
-    finally:
-        scraper.close()
+    url, result_type = get_resolver().get_search_results(query)
     
     if not url:
         print(f"No results found for query: '{query}'")
@@ -227,149 +234,179 @@ def download_search_query(query, song_limit=None):
         
         # For uniformity, let's use the wrapper but we need to fake params
         # (url, artist_name, song_limit, max_album_length)
-        download_item_wrapper((url, None, song_limit, None))
+        with DownloadEngine(io_workers, cpu_workers, profile=audio_profile) as engine:
+            engine.run(download_item_wrapper, [(url, None, song_limit, None)])
 
     elif result_type == 'song':
         # Download song
         # yt-dlp can handle song URLs same as albums usually
-        download_item_wrapper((url, None, song_limit, None))
-
-def download_item_wrapper(args):
-    """
-    Wrapper to unpack arguments for pool map.
-    args: (url, artist_name, song_limit, max_album_length)
-    """
-    url, artist_name, song_limit, max_album_length = args
-    
-    # Add a random initial delay to spread out requests when using multiprocessing
-    delay = random.uniform(2, 10)
-    print(f"Waiting {delay:.2f}s before processing {url}...")
-    time.sleep(delay)
-    
-    # Pre-check album size if max_album_length is set
-    if max_album_length:
-        print(f"Checking track count for {url} with limit {max_album_length}...")
-        try:
-            # Use subprocess to call yt-dlp CLI directly as it proved more reliable for getting playlist_count
-            # for 'browse' type URLs than the Python library in some contexts.
-            cmd = [
-                'yt-dlp',
-                '--flat-playlist',
-                '--print', '%(playlist_count)s',
-                url
-            ]
-            
-            # Run command and capture output
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            output = result.stdout.strip().split('\n')[0] # Take first line
-            
-            if output and output.isdigit():
-                track_count = int(output)
-                print(f"DEBUG: CLI reported track count: {track_count}")
-                
-                if track_count > max_album_length:
-                    print(f"Skipping {url}: Album has {track_count} tracks (Limit: {max_album_length})")
-                    return # Skip this album
-                else:
-                    print(f"Album validated: {track_count} tracks. Proceeding.")
-            else:
-                 print(f"Warning: Could not determine track count from CLI output: '{output}'. Proceeding CAUTIOUSLY.")
+        with DownloadEngine(1, 1, profile=audio_profile) as engine:
+            engine.run(download_item_wrapper, [(url, None, song_limit, None)])
 
-        except Exception as e:
-            print(f"Warning: Could not check album length for {url}: {e}. Proceeding.")
-
-    # Construct output template
+def album_output_template(artist_name=None):
     # If artist_name is known, hardcode it to avoid 'NA' or channel ID being used
     if artist_name:
-        out_template = f"music/{artist_name}/%(album,playlist_title,playlist)s/%(title)s.%(ext)s"
-    else:
-        out_template = 'music/%(artist,uploader,channel)s/%(album,playlist_title,playlist)s/%(title)s.%(ext)s'
+        return f"music/{artist_name}/%(album,playlist_title,playlist)s/%(title)s.%(ext)s"
+    return 'music/%(artist,uploader,channel)s/%(album,playlist_title,playlist)s/%(title)s.%(ext)s'
 
-     # Re-instantiate yt-dlp options here because they can't be pickled easily if we passed the object.
-     # Re-instantiate yt-dlp options here because they can't be pickled easily if we passed the object.
-    ydl_opts = {
-        'format': 'bestaudio/best',
-        'postprocessors': [
-            {'key': 'FFmpegExtractAudio','preferredcodec': 'm4a','preferredquality': '0'},
-            {'key': 'FFmpegMetadata','add_metadata': True},
-            {'key': 'EmbedThumbnail'},
-        ],
-        'outtmpl': out_template,
+def album_ydl_opts(artist_name, ledger, profile=None):
+    # No postprocessors here: finished downloads are handed to the engine's transcode/tag stages
+    profile = get_profile(profile)
+    return {
+        'format': profile['format'],  # Prefers streams that can be stream-copied into the output codec
+        'final_ext': profile['ext'],  # Lets yt-dlp spot already converted files
+        'outtmpl': album_output_template(artist_name),
         'quiet': False,
         'ignoreerrors': True,
-        'writethumbnail': True,
-        'sleep_interval': 10,       # Minimum sleep time (seconds)
-        'max_sleep_interval': 30,   # Maximum sleep time (seconds)
-        'download_archive': '/app/music/download_archive.txt', # Track downloaded files
+        'download_archive': ArchiveLookup(ledger), # Skip downloaded files; the tag stage records new ones
         'nooverwrites': True,       # Don't overwrite existing files (secondary check)
+        'allow_playlist_files': False, # Album art is fetched once per album and embedded by the tag stage
     }
-    
-    if song_limit and song_limit > 0:
-        ydl_opts['max_downloads'] = song_limit
-        
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        try:
-            # Use extract_info to get metadata and filenames
-            info = ydl.extract_info(url, download=True)
 
-            if info is None:
-                print(f"Warning: Could not extract info for {url} (returned None). Check if the video is available.")
-                return
-            
-            # Process downloaded files
-            if 'entries' in info:
-                entries = info['entries']
-            else:
-                entries = [info]
-
-            for entry in entries:
-                if not entry: continue
-                
-                # Get the final filename
-                # yt-dlp stores it in 'requested_downloads' inside entry if successful
-                if 'requested_downloads' in entry:
-                    for downloaded in entry['requested_downloads']:
-                        filepath = downloaded.get('filepath')
-                        if filepath and os.path.exists(filepath):
-                             fix_metadata(filepath, artist_name)
-                else:
-                    # Fallback: try to guess filename or check if entry has filename
-                    # This is harder reliably. 
-                    # If 'filepath' is in entry directly (sometimes happens)
-                    filepath = entry.get('filepath')
-                    if filepath and os.path.exists(filepath):
-                        fix_metadata(filepath, artist_name)
-                    
-        except Exception as e:
-            print(f"Error downloading {url}: {e}")
+def download_item_wrapper(args, engine=None):
+    """
+    Expands one album into per-track download tasks for the engine's shared queue.
+    args: (url, artist_name, song_limit, max_album_length)
+    """
+    url, artist_name, song_limit, max_album_length = args
+    if engine is None:
+        with DownloadEngine(1, 1) as engine:
+            engine.run(download_item_wrapper, [args])
+        return []
 
-def scan_and_fix_library():
+    checkpoint = current_checkpoint()
+    manifest = checkpoint.manifest(url) if checkpoint else None
+    if manifest is not None:
+        # Filtered before the interruption; only the tracks not finished since are left
+        done = {aid for aid, track in checkpoint.tracks(url).items() if track['state'] == TRACK_DONE}
+        entries = [e for e in manifest['entries'] if archive_id_for(e) not in done]
+        print(f"Resuming {url} from checkpoint: {len(manifest['entries']) - len(entries)} tracks already done.")
+        manifest = {**manifest, 'entries': entries}
+        if not entries:
+            checkpoint.album_done(url)
+            return []
+        album = AlbumState(url, manifest, artist_name, on_complete=finalize_album, checkpoint=checkpoint)
+        album.cover = fetch_album_art(manifest, len(entries))
+        return [functools.partial(download_track, album, entry, engine) for entry in entries]
+
+    ledger = open_ledger()
+    # Requests are paced by the shared rate limiter instead of fixed sleeps
+    try:
+        with ThrottledYoutubeDL(album_ydl_opts(artist_name, ledger, engine.profile_name)) as ydl:
+            # Flat-extract the track list once; filters and the downloads both use it
+            manifest, cached = get_manifest(ydl, url, ResolutionCache())
+        if not manifest:
+            print(f"Warning: Could not extract info for {url} (returned None). Check if the video is available.")
+            return []
+        print(f"Album manifest for {url}: {manifest.get('track_count')} tracks{' (cached)' if cached else ''}.")
+        manifest, reason = filter_manifest(manifest, max_album_length, song_limit, ledger)
+    except Exception as e:
+        print(f"Error downloading {url}: {e}")
+        return []
+    finally:
+        ledger.close()
+
+    if manifest is None or not manifest['entries']:
+        print(f"Skipping {url}: {reason if manifest is None else 'No tracks listed'}")
+        if checkpoint:
+            checkpoint.album_done(url)
+        return []
+    print(f"Album validated: {reason}. Proceeding.")
+
+    if checkpoint:
+        checkpoint.save_manifest(url, manifest)
+    album = AlbumState(url, manifest, artist_name, on_complete=finalize_album, checkpoint=checkpoint)
+    # One cover per album instead of a thumbnail download per track
+    album.cover = fetch_album_art(manifest, len(manifest['entries']))
+    return [functools.partial(download_track, album, entry, engine) for entry in manifest['entries']]
+
+def download_track(album, entry, engine):
+    """
+    Downloads one track of an album on the calling I/O thread. The raw file continues
+    through the engine's transcode and tag stages, which complete it on the album.
+    """
+    ledger = open_ledger()
+    handoff = engine.postprocessor(album.artist_name, album)
+    opts = album_ydl_opts(album.artist_name, ledger, engine.profile_name)
+    if album.checkpoint is not None:
+        archive_id = archive_id_for(entry)
+        partial = album.checkpoint.tracks(album.url).get(archive_id) or {}
+        if partial.get('partial_bytes') and partial.get('partial_path') and os.path.exists(partial['partial_path']):
+            # yt-dlp continues .part files by default (continuedl)
+            print(f"Resuming {entry.get('title') or archive_id} from {partial['partial_bytes']} bytes.")
+        album.checkpoint.track_state(archive_id, album.url, TRACK_DOWNLOADING)
+        opts['progress_hooks'] = [album.checkpoint.progress_hook(archive_id)]
+    try:
+        with ThrottledYoutubeDL(opts) as ydl:
+            ydl.add_post_processor(handoff, when='after_move')
+            # A one-entry playlist keeps the album fields (playlist_title etc.) for naming and tags
+            ydl.process_ie_result({**album.manifest, 'entries': [entry]}, download=True)
+    except Exception as e:
+        print(f"Error downloading {entry.get('title') or entry.get('url')}: {e}")
+    finally:
+        ledger.close()
+        if not handoff.handed_off:
+            # Failed, unavailable or already downloaded: nothing will reach the pipeline
+            album.track_done(None, entry)
+
+def record_in_ledger(ledger, entry, filepath, artist_name=None):
+    """
+    Stores file location and album/artist info for a downloaded entry in the ledger.
+    """
+    archive_id = archive_id_for(entry)
+    if not archive_id:
+        return
+    try:
+        ledger.record(
+            archive_id,
+            filepath=os.path.abspath(filepath),
+            album=entry.get('album') or entry.get('playlist_title'),
+            artist=artist_name or entry.get('artist') or entry.get('uploader'),
+        )
+    except Exception as e:
+        print(f"Warning: Could not record {archive_id} in ledger: {e}")
+
+def scan_and_fix_library(full=False, base_path='music', index=None, workers=None, io_depth=None, dry_run=False, catalog=None):
     """
     Scans music folder and fix metadata for all files.
+    Only files that are new, changed since the last scan, or fixed under older rules
+    are opened, unless full is set. Files are fixed in parallel by `workers` processes
+    with at most `io_depth` chunks in flight (lower both for spinning disks).
+    dry_run lists the planned tag changes and the write volume without touching any file.
+    The tags read along the way keep the library catalog (search and album listings) current.
     """
     print("Scanning and fixing library...")
-    base_path = 'music'
     if not os.path.exists(base_path):
         print("Music directory not found.")
         return
 
-    for root, dirs, files in os.walk(base_path):
-        for file in files:
-            # support common audio extensions
-            if file.lower().endswith(('.mp3', '.m4a', '.mp4', '.flac', '.opus', '.ogg')):
-                filepath = os.path.join(root, file)
-                
-                # Derive artist from path
-                # Path structure: music/Artist/Album/Song
-                rel = os.path.relpath(filepath, base_path)
-                parts = rel.split(os.sep)
-                
-                # parts[0] is likely Artist if structure is correct
-                if len(parts) >= 2:
-                    artist_name = parts[0]
-                    # Check if it's a known artist directory or 'Unknown' etc?
-                    # For now just pass it. fix_metadata handles logic.
-                    fix_metadata(filepath, artist_name)
-
+    stats = scan_library(base_path, FIX_RULES_VERSION, full=full, index=index, workers=workers, io_depth=io_depth,
+                         dry_run=dry_run, catalog=catalog)
+    if dry_run:
+        print(f"[DRY RUN] {stats['rewritten']} of {stats['examined']} examined files would be retagged, "
+              f"writing about {stats['bytes_written']} bytes ({stats['full_rewrites']} full rewrites).")
+        return stats
+    print(f"Library scan finished: {stats['examined']} examined, {stats['rewritten']} rewritten "
+          f"({stats['bytes_written']} bytes written, {stats['full_rewrites']} full rewrites), "
+          f"{stats['skipped']} unchanged and skipped, {stats['errors']} errors, {stats['removed']} removed from index "
+          f"({stats['files_per_second']} files/s).")
+    return stats
 
+def find_library_duplicates(base_path='music', link=False, index=None, workers=None):
+    """
+    Finds copies of the same audio across the library (e.g. in NA or channel-id folders,
+    or an album track also saved as a single), ignoring tags. With link, byte-identical
+    copies are replaced by hard links to the copy in the best named folder.
+    """
+    print("Looking for duplicate tracks...")
+    if not os.path.exists(base_path):
+        print("Music directory not found.")
+        return
 
+    stats = find_duplicates(base_path, link=link, index=index, workers=workers)
+    print(f"Duplicate scan finished: {stats['files']} files ({stats['hashed']} hashed, {stats['cached']} cached), "
+          f"{stats['duplicate_files']} duplicates in {stats['duplicate_groups']} groups "
+          f"({stats['reclaimable_bytes']} bytes), {stats['same_song_groups']} songs with different audio versions.")
+    if link:
+        print(f"Linked {stats['linked']} duplicates, reclaiming {stats['bytes_reclaimed']} bytes.")
+    return stats
@@ -0,0 +1,313 @@
+import functools
+import io
+import itertools
+import os
+import queue
+import resource
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stderr, redirect_stdout
+from multiprocessing import cpu_count
+from typing import Callable, Iterable, Optional, Tuple
+
+import yt_dlp
+from yt_dlp.postprocessor.common import PostProcessor
+
+from .album import AlbumState
+from .ledger import open_ledger
+from .log_transport import report_metrics
+from .pipeline import Pipeline, Stage, StageStats
+
+# Albums fetched at once. Mostly network waiting, so this is independent of the core count
+# and mainly bounded by how hard we want to hit the upstream.
+IO_WORKERS = int(os.environ.get("YTM_IO_WORKERS", "4"))
+# Processes for ffmpeg transcode and metadata
+CPU_WORKERS = int(os.environ.get("YTM_CPU_WORKERS", str(cpu_count())))
+# Largest worker counts a single request may ask for: the host's cores for processes,
+# a few times the default for download threads
+MAX_IO_WORKERS = int(os.environ.get("YTM_MAX_IO_WORKERS", str(IO_WORKERS * 4)))
+MAX_CPU_WORKERS = int(os.environ.get("YTM_MAX_CPU_WORKERS", str(max(CPU_WORKERS, cpu_count()))))
+# Threads fixing tags and recording finished tracks
+TAG_WORKERS = int(os.environ.get("YTM_TAG_WORKERS", "2"))
+# Capacity of the queues between stages; a full queue blocks the stage feeding it
+QUEUE_SIZE = int(os.environ.get("YTM_PIPELINE_QUEUE_SIZE", "8"))
+
+# Output profiles: which stream to download and what to turn it into. yt-dlp's ExtractAudio
+# stream-copies when the downloaded codec already matches the target, so preferring such
+# streams skips the encoder entirely.
+AUDIO_PROFILES = {
+    # AAC streams remuxed into m4a; other codecs are transcoded to AAC
+    'm4a': {'format': 'bestaudio[acodec^=mp4a]/bestaudio[ext=m4a]/bestaudio/best', 'codec': 'm4a', 'ext': 'm4a'},
+    # Opus streams kept as they are, in an .opus (Ogg) file
+    'opus': {'format': 'bestaudio[acodec=opus]/bestaudio/best', 'codec': 'opus', 'ext': 'opus'},
+    # Best stream whatever its codec, always transcoded to AAC
+    'transcode': {'format': 'bestaudio/best', 'codec': 'm4a', 'ext': 'm4a'},
+}
+AUDIO_PROFILE = os.environ.get("YTM_AUDIO_PROFILE", "m4a")
+
+# Codec families per target codec, matched against the acodec yt-dlp reports
+COPYABLE_CODECS = {'m4a': ('mp4a', 'aac'), 'opus': ('opus',)}
+
+
+def get_profile(name: Optional[str] = None) -> dict:
+    name = name or AUDIO_PROFILE
+    if name not in AUDIO_PROFILES:
+        raise ValueError(f"Unknown audio profile '{name}' (choose from {', '.join(AUDIO_PROFILES)})")
+    return AUDIO_PROFILES[name]
+
+
+def postprocessors_for(profile: dict) -> list:
+    return [
+        {'key': 'FFmpegExtractAudio', 'preferredcodec': profile['codec'], 'preferredquality': '0'},
+        {'key': 'FFmpegMetadata', 'add_metadata': True},
+    ]
+
+
+def is_stream_copy(info: dict, profile: dict) -> bool:
+    """True if the downloaded stream can be remuxed into the profile's codec without re-encoding."""
+    acodec = (info.get('acodec') or '').lower()
+    return acodec.startswith(COPYABLE_CODECS.get(profile['codec'], (profile['codec'],)))
+
+# Info dict fields the post-processors don't need; dropped before crossing the process boundary
+SKIPPED_FIELDS = {'formats', 'requested_downloads', 'requested_formats', 'entries', 'thumbnails_table'}
+
+
+def postprocess_info(info: dict, downloaded: Optional[dict] = None) -> dict:
+    """
+    Builds a picklable info dict for one downloaded file. `downloaded` is an optional
+    requested_downloads item (which only holds the fields that differ from the entry).
+    """
+    info = yt_dlp.YoutubeDL.sanitize_info({**info, **(downloaded or {})})
+    return {k: v for k, v in info.items() if not k.startswith('__') and k not in SKIPPED_FIELDS}
+
+
+def transcode_track(info: dict, profile_name: Optional[str] = None) -> Tuple[Optional[str], str, dict]:
+    """
+    Runs in the CPU pool: audio extraction (stream copy when possible) and metadata for one
+    file. Album art is embedded later by the tag stage, from the album's single cached copy.
+    Returns (final_filepath or None, captured output, {'copy': bool, 'cpu_seconds': float})
+    so the job process can log and account for it.
+    """
+    profile = get_profile(profile_name)
+    output = io.StringIO()
+    filepath = None
+    # ffmpeg runs as a child of this worker
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    with redirect_stdout(output), redirect_stderr(output):
+        try:
+            with yt_dlp.YoutubeDL({'postprocessors': postprocessors_for(profile), 'quiet': False, 'ignoreerrors': False}) as ydl:
+                info = ydl.post_process(info['filepath'], info)
+            filepath = info.get('filepath')
+            if not filepath or not os.path.exists(filepath):
+                print(f"Warning: Post-processing produced no file for {info.get('title')}")
+                filepath = None
+        except Exception as e:
+            print(f"Error post-processing {info.get('filepath')}: {e}")
+            filepath = None
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    return filepath, output.getvalue(), {'copy': is_stream_copy(info, profile), 'cpu_seconds': cpu}
+
+
+def _warm_worker(_):
+    return os.getpid()
+
+
+class HandOffPP(PostProcessor):
+    """
+    Last yt-dlp step in the download threads: hands the raw file to the engine's pipeline.
+    Blocks while the transcode queue is full.
+    """
+
+    def __init__(self, engine: "DownloadEngine", artist_name=None, album=None, downloader=None):
+        super().__init__(downloader)
+        self.engine = engine
+        self.artist_name = artist_name
+        self.album = album
+        self.handed_off = 0
+
+    def run(self, info):
+        if info.get('filepath') and os.path.exists(info['filepath']):
+            self.engine.submit(postprocess_info(info), self.artist_name, self.album)
+            self.handed_off += 1
+        return [], info
+
+
+class DownloadEngine:
+    """
+    Download → transcode → tag pipeline.
+
+    Tracks are fetched on I/O threads from a shared queue; every finished raw file goes through a bounded
+    queue to transcode workers (each driving one process of a pool sized to the cores),
+    then through another bounded queue to tagging workers that fix tags and record the
+    track in the ledger.
+    """
+
+    def __init__(self, io_workers: Optional[int] = None, cpu_workers: Optional[int] = None,
+                 tag_workers: Optional[int] = None, queue_size: Optional[int] = None,
+                 profile: Optional[str] = None):
+        self.profile_name = profile or AUDIO_PROFILE
+        self.profile = get_profile(self.profile_name)
+        self.io_workers = max(1, io_workers or IO_WORKERS)
+        self.cpu_workers = max(1, cpu_workers or CPU_WORKERS)
+        self.tag_workers = max(1, tag_workers or TAG_WORKERS)
+        self.queue_size = queue_size or QUEUE_SIZE
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self.pipeline: Optional[Pipeline] = None
+        self.downloads = StageStats("download", self.io_workers)
+        # Stream copies vs transcodes and the ffmpeg CPU time they took
+        self.audio = {"profile": self.profile_name, "copied": 0, "transcoded": 0, "cpu_seconds": 0.0}
+        self._audio_lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self):
+        if self._cpu_pool is None:
+            self._cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers)
+            # Fork the workers now, before any download threads exist
+            list(self._cpu_pool.map(_warm_worker, range(self.cpu_workers)))
+            self.pipeline = Pipeline([
+                Stage("transcode", self._transcode, self.cpu_workers, self.queue_size),
+                Stage("tag", self._tag, self.tag_workers, self.queue_size),
+            ], sources=[self.downloads]).start()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def run(self, func: Callable, items: Iterable):
+        """
+        Calls func(item, engine=self) for every item on the I/O threads.
+
+        func may return follow-up tasks (zero-argument callables, e.g. one per track of
+        an album). They go on the same shared queue, behind the remaining items, and
+        any idle thread takes the next one, so one long album doesn't leave the other
+        threads idle once the short ones are done.
+        """
+        self.start()
+        tasks: "queue.PriorityQueue" = queue.PriorityQueue()
+        seq = itertools.count()
+        for item in items:
+            # Items first: expanding albums early keeps every thread fed with tracks
+            tasks.put((0, next(seq), functools.partial(func, item, engine=self)))
+
+        def worker():
+            while True:
+                _, _, task = tasks.get()
+                if task is None:
+                    tasks.task_done()
+                    return
+                start = time.perf_counter()
+                try:
+                    for follow_up in task() or []:
+                        tasks.put((1, next(seq), follow_up))
+                except Exception as e:
+                    print(f"Error in download task: {e}")
+                finally:
+                    self.downloads.record(time.perf_counter() - start)
+                    tasks.task_done()
+
+        threads = [threading.Thread(target=worker, name=f"download-{i}", daemon=True) for i in range(self.io_workers)]
+        for thread in threads:
+            thread.start()
+        tasks.join()
+        for _ in threads:
+            tasks.put((2, next(seq), None))
+        for thread in threads:
+            thread.join()
+
+    def postprocessor(self, artist_name=None, album: Optional[AlbumState] = None) -> HandOffPP:
+        """yt-dlp post-processor that feeds downloaded files into this engine."""
+        return HandOffPP(self, artist_name, album)
+
+    def submit(self, info: dict, artist_name=None, album: Optional[AlbumState] = None):
+        """Queues a downloaded file for transcoding and tagging. Blocks while the pipeline is full."""
+        self.start()
+        self.pipeline.put({"info": info, "artist_name": artist_name, "album": album})
+        self.pipeline.report()
+
+    def _transcode(self, item: dict) -> Optional[dict]:
+        try:
+            filepath, output, result = self._run_in_pool(transcode_track, item["info"], self.profile_name)
+        except Exception:
+            # transcode_track reports its own errors; this is the pool failing (a killed
+            # worker, an unpicklable item). The album still has to hear about the track.
+            if item["album"] is not None:
+                item["album"].track_done(None, item["info"])
+            raise
+        if output:
+            print(output, end="" if output.endswith("\n") else "\n")
+        if filepath:
+            self._record_audio(result)
+        if not filepath:
+            # Never recorded in the ledger, so the next run retries it
+            if item["album"] is not None:
+                item["album"].track_done(None, item["info"])
+            return None
+        item["filepath"] = filepath
+        return item
+
+    def _run_in_pool(self, func, *args):
+        pool = self._cpu_pool
+        try:
+            return pool.submit(func, *args).result()
+        except BrokenProcessPool:
+            # A dead worker breaks the whole pool; replace it so the following tracks run
+            with self._pool_lock:
+                if self._cpu_pool is pool:
+                    print("Warning: Transcode worker died; restarting the process pool.")
+                    pool.shutdown(wait=False)
+                    self._cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers)
+            raise
+
+    def _tag(self, item: dict) -> dict:
+        from .catalog import LibraryCatalog
+        from .downloader import fix_metadata, record_in_ledger
+
+        try:
+            # SQLite connections stay on the thread that opened them
+            if getattr(self._local, "ledger", None) is None:
+                self._local.ledger = open_ledger()
+                self._local.catalog = LibraryCatalog()
+            # First write of a new file: leave tag padding so later fixes happen in place
+            cover = item["album"].cover if item["album"] is not None else None
+            result = fix_metadata(item["filepath"], item["artist_name"], reserve_padding=True, cover=cover)
+            record_in_ledger(self._local.ledger, item["info"], item["filepath"], item["artist_name"])
+            if result is not None:
+                self._record_catalog(item["filepath"], result["track"])
+        finally:
+            if item["album"] is not None:
+                item["album"].track_done(item["filepath"], item["info"])
+        return item
+
+    def _record_catalog(self, filepath: str, fields: dict):
+        try:
+            self._local.catalog.record(os.path.abspath(filepath), os.stat(filepath), fields)
+        except Exception as e:
+            # The next library scan picks the file up
+            print(f"Warning: Could not add {filepath} to the library catalog: {e}")
+
+    def _record_audio(self, result: dict):
+        with self._audio_lock:
+            self.audio["copied" if result["copy"] else "transcoded"] += 1
+            self.audio["cpu_seconds"] = round(self.audio["cpu_seconds"] + result["cpu_seconds"], 3)
+            tracks = self.audio["copied"] + self.audio["transcoded"]
+            self.audio["cpu_seconds_per_track"] = round(self.audio["cpu_seconds"] / tracks, 3)
+            data = dict(self.audio)
+        report_metrics("audio", data)
+
+    def stats(self) -> dict:
+        return self.pipeline.stats() if self.pipeline else {}
+
+    def close(self):
+        if self.pipeline is not None:
+            self.pipeline.close()
+            self.pipeline = None
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=True)
+            self._cpu_pool = None
@@ -1,4 +1,8 @@
 import multiprocessing
+import heapq
+import itertools
+import os
+import threading
 import uuid
 import time
 import sys
@@ -6,6 +10,10 @@ import traceback
 from enum import Enum
 from typing import Dict, List, Optional, Any
 from datetime import datetime
+from .config import DATA_DIR
+from .log_buffer import LogBuffer, prune_spill_files
+from .log_transport import LogTransport, set_current_transport, MSG_LOGS, MSG_METRICS, MSG_STATUS, STATUS_COMPLETED, STATUS_FAILED
+from .checkpoint import CheckpointStore, JobCheckpoint, set_current_checkpoint, resolve_func
 
 class JobStatus(str, Enum):
     QUEUED = "queued"
@@ -14,11 +22,76 @@ class JobStatus(str, Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
+TERMINAL_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+# Global number of job processes allowed to run at once
+MAX_CONCURRENT_JOBS = int(os.environ.get("YTM_MAX_CONCURRENT_JOBS", "3"))
+
+class Lane:
+    """
+    A scheduling lane with its own concurrency limit and default priority.
+    Jobs inside a lane run by priority (higher first), then FIFO.
+    """
+    def __init__(self, name: str, limit: int, default_priority: int = 0):
+        self.name = name
+        self.limit = limit
+        self.default_priority = default_priority
+        self.running: int = 0
+        self._queue: list = []
+
+    def push(self, job: "Job", seq: int):
+        heapq.heappush(self._queue, (-job.priority, seq, job))
+
+    def peek(self) -> Optional[tuple]:
+        return self._queue[0] if self._queue else None
+
+    def pop(self) -> "Job":
+        return heapq.heappop(self._queue)[2]
+
+    def remove(self, job: "Job") -> bool:
+        for i, entry in enumerate(self._queue):
+            if entry[2] is job:
+                self._queue.pop(i)
+                heapq.heapify(self._queue)
+                return True
+        return False
+
+    def has_capacity(self) -> bool:
+        return self.running < self.limit
+
+    def queued_jobs(self) -> List["Job"]:
+        return [entry[2] for entry in sorted(self._queue, key=lambda e: (e[0], e[1]))]
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "running": self.running,
+            "queued": len(self._queue),
+        }
+
+# Interactive searches get more slots and a higher priority than bulk work
+DEFAULT_LANES = {
+    "search": (int(os.environ.get("YTM_SEARCH_LANE_LIMIT", "2")), 10),
+    "artist": (int(os.environ.get("YTM_ARTIST_LANE_LIMIT", "1")), 0),
+    "library_scan": (int(os.environ.get("YTM_SCAN_LANE_LIMIT", "1")), -10),
+}
+DEFAULT_LANE = "default"
+
+# Spill files of the per-job log buffers
+LOG_DIR = os.path.join(DATA_DIR, "logs")
+
+# Error recorded for jobs that were queued or running when the server went down
+INTERRUPTED_ERROR = "Interrupted by a server restart"
+
 class Job:
-    def __init__(self, job_type: str, target: str, args: tuple = (), kwargs: dict = {}):
-        self.id: str = str(uuid.uuid4())
+    def __init__(self, job_type: str, target: str, args: tuple = (), kwargs: dict = {}, priority: int = 0,
+                 job_id: Optional[str] = None):
+        self.id: str = job_id or str(uuid.uuid4())
         self.job_type: str = job_type
         self.target: str = target
+        self.lane: str = job_type
+        self.priority: int = priority
         self.status: JobStatus = JobStatus.QUEUED
         self.created_at: float = time.time()
         self.started_at: Optional[float] = None
@@ -26,69 +99,75 @@ class Job:
         self.process: Optional[multiprocessing.Process] = None
         # Queue for sending logs from child process to parent
         self.log_queue: multiprocessing.Queue = multiprocessing.Queue()
-        self.logs: List[str] = []
+        # Bounded in memory; older lines spill to a compressed per-job file
+        self.logs: LogBuffer = LogBuffer(os.path.join(LOG_DIR, f"{self.id}.log.gz"))
         self.args = args
         self.kwargs = kwargs
+        # Kept so the job can be resumed after it stopped
+        self.func = None
         self.error: Optional[str] = None
+        # Latest in-place progress line (e.g. yt-dlp download bar)
+        self.progress: Optional[str] = None
+        # Structured metrics reported by the job process, by section
+        self.metrics: Dict[str, Any] = {}
 
     def to_dict(self):
         return {
             "id": self.id,
             "job_type": self.job_type,
             "target": self.target,
+            "lane": self.lane,
+            "priority": self.priority,
             "status": self.status,
             "created_at": self.created_at,
             "started_at": self.started_at,
             "completed_at": self.completed_at,
-            "error": self.error
+            "error": self.error,
+            "progress": self.progress,
+            "metrics": self.metrics,
+            "log_count": len(self.logs)
         }
 
-class LogCapture:
-    def __init__(self, queue, original_stream=None):
-        self.queue = queue
-        self.original_stream = original_stream
-
-    def write(self, msg):
-        # Write to queue
-        if msg.strip(): # Avoid empty newlines
-            self.queue.put(msg)
-        
-        # Write to original stream (stdout/stderr) so it appears in docker logs
-        if self.original_stream:
-            try:
-                self.original_stream.write(msg)
-                self.original_stream.flush() # Ensure it appears immediately
-            except:
-                pass
-
-    def flush(self):
-        if self.original_stream:
-            self.original_stream.flush()
-
-def worker_wrapper(job_id, queue, func, *args, **kwargs):
+def worker_wrapper(job_id, queue, checkpoint_path, func, *args, **kwargs):
     """
     Wrapper to run in the separate process.
-    Redirects stdout/stderr to the queue.
+    Redirects stdout/stderr to a batching transport over the queue.
+    With a checkpoint_path, the job records its progress there so it can be resumed.
     """
     # Capture original streams before replacing
     orig_stdout = sys.__stdout__
     orig_stderr = sys.__stderr__
 
-    # Redirect stdout/stderr
-    sys.stdout = LogCapture(queue, orig_stdout)
-    sys.stderr = LogCapture(queue, orig_stderr)
+    # Redirect stdout/stderr; both share one transport so ordering is kept
+    transport = LogTransport(queue)
+    transport.start()
+    set_current_transport(transport)
+    sys.stdout = transport.stream(orig_stdout)
+    sys.stderr = transport.stream(orig_stderr)
     
+    checkpoint = None
+    if checkpoint_path:
+        checkpoint = JobCheckpoint(job_id, CheckpointStore(checkpoint_path))
+        set_current_checkpoint(checkpoint)
+
     print(f"Job {job_id} started processing.")
     
     try:
         func(*args, **kwargs)
         print(f"Job {job_id} completed successfully.")
-        queue.put("JOB_COMPLETE")
+        if checkpoint is not None:
+            # Nothing left to resume
+            try:
+                checkpoint.clear()
+            except Exception as e:
+                print(f"Warning: Could not clear checkpoint: {e}")
+        transport.send_status(STATUS_COMPLETED)
     except Exception as e:
         print(f"Job {job_id} failed: {e}")
         traceback.print_exc()
-        queue.put("JOB_FAILED")
-        queue.put(str(e))
+        transport.send_status(STATUS_FAILED, str(e))
+    finally:
+        transport.close()
 
 class JobManager:
     _instance = None
@@ -101,21 +180,188 @@ class JobManager:
 
     def _init(self):
         self.jobs: Dict[str, Job] = {}
-        # We need a way to monitor queues. 
-        # In a real heavy app, we might use a dedicated thread/process for monitoring.
-        # For now, we'll rely on polling or on-demand checking when client asks for logs.
-        # BUT, to detect completion/failure properly without client interaction, 
-        # we strictly need a background thread monitoring active jobs.
-        pass
-
-    def create_job(self, job_type: str, target: str, func, *args, **kwargs) -> str:
-        job = Job(job_type, target, args, kwargs)
-        self.jobs[job.id] = job
-        
-        # Start immediately for now (simple queue)
-        self._start_job(job, func)
+        self.max_concurrent: int = MAX_CONCURRENT_JOBS
+        self.lanes: Dict[str, Lane] = {
+            name: Lane(name, limit, priority) for name, (limit, priority) in DEFAULT_LANES.items()
+        }
+        self.lanes[DEFAULT_LANE] = Lane(DEFAULT_LANE, 1)
+        self._funcs: Dict[str, Any] = {}
+        self._seq = itertools.count()
+        self._running: int = 0
+        self._lock = threading.RLock()
+        self._subscribers: List["Subscription"] = []
+        self._monitor: Optional["JobMonitor"] = None
+        # Persistent job records and progress; None keeps jobs in memory only
+        self.store: Optional[CheckpointStore] = None
+
+    def enable_checkpoints(self, store: Optional[CheckpointStore] = None):
+        """
+        Persists jobs and their progress so they survive restarts and can be resumed.
+        """
+        self.store = store or CheckpointStore()
+
+    def _persist(self, job: Job):
+        if self.store is None or getattr(job, "_persisted_status", None) == job.status:
+            return
+        try:
+            if getattr(job, "_persisted_status", None) is None:
+                self.store.save_job(job.id, job.job_type, job.target, job.func, job.args, job.kwargs,
+                                    job.priority, job.status.value)
+            self.store.set_job_status(job.id, job.status.value, job.error)
+            job._persisted_status = job.status
+        except Exception as e:
+            print(f"Warning: Could not checkpoint job {job.id}: {e}")
+
+    def configure(self, max_concurrent: Optional[int] = None, lane_limits: Optional[Dict[str, int]] = None):
+        """
+        Adjusts the global budget and per-lane limits, then starts any jobs that now fit.
+        """
+        with self._lock:
+            if max_concurrent is not None:
+                self.max_concurrent = max_concurrent
+            for name, limit in (lane_limits or {}).items():
+                if name in self.lanes:
+                    self.lanes[name].limit = limit
+                else:
+                    self.lanes[name] = Lane(name, limit)
+            self._schedule()
+
+    def create_job(self, job_type: str, target: str, func, *args, priority: Optional[int] = None, **kwargs) -> str:
+        with self._lock:
+            lane = self.lanes.get(job_type) or self.lanes[DEFAULT_LANE]
+            job = Job(job_type, target, args, kwargs, lane.default_priority if priority is None else priority)
+            job.func = func
+            self.jobs[job.id] = job
+            self._enqueue(job)
         return job.id
 
+    def _enqueue(self, job: Job):
+        with self._lock:
+            lane = self.lanes.get(job.job_type) or self.lanes[DEFAULT_LANE]
+            job.lane = lane.name
+            self._funcs[job.id] = job.func
+
+            # Job stays QUEUED until the scheduler finds a free slot
+            lane.push(job, next(self._seq))
+            self._publish_job(job)
+            self._schedule()
+
+    def resume_job(self, job_id: str) -> Optional[Job]:
+        """
+        Re-queues a failed, cancelled or interrupted job under the same id. With checkpoints
+        enabled it picks up after the last finished album/track instead of starting over.
+        Returns None if the job is unknown or still queued/running.
+        """
+        with self._lock:
+            job = self.jobs.get(job_id) or self._load_job(job_id)
+            if job is None or job.status not in (JobStatus.FAILED, JobStatus.CANCELLED):
+                return None
+            if job.process is not None and job.process.is_alive():
+                return None
+            job.status = JobStatus.QUEUED
+            job.started_at = None
+            job.completed_at = None
+            job.error = None
+            job.progress = None
+            job.process = None
+            job.log_queue = multiprocessing.Queue()
+            job._slot_released = False
+            job._monitor_done = False
+            job.logs.append("Resuming job from checkpoint." if self.store is not None else "Restarting job.")
+            self.jobs[job.id] = job
+            self._enqueue(job)
+        return job
+
+    def _load_job(self, job_id: str) -> Optional[Job]:
+        if self.store is None:
+            return None
+        record = self.store.get_job(job_id)
+        if record is None:
+            return None
+        return self._job_from_record(record)
+
+    def _job_from_record(self, record: dict) -> Optional[Job]:
+        try:
+            func = resolve_func(record["func"])
+        except Exception as e:
+            print(f"Warning: Cannot restore job {record['id']}: {e}")
+            return None
+        job = Job(record["job_type"], record["target"], tuple(record["args"]), record["kwargs"],
+                  record["priority"], job_id=record["id"])
+        job.func = func
+        job.status = JobStatus(record["status"])
+        job.created_at = record["created_at"]
+        job.error = record["error"]
+        job._persisted_status = job.status
+        return job
+
+    def recover_interrupted(self) -> List[Job]:
+        """
+        Loads the jobs that were queued or running when the server stopped, as failed
+        jobs that can be resumed.
+        """
+        if self.store is None:
+            return []
+        recovered = []
+        with self._lock:
+            for record in self.store.jobs_with_status((JobStatus.QUEUED.value, JobStatus.RUNNING.value)):
+                if record["id"] in self.jobs:
+                    continue
+                job = self._job_from_record(record)
+                if job is None:
+                    continue
+                job.status = JobStatus.FAILED
+                job.error = INTERRUPTED_ERROR
+                job.completed_at = time.time()
+                job.logs.append(f"{INTERRUPTED_ERROR}; resume the job to continue.")
+                self.jobs[job.id] = job
+                self._persist(job)
+                recovered.append(job)
+        return recovered
+
+    def prune_logs(self) -> int:
+        """
+        Deletes log spill files past the retention limits, keeping those of loaded jobs.
+        """
+        with self._lock:
+            keep = [job.logs.spill_path for job in self.jobs.values() if job.logs.spill_path]
+        return prune_spill_files(LOG_DIR, keep=keep)
+
+    def _schedule(self):
+        """
+        Starts queued jobs while the global budget allows.
+        Picks the highest priority head among lanes that have a free slot,
+        falling back to submission order between equal priorities.
+        """
+        with self._lock:
+            while self._running < self.max_concurrent:
+                best = None
+                for lane in self.lanes.values():
+                    head = lane.peek()
+                    if head is None or not lane.has_capacity():
+                        continue
+                    if best is None or head[:2] < best[1][:2]:
+                        best = (lane, head)
+                if best is None:
+                    return
+                lane = best[0]
+                job = lane.pop()
+                lane.running += 1
+                self._running += 1
+                self._start_job(job, self._funcs.pop(job.id))
+
+    def _release_slot(self, job: Job):
+        """
+        Frees the lane/global slot held by a finished job and starts the next one.
+        """
+        with self._lock:
+            if job.started_at is None or getattr(job, "_slot_released", False):
+                return
+            job._slot_released = True
+            self.lanes[job.lane].running -= 1
+            self._running -= 1
+            self._schedule()
+
     def _start_job(self, job: Job, func):
         job.status = JobStatus.RUNNING
         job.started_at = time.time()
@@ -125,72 +371,250 @@ class JobManager:
         # Our download functions are top-level module functions, so they should picklable.
         job.process = multiprocessing.Process(
             target=worker_wrapper,
-            args=(job.id, job.log_queue, func, *job.args),
+            args=(job.id, job.log_queue, self.store.path if self.store else None, func, *job.args),
             kwargs=job.kwargs
         )
-        job.process.start()
+        try:
+            job.process.start()
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.completed_at = time.time()
+            job.error = str(e)
+            # Never started: nothing for the monitor to poll or join
+            job.process = None
+            self._release_slot(job)
+        self._ensure_monitor()
+        self._publish_job(job)
+
+    def scheduler_state(self) -> dict:
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "running": self._running,
+                "lanes": [lane.to_dict() for lane in self.lanes.values()],
+            }
+
+    def queue_position(self, job: Job) -> Optional[int]:
+        """
+        1-based position of a queued job inside its lane, None once it started.
+        """
+        with self._lock:
+            if job.status != JobStatus.QUEUED:
+                return None
+            queued = self.lanes[job.lane].queued_jobs()
+            return queued.index(job) + 1 if job in queued else None
 
     def get_job(self, job_id: str) -> Optional[Job]:
         return self.jobs.get(job_id)
 
     def list_jobs(self) -> List[Job]:
-        # Update logs/status for all jobs before returning
-        # This ensures UI polling reflects current state without needing to open logs
-        for job_id in list(self.jobs.keys()):
-            self.update_job_logs(job_id)
-            
-        # Sort by reverse created_at
-        return sorted(self.jobs.values(), key=lambda x: x.created_at, reverse=True)
+        # Snapshot only: the monitor thread keeps status and logs up to date
+        return sorted(list(self.jobs.values()), key=lambda x: x.created_at, reverse=True)
 
     def cancel_job(self, job_id: str) -> bool:
         job = self.jobs.get(job_id)
         if not job:
             return False
-        
-        if job.status == JobStatus.RUNNING and job.process and job.process.is_alive():
-            job.process.terminate()
-            job.status = JobStatus.CANCELLED
-            job.completed_at = time.time()
-            job.logs.append("Job cancelled by user.")
-            return True
+
+        with self._lock:
+            if job.status == JobStatus.QUEUED:
+                self.lanes[job.lane].remove(job)
+                self._funcs.pop(job.id, None)
+                job.status = JobStatus.CANCELLED
+                job.completed_at = time.time()
+                job.logs.append("Job cancelled by user before it started.")
+                self._publish_job(job)
+                return True
+
+            if job.status == JobStatus.RUNNING and job.process and job.process.is_alive():
+                job.process.terminate()
+                job.status = JobStatus.CANCELLED
+                job.completed_at = time.time()
+                job.logs.append("Job cancelled by user.")
+                self._release_slot(job)
+                self._publish_job(job)
+                return True
         return False
 
-    def update_job_logs(self, job_id: str):
+    # Monitoring
+
+    def _ensure_monitor(self):
+        # Started lazily so that importing this module in a child process does not spawn threads
+        if self._monitor is None or not self._monitor.is_alive():
+            self._monitor = JobMonitor(self)
+            self._monitor.start()
+
+    def subscribe(self, job_id: Optional[str] = None) -> "Subscription":
         """
-        Reads from queue and updates job.logs.
-        Should be called periodically or before returning logs.
-        Also checks process status.
+        Registers an asyncio subscriber for job events (optionally a single job).
+        Must be called from inside a running event loop.
         """
-        job = self.jobs.get(job_id)
-        if not job:
-            return
+        sub = Subscription(self, job_id)
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: "Subscription"):
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def _publish(self, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if sub.job_id is None or sub.job_id == event.get("job_id"):
+                if not sub.offer(event):
+                    self.unsubscribe(sub)
+
+    def _publish_job(self, job: Job):
+        # Every status change is published, so this is where it gets persisted
+        self._persist(job)
+        self._publish({"type": "job", "job_id": job.id, "job": job.to_dict()})
 
-        # Drain queue
-        while not job.log_queue.empty():
+    def _drain(self, job: Job) -> int:
+        """
+        Moves pending messages from the child queue into the job record.
+        Returns the number of new log lines. Only the monitor thread calls this.
+        """
+        new_lines = 0
+        while True:
             try:
                 msg = job.log_queue.get_nowait()
-                if msg == "JOB_COMPLETE":
-                    job.status = JobStatus.COMPLETED
-                    job.completed_at = time.time()
-                elif msg == "JOB_FAILED":
-                    job.status = JobStatus.FAILED
-                    job.completed_at = time.time()
-                    # Next msg might be error details, handled by loop
-                else:
-                    job.logs.append(msg)
-            except:
+            except Exception:
                 break
-        
-        # Check process liveness as fallback
-        if job.status == JobStatus.RUNNING and job.process:
-            if not job.process.is_alive():
-                # Process died but maybe didn't send complete signal (e.g. segfault or killed)
-                # Give it a moment for queue to drain in next cycle? 
-                # For now, mark as completed if not failed/cancelled?
-                # Let's assume if it's dead and status is still RUNNING, something weird happened 
-                # OR we just haven't processed the completion msg yet. 
-                # We'll leave it unless it stays stale.
+            if not isinstance(msg, dict):
+                job.logs.append(str(msg))
+                new_lines += 1
+            elif msg["type"] == MSG_LOGS:
+                for line in msg["lines"]:
+                    job.logs.append(line)
+                new_lines += len(msg["lines"])
+                if msg.get("progress"):
+                    job.progress = msg["progress"]
+                    new_lines += 1
+            elif msg["type"] == MSG_METRICS:
+                job.metrics[msg["section"]] = msg["data"]
+                job._metrics_changed = True
+            elif msg["type"] == MSG_STATUS:
+                if job.status == JobStatus.RUNNING:
+                    job.status = JobStatus.COMPLETED if msg["status"] == STATUS_COMPLETED else JobStatus.FAILED
+                    job.completed_at = time.time()
+                if msg.get("error"):
+                    job.error = msg["error"]
+                self._release_slot(job)
+        return new_lines
+
+    def _poll_job(self, job: Job) -> bool:
+        """
+        Drains a running job and detects completion or a dead process.
+        Returns True while the job still needs monitoring.
+        """
+        before = job.status
+        new_lines = self._drain(job)
+
+        alive = job.process is not None and job.process.is_alive()
+        if not alive and job.process is not None:
+            # The process may have sent its final messages right before exiting
+            new_lines += self._drain(job)
+            if job.status == JobStatus.RUNNING:
+                exitcode = job.process.exitcode
+                job.status = JobStatus.FAILED if exitcode else JobStatus.COMPLETED
+                job.completed_at = time.time()
+                if exitcode:
+                    job.error = job.error or f"Job process exited unexpectedly (exit code {exitcode})"
+                    job.logs.append(job.error)
+                    new_lines += 1
+            self._release_slot(job)
+
+        if new_lines:
+            self._publish({"type": "logs", "job_id": job.id, "count": len(job.logs)})
+        if job.status != before or getattr(job, "_metrics_changed", False):
+            job._metrics_changed = False
+            self._publish_job(job)
+
+        if not alive:
+            # Only a started process can be joined
+            if job.process is not None and job.process.pid is not None:
+                job.process.join(timeout=0)
+            return False
+        return True
+
+    def _active_jobs(self) -> List[Job]:
+        with self._lock:
+            return [j for j in self.jobs.values() if j.process is not None and not getattr(j, "_monitor_done", False)]
+
+
+class Subscription:
+    """
+    Bridges monitor-thread events into an asyncio.Queue owned by one websocket.
+    """
+    def __init__(self, manager: JobManager, job_id: Optional[str] = None, maxsize: int = 1000):
+        import asyncio
+        self.manager = manager
+        self.job_id = job_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, event: dict) -> bool:
+        """Called from the monitor thread. Returns False if the loop is gone."""
+        if self.loop.is_closed():
+            return False
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            return False
+        return True
+
+    def _put(self, event: dict):
+        # Slow consumers lose intermediate events; they re-read snapshots anyway
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except Exception:
                 pass
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        import asyncio
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def drain(self) -> List[dict]:
+        events = []
+        while not self.queue.empty():
+            events.append(self.queue.get_nowait())
+        return events
+
+    def close(self):
+        self.manager.unsubscribe(self)
+
+
+class JobMonitor(threading.Thread):
+    """
+    Single background thread that owns all child queues and process handles.
+    Detects completion/crashes and publishes changes to subscribers.
+    """
+    def __init__(self, manager: JobManager, interval: float = 0.2):
+        super().__init__(name="job-monitor", daemon=True)
+        self.manager = manager
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            for job in self.manager._active_jobs():
+                try:
+                    if not self.manager._poll_job(job):
+                        job._monitor_done = True
+                except Exception as e:
+                    print(f"Job monitor error for {job.id}: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
 
 # Global instance
 job_manager = JobManager()
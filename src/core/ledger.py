@@ -0,0 +1,228 @@
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+from .config import LEDGER_PATH, LEGACY_ARCHIVE_PATH, journal_mode
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    extractor TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    filepath TEXT,
+    album TEXT,
+    artist TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (extractor, video_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_downloads_artist_album ON downloads (artist, album);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def split_archive_id(archive_id):
+    """
+    Splits a yt-dlp archive id ('youtube abc123') into (extractor, video_id).
+    """
+    extractor, _, video_id = archive_id.strip().partition(" ")
+    return extractor.lower(), video_id.strip()
+
+
+def archive_id_for(info):
+    """
+    Builds the yt-dlp archive id for an info dict, same format as yt-dlp's make_archive_id.
+    """
+    extractor = info.get("extractor_key") or info.get("ie_key") or info.get("extractor") or ""
+    video_id = info.get("id")
+    if not extractor or not video_id:
+        return None
+    return f"{extractor.lower()} {video_id}"
+
+
+class DownloadLedger:
+    """
+    SQLite-backed record of downloaded tracks.
+
+    Plugs into yt-dlp as `download_archive`: yt-dlp only needs `in` and `add()`
+    on a non-path archive object, so lookups become indexed queries instead of
+    a full read of a shared text file. Safe to use from many processes at once
+    (WAL mode, one connection per process).
+    """
+
+    def __init__(self, path: str = LEDGER_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reopen in each process
+        if self._conn is None or self._pid != os.getpid():
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute(f"PRAGMA journal_mode={journal_mode(self.path)}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    # yt-dlp archive protocol
+
+    def __contains__(self, archive_id) -> bool:
+        # yt-dlp asks about None when it can't build an id for an entry
+        if not archive_id:
+            return False
+        extractor, video_id = split_archive_id(archive_id)
+        row = self.conn.execute(
+            "SELECT 1 FROM downloads WHERE extractor = ? AND video_id = ?",
+            (extractor, video_id),
+        ).fetchone()
+        return row is not None
+
+    def __bool__(self) -> bool:
+        # yt-dlp skips the lookup entirely when the archive is falsy
+        return True
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM downloads").fetchone()[0]
+
+    def add(self, archive_id):
+        extractor, video_id = split_archive_id(archive_id)
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR IGNORE INTO downloads (extractor, video_id, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (extractor, video_id, now, now),
+        )
+
+    # Query API
+
+    def record(self, archive_id, filepath=None, album=None, artist=None):
+        """
+        Inserts or updates a track with its file location and album/artist info.
+        """
+        extractor, video_id = split_archive_id(archive_id)
+        now = time.time()
+        self.conn.execute(
+            """
+            INSERT INTO downloads (extractor, video_id, filepath, album, artist, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (extractor, video_id) DO UPDATE SET
+                filepath = COALESCE(excluded.filepath, filepath),
+                album = COALESCE(excluded.album, album),
+                artist = COALESCE(excluded.artist, artist),
+                updated_at = excluded.updated_at
+            """,
+            (extractor, video_id, filepath, album, artist, now, now),
+        )
+
+    def get(self, archive_id) -> Optional[Dict]:
+        extractor, video_id = split_archive_id(archive_id)
+        cur = self.conn.execute(
+            "SELECT * FROM downloads WHERE extractor = ? AND video_id = ?",
+            (extractor, video_id),
+        )
+        row = cur.fetchone()
+        return self._row_to_dict(cur, row) if row else None
+
+    def find(self, artist: Optional[str] = None, album: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[Dict]:
+        clauses, params = [], []
+        if artist is not None:
+            clauses.append("artist = ?")
+            params.append(artist)
+        if album is not None:
+            clauses.append("album = ?")
+            params.append(album)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cur = self.conn.execute(
+            f"SELECT * FROM downloads {where} ORDER BY updated_at DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        )
+        return [self._row_to_dict(cur, row) for row in cur.fetchall()]
+
+    def remove(self, archive_id) -> bool:
+        extractor, video_id = split_archive_id(archive_id)
+        cur = self.conn.execute(
+            "DELETE FROM downloads WHERE extractor = ? AND video_id = ?",
+            (extractor, video_id),
+        )
+        return cur.rowcount > 0
+
+    def import_text_archive(self, archive_path: str) -> int:
+        """
+        Imports a yt-dlp text archive (one 'extractor id' per line). Returns rows added.
+        """
+        if not os.path.exists(archive_path):
+            return 0
+        now = time.time()
+        rows = []
+        with open(archive_path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                extractor, video_id = split_archive_id(line)
+                # Skip blank and corrupted (interleaved) lines
+                if extractor and video_id and " " not in video_id:
+                    rows.append((extractor, video_id, now, now))
+        before = len(self)
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO downloads (extractor, video_id, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        return len(self) - before
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._pid = None
+
+    @staticmethod
+    def _row_to_dict(cur, row) -> Dict:
+        return {col[0]: value for col, value in zip(cur.description, row)}
+
+
+class ArchiveLookup:
+    """
+    Lookup-only download_archive for yt-dlp. yt-dlp would mark tracks as done
+    right after the download; with the pipeline a track only counts once it has
+    been transcoded and tagged, which the tag stage records via DownloadLedger.record.
+    """
+
+    def __init__(self, ledger: DownloadLedger):
+        self.ledger = ledger
+
+    def __contains__(self, archive_id) -> bool:
+        return archive_id in self.ledger
+
+    def __bool__(self) -> bool:
+        return True
+
+    def add(self, archive_id):
+        pass
+
+
+def open_ledger(path: str = LEDGER_PATH, legacy_archive: Optional[str] = LEGACY_ARCHIVE_PATH) -> DownloadLedger:
+    """
+    Opens the ledger, importing the legacy download_archive.txt the first time.
+    """
+    ledger = DownloadLedger(path)
+    if legacy_archive and not ledger.get_meta("legacy_archive_imported"):
+        added = ledger.import_text_archive(legacy_archive)
+        ledger.set_meta("legacy_archive_imported", str(time.time()))
+        if added:
+            print(f"Imported {added} entries from {legacy_archive} into the download ledger.")
+    return ledger
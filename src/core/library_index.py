@@ -0,0 +1,139 @@
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterable, Optional, Set
+
+from .config import DATA_DIR, journal_mode
+
+LIBRARY_INDEX_PATH = os.path.join(DATA_DIR, "library_index.db")
+
+AUDIO_EXTENSIONS = ('.mp3', '.m4a', '.mp4', '.flac', '.opus', '.ogg')
+
+# Binary tags (cover art) don't take part in the tag hash
+BINARY_TAGS = ('cover', 'covr', 'APIC', 'metadata_block_picture')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    tag_hash TEXT,
+    fix_version INTEGER NOT NULL,
+    scanned_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def tag_hash(audio) -> Optional[str]:
+    """
+    Stable digest of a mutagen file's text tags, used to tell tag changes apart.
+    """
+    if audio is None or audio.tags is None:
+        return None
+    digest = hashlib.sha1()
+    for key in sorted(audio.keys()):
+        if key.startswith(BINARY_TAGS):
+            continue
+        digest.update(f"{key}={audio[key]!r}\n".encode("utf-8", "replace"))
+    return digest.hexdigest()
+
+
+class LibraryIndex:
+    """
+    Persistent file-state index of the music library: (path, inode, size, mtime,
+    tag hash, fix version) for every file the scan has fixed. Lets the scan skip
+    files that haven't changed since the last run under the same fix rules.
+    """
+
+    def __init__(self, path: str = LIBRARY_INDEX_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reopen in each process
+        if self._conn is None or self._pid != os.getpid():
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute(f"PRAGMA journal_mode={journal_mode(self.path)}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    @contextmanager
+    def transaction(self):
+        self.conn.execute("BEGIN")
+        try:
+            yield self.conn
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def lookup(self, path: str) -> Optional[dict]:
+        row = self.conn.execute(
+            "SELECT inode, size, mtime_ns, tag_hash, fix_version, scanned_at FROM files WHERE path = ?",
+            (path,),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("inode", "size", "mtime_ns", "tag_hash", "fix_version", "scanned_at"), row))
+
+    def is_current(self, path: str, st: os.stat_result, fix_version: int) -> bool:
+        """True if the file is unchanged since it was last fixed under the same rules."""
+        row = self.lookup(path)
+        return (
+            row is not None
+            and row["fix_version"] == fix_version
+            and row["inode"] == st.st_ino
+            and row["size"] == st.st_size
+            and row["mtime_ns"] == st.st_mtime_ns
+        )
+
+    def record_many(self, rows: Iterable[tuple]):
+        """
+        Stores (path, stat_result, tag_hash, fix_version) rows in one transaction.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO files (path, inode, size, mtime_ns, tag_hash, fix_version, scanned_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(path, st.st_ino, st.st_size, st.st_mtime_ns, digest, version, now)
+                 for path, st, digest, version in rows],
+            )
+
+    def record(self, path: str, st: os.stat_result, digest: Optional[str], fix_version: int):
+        self.record_many([(path, st, digest, fix_version)])
+
+    def paths(self, prefix: str = "") -> Set[str]:
+        if not prefix:
+            return {row[0] for row in self.conn.execute("SELECT path FROM files")}
+        # Range scan on the primary key instead of LIKE, which would need escaping
+        return {row[0] for row in self.conn.execute(
+            "SELECT path FROM files WHERE path >= ? AND path < ?", (prefix, prefix + "\U0010ffff"))}
+
+    def prune(self, seen: Set[str], prefix: str = "") -> int:
+        """Drops entries under prefix for files that no longer exist. Returns the number removed."""
+        gone = self.paths(prefix) - seen
+        if gone:
+            with self.transaction() as conn:
+                conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in gone])
+        return len(gone)
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._pid = None
@@ -0,0 +1,232 @@
+import io
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import redirect_stderr, redirect_stdout
+from multiprocessing import cpu_count
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .catalog import LibraryCatalog
+from .library_index import AUDIO_EXTENSIONS, LibraryIndex
+from .log_transport import report_metrics
+
+# Processes fixing tags. On spinning disks 1-2 avoids seek thrashing; SSDs take the core count
+SCAN_WORKERS = int(os.environ.get("YTM_SCAN_WORKERS", str(cpu_count())))
+# Chunks in flight at once across the pool (the I/O queue depth the scan puts on the disk)
+SCAN_IO_DEPTH = int(os.environ.get("YTM_SCAN_IO_DEPTH", "0")) or None
+# Files handed to a worker at a time
+SCAN_CHUNK_SIZE = int(os.environ.get("YTM_SCAN_CHUNK_SIZE", "64"))
+# Index rows written per transaction
+SCAN_BATCH_SIZE = 500
+# Minimum seconds between progress reports
+REPORT_INTERVAL = 1.0
+
+
+def walk_audio_files(base_path: str) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """
+    Yields (path, artist_name, stat) for audio files at least one folder below base_path
+    (music/Artist/...), streaming with os.scandir. Hidden folders (.ytm state) are skipped.
+    """
+    stack = [(base_path, None)]
+    while stack:
+        directory, artist_name = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            print(f"Error reading {directory}: {e}")
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append((entry.path, artist_name or entry.name))
+                elif artist_name and entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                    yield entry.path, artist_name, entry.stat()
+            except OSError as e:
+                print(f"Error reading {entry.path}: {e}")
+        # Depth-first, in name order
+        stack.extend(reversed(subdirs))
+
+
+def fix_chunk(chunk: List[Tuple[str, str]], dry_run: bool = False) -> Tuple[List[Tuple[str, Optional[Dict], Optional[os.stat_result]]], str]:
+    """
+    Runs in the scan pool: fixes tags of (path, artist_name) pairs (or plans the fixes, with dry_run).
+    Returns ([(path, fix result or None, stat after the fix)], captured output).
+    """
+    from .downloader import fix_metadata
+
+    output = io.StringIO()
+    results = []
+    with redirect_stdout(output), redirect_stderr(output):
+        for path, artist_name in chunk:
+            result = fix_metadata(path, artist_name, dry_run=dry_run)
+            st = None
+            if result is not None:
+                try:
+                    st = os.stat(path)
+                except OSError as e:
+                    print(f"Error reading {path}: {e}")
+                    result = None
+            results.append((path, result, st))
+    return results, output.getvalue()
+
+
+class ScanProgress:
+    """
+    Aggregated scan counters, reported as the 'library_scan' metrics section with
+    rate and ETA. The ETA is only known once the walk has found every file.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.discovered = 0
+        self.skipped = 0
+        self.examined = 0
+        self.rewritten = 0
+        self.bytes_written = 0
+        self.full_rewrites = 0
+        self.errors = 0
+        self.removed = 0
+        self.queued = 0
+        self.walk_complete = False
+        self._last_report = 0.0
+
+    def to_dict(self) -> Dict:
+        elapsed = time.perf_counter() - self.started_at
+        rate = self.examined / elapsed if elapsed > 0 else 0.0
+        remaining = self.queued - self.examined
+        eta = None
+        if self.walk_complete:
+            eta = round(remaining / rate, 1) if rate > 0 else (0.0 if remaining == 0 else None)
+        return {
+            "discovered": self.discovered,
+            "skipped": self.skipped,
+            "examined": self.examined,
+            "rewritten": self.rewritten,
+            "bytes_written": self.bytes_written,
+            "full_rewrites": self.full_rewrites,
+            "errors": self.errors,
+            "removed": self.removed,
+            "pending": remaining,
+            "files_per_second": round(rate, 2),
+            "elapsed": round(elapsed, 1),
+            "eta_seconds": eta,
+            "walk_complete": self.walk_complete,
+        }
+
+    def report(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_report < REPORT_INTERVAL:
+            return
+        self._last_report = now
+        report_metrics("library_scan", self.to_dict())
+
+
+def scan_library(base_path: str, fix_version: int, full: bool = False, index: Optional[LibraryIndex] = None,
+                 workers: Optional[int] = None, io_depth: Optional[int] = None,
+                 chunk_size: Optional[int] = None, dry_run: bool = False,
+                 catalog: Optional[LibraryCatalog] = None) -> Dict:
+    """
+    Streams the library walk into a process pool in chunks and fixes the tags of
+    files that are new, changed, or fixed under older rules (every file if full).
+    The job process owns the index; workers only fix tags. With dry_run nothing is
+    written and the index is left alone; the counters report the planned writes.
+    The catalog gets the tags of every examined file; files it doesn't know yet are
+    examined even when the index has them as current.
+    """
+    index = LibraryIndex() if index is None else index
+    catalog = LibraryCatalog() if catalog is None else catalog
+    workers = max(1, workers or SCAN_WORKERS)
+    io_depth = max(1, io_depth or SCAN_IO_DEPTH or workers * 2)
+    chunk_size = max(1, chunk_size or SCAN_CHUNK_SIZE)
+    progress = ScanProgress()
+    seen = set()
+    pending_rows = []
+    catalog_rows = []
+
+    def collect(results, output):
+        nonlocal pending_rows, catalog_rows
+        if output:
+            print(output, end="" if output.endswith("\n") else "\n")
+        for path, result, st in results:
+            progress.examined += 1
+            if result is None:
+                # Not indexed, so the next scan tries again
+                progress.errors += 1
+                continue
+            if result['rewritten']:
+                progress.rewritten += 1
+                progress.bytes_written += result['bytes_written']
+                if not result['in_place']:
+                    progress.full_rewrites += 1
+            if dry_run:
+                continue
+            pending_rows.append((path, st, result['tag_hash'], fix_version))
+            catalog_rows.append((path, st, result['track']))
+        if len(pending_rows) >= SCAN_BATCH_SIZE:
+            catalog.record_many(catalog_rows)
+            index.record_many(pending_rows)
+            pending_rows, catalog_rows = [], []
+        progress.report()
+
+    prefix = os.path.abspath(base_path) + os.sep
+    catalogued = catalog.paths(prefix)
+
+    def chunks():
+        chunk = []
+        for filepath, artist_name, st in walk_audio_files(base_path):
+            path = os.path.abspath(filepath)
+            seen.add(path)
+            progress.discovered += 1
+            if not full and path in catalogued and index.is_current(path, st, fix_version):
+                progress.skipped += 1
+                continue
+            chunk.append((path, artist_name))
+            progress.queued += 1
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+        progress.walk_complete = True
+
+    if workers == 1:
+        # Nothing to parallelize; skip the pool
+        for chunk in chunks():
+            collect(*fix_chunk(chunk, dry_run))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = {}
+
+            def finish(future):
+                chunk = in_flight.pop(future)
+                try:
+                    results, output = future.result()
+                except Exception as e:
+                    print(f"Error in library scan worker: {e}")
+                    progress.examined += len(chunk)
+                    progress.errors += len(chunk)
+                    return
+                collect(results, output)
+
+            for chunk in chunks():
+                in_flight[pool.submit(fix_chunk, chunk, dry_run)] = chunk
+                # Bounded: the walk waits while io_depth chunks are outstanding
+                while len(in_flight) >= io_depth:
+                    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finish(future)
+            for future in list(in_flight):
+                finish(future)
+
+    if pending_rows:
+        catalog.record_many(catalog_rows)
+        index.record_many(pending_rows)
+    if not dry_run:
+        progress.removed = index.prune(seen, prefix)
+        catalog.prune(seen, prefix)
+    progress.report(force=True)
+    return progress.to_dict()
@@ -0,0 +1,169 @@
+import bisect
+import gzip
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+# Per-job memory caps; whichever is hit first triggers a spill to disk
+DEFAULT_MAX_LINES = int(os.environ.get("YTM_LOG_MAX_LINES", "5000"))
+DEFAULT_MAX_BYTES = int(os.environ.get("YTM_LOG_MAX_BYTES", str(1024 * 1024)))
+
+# Spill file retention, applied at startup
+LOG_RETENTION_DAYS = float(os.environ.get("YTM_LOG_RETENTION_DAYS", "14"))
+LOG_RETENTION_BYTES = int(os.environ.get("YTM_LOG_RETENTION_BYTES", str(256 * 1024 * 1024)))
+
+
+def _size(line: str) -> int:
+    # max_bytes is in encoded bytes, as spilled, not characters
+    return len(line.encode("utf-8", "replace"))
+
+
+class LogBuffer:
+    """
+    Memory-capped ring buffer of log lines with absolute offsets.
+
+    Lines are numbered from 0 for the lifetime of the job. When the buffer
+    exceeds max_lines or max_bytes, the oldest lines are appended to a
+    gzip file as a new member, so every line stays readable by offset.
+    """
+
+    def __init__(self, spill_path: Optional[str] = None, max_lines: int = DEFAULT_MAX_LINES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.spill_path = spill_path
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self._lines: deque = deque()
+        self._bytes = 0
+        # Absolute offset of self._lines[0]
+        self._first = 0
+        # (first line offset, byte position) for every gzip member in the spill file
+        self._members: List[Tuple[int, int]] = []
+        self._lock = threading.RLock()
+
+    def append(self, msg: str):
+        """
+        Adds a message; multi-line messages are stored one line per offset.
+        """
+        with self._lock:
+            for line in str(msg).rstrip("\n").split("\n"):
+                self._lines.append(line)
+                self._bytes += _size(line)
+            if len(self._lines) > self.max_lines or self._bytes > self.max_bytes:
+                self._spill()
+
+    def extend(self, msgs):
+        for msg in msgs:
+            self.append(msg)
+
+    def __len__(self) -> int:
+        return self._first + len(self._lines)
+
+    def __iter__(self):
+        return iter(self.read(0)[0])
+
+    @property
+    def first_in_memory(self) -> int:
+        return self._first
+
+    def _spill(self):
+        # Evict down to 3/4 of the caps so we don't spill on every append
+        target_lines = self.max_lines * 3 // 4
+        target_bytes = self.max_bytes * 3 // 4
+        evicted = []
+        while self._lines and (len(self._lines) > target_lines or self._bytes > target_bytes):
+            line = self._lines.popleft()
+            self._bytes -= _size(line)
+            evicted.append(line)
+        if not evicted:
+            return
+        if self.spill_path:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            pos = os.path.getsize(self.spill_path) if os.path.exists(self.spill_path) else 0
+            # Each spill is a complete gzip member, so the file is always readable
+            with open(self.spill_path, "ab") as f:
+                f.write(gzip.compress(("\n".join(evicted) + "\n").encode("utf-8", "replace")))
+            self._members.append((self._first, pos))
+        self._first += len(evicted)
+
+    def read(self, offset: int = 0, limit: Optional[int] = None) -> Tuple[List[str], int]:
+        """
+        Returns (lines, next_offset) starting at absolute offset.
+        Negative offsets count from the end. Lines dropped without a spill file are skipped.
+        """
+        with self._lock:
+            total = len(self)
+            if offset < 0:
+                offset = max(0, total + offset)
+            end = total if limit is None else min(total, offset + limit)
+            if offset >= end:
+                return [], min(offset, total)
+
+            lines: List[str] = []
+            if offset < self._first:
+                if self._members:
+                    lines.extend(self._read_spilled(offset, min(end, self._first)))
+                else:
+                    offset = self._first
+                    end = total if limit is None else min(total, offset + limit)
+            mem_start = max(offset, self._first) - self._first
+            mem_end = end - self._first
+            if mem_end > mem_start:
+                lines.extend(itertools.islice(self._lines, mem_start, mem_end))
+            return lines, offset + len(lines)
+
+    def _read_spilled(self, start: int, end: int) -> List[str]:
+        idx = bisect.bisect_right(self._members, (start, float("inf"))) - 1
+        if idx < 0:
+            idx = 0
+        line_no, pos = self._members[idx]
+        result = []
+        with open(self.spill_path, "rb") as raw:
+            raw.seek(pos)
+            # GzipFile reads through consecutive members transparently
+            with gzip.GzipFile(fileobj=raw) as f:
+                for line in f:
+                    if line_no >= end:
+                        break
+                    if line_no >= start:
+                        result.append(line.decode("utf-8", "replace").rstrip("\n"))
+                    line_no += 1
+        return result
+
+    def tail(self, n: int) -> List[str]:
+        return self.read(-n)[0]
+
+    def close(self, remove_spill: bool = False):
+        if remove_spill and self.spill_path and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+
+
+def prune_spill_files(directory: str, max_age_days: float = LOG_RETENTION_DAYS,
+                      max_total_bytes: int = LOG_RETENTION_BYTES, keep=()) -> int:
+    """
+    Deletes spill files older than max_age_days, then the oldest ones until the rest fit
+    in max_total_bytes. Paths in keep are never deleted. Returns the number removed.
+    """
+    try:
+        entries = [e for e in os.scandir(directory) if e.name.endswith(".log.gz") and e.is_file()]
+    except FileNotFoundError:
+        return 0
+    keep = {os.path.abspath(path) for path in keep}
+    cutoff = time.time() - max_age_days * 86400
+    files = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries), reverse=True)
+    # Kept files count against the size budget first
+    total = sum(size for _, size, path in files if os.path.abspath(path) in keep)
+    removed = 0
+    for mtime, size, path in files:
+        if os.path.abspath(path) in keep:
+            continue
+        if mtime < cutoff or total + size > max_total_bytes:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+            continue
+        total += size
+    return removed
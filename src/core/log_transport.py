@@ -0,0 +1,184 @@
+import threading
+import time
+from typing import List, Optional
+
+# Flush thresholds for the child side of the transport
+DEFAULT_MAX_LINES = 200
+DEFAULT_MAX_BYTES = 64 * 1024
+DEFAULT_MAX_DELAY = 0.25
+
+# Message types sent over the job queue
+MSG_LOGS = "logs"
+MSG_STATUS = "status"
+MSG_METRICS = "metrics"
+
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+class LogTransport:
+    """
+    Child-side log transport.
+
+    Buffers complete lines and ships them to the parent in batches when a
+    line/byte threshold or a time threshold is reached. Carriage-return
+    progress updates (yt-dlp's download bar) overwrite each other in the
+    buffer, so only the latest value crosses the process boundary.
+    Job completion/failure travel as structured status messages.
+    """
+
+    def __init__(self, queue, max_lines: int = DEFAULT_MAX_LINES, max_bytes: int = DEFAULT_MAX_BYTES, max_delay: float = DEFAULT_MAX_DELAY):
+        self.queue = queue
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self._lines: List[str] = []
+        self._bytes = 0
+        self._partial = ""
+        self._progress: Optional[str] = None
+        self._first_buffered: Optional[float] = None
+        self._streams = []
+        self._lock = threading.RLock()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        self.messages_sent = 0
+
+    def write(self, text: str):
+        with self._lock:
+            data = self._partial + text
+            pieces = data.split("\n")
+            self._partial = pieces.pop()
+            for piece in pieces:
+                # Text after the last \r is what a terminal would show
+                line = self._collapse(piece)
+                if "\r" in piece:
+                    # The progress bar finished on this line
+                    self._progress = None
+                if line.strip():
+                    self._lines.append(line)
+                    # max_bytes is in UTF-8 bytes, not characters
+                    self._bytes += len(line.encode("utf-8", "replace"))
+            if "\r" in self._partial:
+                # In-place progress update: keep only the latest value
+                self._progress = self._collapse(self._partial) or self._progress
+                self._partial = self._partial[self._partial.rfind("\r") + 1:]
+            if self._first_buffered is None and (self._lines or self._progress):
+                self._first_buffered = time.monotonic()
+            if len(self._lines) >= self.max_lines or self._bytes >= self.max_bytes:
+                self.flush()
+            elif self._first_buffered is not None and time.monotonic() - self._first_buffered >= self.max_delay:
+                self.flush()
+
+    @staticmethod
+    def _collapse(piece: str) -> str:
+        for part in reversed(piece.split("\r")):
+            if part.strip():
+                return part
+        return ""
+
+    def flush(self):
+        """Sends buffered lines (and the latest progress value) as one message."""
+        with self._lock:
+            if self._lines or self._progress:
+                self.queue.put({"type": MSG_LOGS, "lines": self._lines, "progress": self._progress})
+                self.messages_sent += 1
+                self._lines = []
+                self._bytes = 0
+                self._progress = None
+            self._first_buffered = None
+            for stream in self._streams:
+                try:
+                    stream.flush()
+                except Exception:
+                    pass
+
+    def send_status(self, status: str, error: Optional[str] = None):
+        """Flushes pending logs, then sends a control message."""
+        with self._lock:
+            if self._partial.strip():
+                self._lines.append(self._partial)
+                self._partial = ""
+            self.flush()
+            self.queue.put({"type": MSG_STATUS, "status": status, "error": error})
+            self.messages_sent += 1
+
+    def send_metrics(self, section: str, data: dict):
+        """Sends a structured metrics update, merged into job.metrics[section] by the parent."""
+        with self._lock:
+            self.flush()
+            self.queue.put({"type": MSG_METRICS, "section": section, "data": data})
+            self.messages_sent += 1
+
+    def start(self):
+        """Starts the background thread that enforces the time threshold when output goes quiet."""
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._run_flusher, name="log-flusher", daemon=True)
+            self._flusher.start()
+
+    def _run_flusher(self):
+        while not self._closed.wait(self.max_delay):
+            self.flush()
+
+    def close(self):
+        self._closed.set()
+        self.flush()
+
+    def stream(self, original_stream=None) -> "LogCapture":
+        if original_stream is not None:
+            self._streams.append(original_stream)
+        return LogCapture(self, original_stream)
+
+
+_current: Optional[LogTransport] = None
+
+
+def set_current_transport(transport: Optional[LogTransport]):
+    global _current
+    _current = transport
+
+
+def report_metrics(section: str, data: dict):
+    """
+    Publishes metrics for the job running in this process.
+    A no-op outside of job processes (e.g. CLI usage).
+    """
+    if _current is not None:
+        try:
+            _current.send_metrics(section, data)
+        except Exception as e:
+            print(f"Warning: Could not report metrics: {e}")
+
+
+class LogCapture:
+    """
+    File-like wrapper installed as sys.stdout/sys.stderr in job processes.
+    """
+
+    def __init__(self, transport: LogTransport, original_stream=None):
+        self.transport = transport
+        self.original_stream = original_stream
+
+    def write(self, msg):
+        self.transport.write(msg)
+
+        # Write to original stream (stdout/stderr) so it appears in docker logs.
+        # Flushing is left to the transport so we don't flush on every write.
+        if self.original_stream:
+            try:
+                self.original_stream.write(msg)
+            except Exception:
+                pass
+        return len(msg)
+
+    def flush(self):
+        # Explicit flushes (print(..., flush=True), yt-dlp) are cheap no-ops here;
+        # the transport flushes on its own thresholds.
+        pass
+
+    def isatty(self):
+        return False
+
+    def fileno(self):
+        if self.original_stream:
+            return self.original_stream.fileno()
+        raise OSError("LogCapture has no file descriptor")
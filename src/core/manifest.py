@@ -0,0 +1,104 @@
+import json
+from typing import Dict, List, Optional, Tuple
+
+from .ledger import archive_id_for
+from .resolution_cache import ResolutionCache, album_key
+
+# Playlist-level fields worth keeping; everything else yt-dlp can recompute
+MANIFEST_FIELDS = (
+    "_type", "id", "title", "description", "uploader", "uploader_id", "channel", "channel_id",
+    "artists", "album", "thumbnails", "playlist_count",
+    "extractor", "extractor_key", "webpage_url", "original_url",
+    "webpage_url_basename", "webpage_url_domain",
+)
+MAX_REDIRECTS = 5
+
+
+def _plain(value):
+    # Extractor results can contain lazy or non-JSON values; keep only what round trips
+    return json.loads(json.dumps(value, default=str))
+
+
+def extract_manifest(ydl, url) -> Optional[Dict]:
+    """
+    Flat-extracts an album/playlist in-process, without resolving the tracks.
+
+    Returns a JSON-serializable playlist info dict whose 'entries' is a list of
+    url results, suitable for ydl.process_ie_result(), or None if extraction failed.
+    """
+    info = ydl.extract_info(url, download=False, process=False)
+    # Album browse pages redirect to the underlying OLAK playlist
+    for _ in range(MAX_REDIRECTS):
+        if not info or info.get("_type") not in ("url", "url_transparent"):
+            break
+        outer = info
+        info = ydl.extract_info(info["url"], download=False, process=False, ie_key=info.get("ie_key"))
+        if info and outer.get("_type") == "url_transparent":
+            info.update({k: v for k, v in outer.items() if v is not None and k not in ("_type", "url", "ie_key")})
+    if not info:
+        return None
+
+    if info.get("_type", "video") == "video":
+        # A single song: wrap it so downloads always go through the same path
+        entry = {"_type": "url", "url": info.get("webpage_url") or url, "ie_key": info.get("extractor_key")}
+        entry.update({k: info.get(k) for k in ("id", "title", "duration", "album", "artist")})
+        info = {
+            "_type": "playlist", "id": info.get("id"), "title": info.get("album") or info.get("title"),
+            "extractor": info.get("extractor"), "extractor_key": info.get("extractor_key"),
+            "webpage_url": info.get("webpage_url") or url, "original_url": url,
+            "entries": [entry],
+        }
+
+    manifest = {k: info[k] for k in MANIFEST_FIELDS if info.get(k) is not None}
+    manifest["_type"] = info.get("_type", "playlist")
+    manifest["entries"] = [
+        {k: v for k, v in entry.items() if not k.startswith("__")}
+        for entry in (info.get("entries") or []) if entry
+    ]
+    manifest["track_count"] = info.get("playlist_count") or len(manifest["entries"])
+    return _plain(manifest)
+
+
+def get_manifest(ydl, url, cache: Optional[ResolutionCache] = None) -> Tuple[Optional[Dict], bool]:
+    """
+    Returns (manifest, from_cache). Manifests are cached under the 'album' kind of the resolution cache.
+    """
+    key = album_key(url)
+    if cache is not None:
+        try:
+            manifest = cache.get("album", key)
+            if manifest is not None:
+                return manifest, True
+        except Exception as e:
+            print(f"Warning: Resolution cache unavailable: {e}")
+
+    manifest = extract_manifest(ydl, url)
+    if cache is not None and manifest and manifest["entries"]:
+        try:
+            cache.set("album", key, manifest)
+        except Exception as e:
+            print(f"Warning: Could not cache manifest for {url}: {e}")
+    return manifest, False
+
+
+def filter_manifest(manifest: Dict, max_album_length=None, song_limit=None, archive=None) -> Tuple[Optional[Dict], str]:
+    """
+    Applies album filters to a manifest.
+    Returns (filtered_manifest, reason); the manifest is None when the album should be skipped.
+    """
+    track_count = manifest.get("track_count") or len(manifest["entries"])
+    if max_album_length and track_count > max_album_length:
+        return None, f"Album has {track_count} tracks (Limit: {max_album_length})"
+
+    entries: List[Dict] = manifest["entries"]
+    if archive is not None:
+        entries = [e for e in entries if archive_id_for(e) not in archive]
+        if not entries:
+            return None, "All tracks already downloaded"
+    if song_limit and song_limit > 0:
+        entries = entries[:song_limit]
+
+    # Copy so the cached manifest keeps the full track list
+    filtered = dict(manifest)
+    filtered["entries"] = [dict(e) for e in entries]
+    return filtered, f"{len(entries)} of {track_count} tracks to download"
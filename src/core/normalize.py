@@ -0,0 +1,33 @@
+import functools
+import os
+import unicodedata
+
+# Distinct names memoized per process by normalize_name
+NORMALIZE_CACHE_SIZE = int(os.environ.get("YTM_NORMALIZE_CACHE_SIZE", "4096"))
+
+def normalize_string(s):
+    """
+    Normalizes a string to ASCII, lowercased, stripped of diacritics.
+    Useful for comparing 'Oğuz Aksaç' and 'Oguz Aksac'.
+    """
+    if not s:
+        return ""
+    s = str(s)
+    if s.isascii():
+        # Nothing to decompose or strip
+        return " ".join(s.split()).lower()
+    # Normalize unicode characters to NFD (decomposed)
+    nfd_form = unicodedata.normalize('NFD', s)
+    # Filter out non-spacing mark characters (diacritics); ASCII never is one
+    normalized = "".join(c for c in nfd_form if c.isascii() or unicodedata.category(c) != 'Mn')
+    # Collapse whitespace and lowercase
+    return " ".join(normalized.split()).lower()
+
+
+@functools.lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_name(s):
+    """
+    Memoized normalize_string for names that repeat across many files (artists, albums).
+    The cache is per process, so every scan worker builds its own.
+    """
+    return normalize_string(s)
@@ -0,0 +1,162 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .log_transport import report_metrics
+
+# Minimum seconds between metrics reports while the pipeline is running
+REPORT_INTERVAL = 1.0
+
+_STOP = object()
+
+
+class StageStats:
+    """
+    Throughput/utilization counters for one pipeline stage.
+    """
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.peak_depth = 0
+        self._lock = threading.Lock()
+
+    def record(self, duration: float, ok: bool = True):
+        with self._lock:
+            self.busy += duration
+            if ok:
+                self.processed += 1
+            else:
+                self.failed += 1
+
+    def record_blocked(self, duration: float):
+        with self._lock:
+            self.blocked += duration
+
+    def to_dict(self, elapsed: float, depth: Optional[int] = None) -> Dict:
+        with self._lock:
+            data = {
+                "workers": self.workers,
+                "processed": self.processed,
+                "failed": self.failed,
+                "throughput": round(self.processed / elapsed, 3) if elapsed > 0 else 0.0,
+                "utilization": round(min(1.0, self.busy / (elapsed * self.workers)), 3) if elapsed > 0 else 0.0,
+                "blocked_seconds": round(self.blocked, 3),
+            }
+            if depth is not None:
+                data["queue_depth"] = depth
+                data["peak_queue_depth"] = self.peak_depth
+            return data
+
+
+class Stage:
+    """
+    Worker threads consuming a bounded queue. Each result that isn't None goes
+    to the next stage; put() blocks while the queue is full, so a slow stage
+    pushes back on the one feeding it.
+    """
+
+    def __init__(self, name: str, func: Callable, workers: int = 1, queue_size: Optional[int] = None):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue: "queue.Queue" = queue.Queue(maxsize=queue_size or self.workers * 2)
+        self.stats = StageStats(name, self.workers)
+        self.next: Optional["Stage"] = None
+        self.on_item: Optional[Callable] = None
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def put(self, item):
+        start = time.perf_counter()
+        self.queue.put(item)
+        self.stats.record_blocked(time.perf_counter() - start)
+        depth = self.queue.qsize()
+        if depth > self.stats.peak_depth:
+            self.stats.peak_depth = depth
+
+    def _work(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            start = time.perf_counter()
+            try:
+                result = self.func(item)
+            except Exception as e:
+                print(f"Error in {self.name} stage: {e}")
+                self.stats.record(time.perf_counter() - start, ok=False)
+                continue
+            self.stats.record(time.perf_counter() - start, ok=result is not None)
+            if result is not None and self.next is not None:
+                self.next.put(result)
+            if self.on_item is not None:
+                self.on_item()
+
+    def close(self):
+        """Lets queued items finish, then stops the workers."""
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+class Pipeline:
+    """
+    Chains stages: items put into the pipeline flow through each stage in order.
+    Per-stage stats are published as the 'pipeline' metrics section of the job.
+    """
+
+    def __init__(self, stages: List[Stage], sources: Optional[List[StageStats]] = None):
+        self.stages = stages
+        # Stats for stages driven from outside (e.g. the download threads feeding the pipeline)
+        self.sources = sources or []
+        for stage, following in zip(stages, stages[1:]):
+            stage.next = following
+        for stage in stages:
+            stage.on_item = self.report
+        self.started_at = time.perf_counter()
+        self._last_report = 0.0
+        self._report_lock = threading.Lock()
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def put(self, item):
+        self.stages[0].put(item)
+
+    def stats(self) -> Dict:
+        elapsed = time.perf_counter() - self.started_at
+        data = {source.name: source.to_dict(elapsed) for source in self.sources}
+        for stage in self.stages:
+            data[stage.name] = stage.stats.to_dict(elapsed, stage.queue.qsize())
+        data["elapsed"] = round(elapsed, 3)
+        return data
+
+    def report(self, force: bool = False):
+        with self._report_lock:
+            now = time.monotonic()
+            if not force and now - self._last_report < REPORT_INTERVAL:
+                return
+            self._last_report = now
+        report_metrics("pipeline", self.stats())
+
+    def close(self):
+        """Drains the stages in order and publishes the final stats."""
+        for stage in self.stages:
+            stage.close()
+        self.report(force=True)
@@ -0,0 +1,243 @@
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from .config import DATA_DIR
+from .log_transport import report_metrics
+
+RATE_LIMIT_PATH = os.path.join(DATA_DIR, "rate_limit.bin")
+
+# Sustained upstream requests per second when healthy (0 disables limiting)
+RATE = float(os.environ.get("YTM_RATE_LIMIT", "2"))
+# Tokens that can accumulate while idle
+BURST = float(os.environ.get("YTM_RATE_BURST", "10"))
+# Floor the rate can be cut down to after repeated throttling
+MIN_RATE = float(os.environ.get("YTM_RATE_MIN", "0.05"))
+# Seconds to climb back from MIN_RATE to RATE once throttling stops
+RECOVERY_SECONDS = float(os.environ.get("YTM_RATE_RECOVERY", "300"))
+# Throttling reports closer together than this count as one (many workers see the same 429)
+PENALTY_WINDOW = 5.0
+
+# tokens, updated_at, rate, last_penalty, penalties
+_LAYOUT = struct.Struct("<4dQ")
+
+THROTTLE_STATUSES = (403, 429)
+THROTTLE_MARKERS = (
+    "http error 429", "too many requests", "http error 403", "forbidden",
+    "not a bot", "sign in to confirm", "rate-limit", "rate limit",
+)
+
+
+def is_throttle_error(error) -> bool:
+    """True for HTTP 429/403 responses and YouTube bot-check errors (status code or message)."""
+    if isinstance(error, int):
+        return error in THROTTLE_STATUSES
+    status = getattr(error, "status", None) or getattr(error, "code", None)
+    if isinstance(status, int) and status in THROTTLE_STATUSES:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every process on the machine through a small mmap'ed
+    file, guarded by fcntl locks. Jobs, their download threads and the API all
+    draw from the same bucket.
+
+    The refill rate adapts: throttling responses halve it (down to min_rate) and
+    it climbs back linearly over recovery_seconds once they stop.
+    """
+
+    def __init__(self, path: str = RATE_LIMIT_PATH, rate: float = RATE, burst: float = BURST,
+                 min_rate: float = MIN_RATE, recovery_seconds: float = RECOVERY_SECONDS,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        self.path = path
+        self.base_rate = rate
+        self.burst = max(1.0, burst)
+        self.min_rate = min(min_rate, rate) if rate > 0 else min_rate
+        self.recovery_seconds = recovery_seconds
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._pid: Optional[int] = None
+        # Counters for this process, reported as job metrics
+        self.acquired = 0
+        self.waited = 0.0
+        self.penalties = 0
+        self._last_report = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.base_rate > 0
+
+    def _open(self):
+        # A forked child shares the parent's open file description, and with it the
+        # flock; reopen so processes exclude each other
+        if self._map is not None and self._pid == os.getpid():
+            return
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_size < _LAYOUT.size:
+                os.ftruncate(fd, _LAYOUT.size)
+                os.pwrite(fd, _LAYOUT.pack(self.burst, self.clock(), self.base_rate, 0.0, 0), 0)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._map = mmap.mmap(fd, _LAYOUT.size)
+        self._pid = os.getpid()
+
+    def _update(self, func):
+        """Runs func(state) -> (state, result) atomically across threads and processes."""
+        with self._lock:
+            self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                tokens, updated_at, rate, last_penalty, penalties = _LAYOUT.unpack_from(self._map, 0)
+                state = self._refill(
+                    {"tokens": tokens, "updated_at": updated_at, "rate": rate,
+                     "last_penalty": last_penalty, "penalties": penalties})
+                state, result = func(state)
+                _LAYOUT.pack_into(self._map, 0, state["tokens"], state["updated_at"], state["rate"],
+                                  state["last_penalty"], state["penalties"])
+                return result
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _refill(self, state: Dict) -> Dict:
+        now = self.clock()
+        elapsed = max(0.0, now - state["updated_at"])
+        rate = state["rate"] if state["rate"] > 0 else self.base_rate
+        if rate < self.base_rate and self.recovery_seconds > 0:
+            # Additive recovery, so one quiet second doesn't undo a penalty
+            rate = min(self.base_rate, rate + (self.base_rate - self.min_rate) * elapsed / self.recovery_seconds)
+        elif rate > self.base_rate:
+            # Config was lowered since the file was written
+            rate = self.base_rate
+        state["tokens"] = min(self.burst, state["tokens"] + elapsed * rate)
+        state["rate"] = rate
+        state["updated_at"] = now
+        return state
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> float:
+        """
+        Blocks until `tokens` are available and takes them. Returns the seconds waited.
+        Raises TimeoutError if timeout passes first.
+        """
+        if not self.enabled:
+            return 0.0
+        tokens = min(tokens, self.burst)
+        start = self.clock()
+        waited = 0.0
+
+        def take(state):
+            if state["tokens"] >= tokens:
+                state["tokens"] -= tokens
+                return state, 0.0
+            return state, (tokens - state["tokens"]) / state["rate"]
+
+        while True:
+            wait = self._update(take)
+            if wait <= 0:
+                break
+            if timeout is not None and self.clock() - start + wait > timeout:
+                raise TimeoutError(f"Rate limiter: no token within {timeout}s")
+            # Wake up at least once a second to pick up rate changes from other processes
+            self.sleep(min(wait, 1.0))
+            waited = self.clock() - start
+
+        self.acquired += 1
+        self.waited += waited
+        if waited > 0:
+            self._report()
+        return waited
+
+    def penalize(self, reason: str = "") -> bool:
+        """
+        Halves the shared rate and empties the bucket after a throttling response.
+        Returns False if another worker already reported it within PENALTY_WINDOW.
+        """
+        if not self.enabled:
+            return False
+
+        def cut(state):
+            now = state["updated_at"]
+            if now - state["last_penalty"] < PENALTY_WINDOW:
+                return state, False
+            state["rate"] = max(self.min_rate, state["rate"] / 2)
+            state["tokens"] = 0.0
+            state["last_penalty"] = now
+            state["penalties"] += 1
+            return state, True
+
+        applied = self._update(cut)
+        if applied:
+            self.penalties += 1
+            print(f"Upstream throttling detected ({reason or 'unknown'}), slowing down to {self.state()['rate']:.3f} requests/s.")
+            self._report(force=True)
+        return applied
+
+    def observe(self, error) -> bool:
+        """Penalizes if `error` (exception, status code or message) looks like throttling."""
+        if is_throttle_error(error):
+            return self.penalize(str(error)[:200])
+        return False
+
+    def state(self) -> Dict:
+        if not self.enabled:
+            return {"enabled": False}
+        state = self._update(lambda s: (s, dict(s)))
+        return {
+            "enabled": True,
+            "rate": round(state["rate"], 4),
+            "base_rate": self.base_rate,
+            "min_rate": self.min_rate,
+            "burst": self.burst,
+            "tokens": round(state["tokens"], 3),
+            "penalties": int(state["penalties"]),
+            "last_penalty": state["last_penalty"] or None,
+        }
+
+    def _report(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_report < 1.0:
+            return
+        self._last_report = now
+        report_metrics("rate_limit", {
+            "acquired": self.acquired,
+            "waited_seconds": round(self.waited, 3),
+            "penalties": self.penalties,
+            "rate": self.state().get("rate"),
+        })
+
+    def close(self):
+        with self._lock:
+            if self._map is not None and self._pid == os.getpid():
+                self._map.close()
+                os.close(self._fd)
+            self._map = None
+            self._fd = None
+            self._pid = None
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The process-wide limiter backed by the shared bucket file."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
@@ -0,0 +1,140 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+from .config import DATA_DIR, journal_mode
+from .normalize import normalize_string
+
+RESOLUTION_CACHE_PATH = os.path.join(DATA_DIR, "resolution_cache.db")
+
+# Default time-to-live per kind of entry, in seconds
+DEFAULT_TTLS = {
+    "artist": int(os.environ.get("YTM_ARTIST_CACHE_TTL", str(24 * 3600))),
+    "search": int(os.environ.get("YTM_SEARCH_CACHE_TTL", str(24 * 3600))),
+    "album": int(os.environ.get("YTM_ALBUM_CACHE_TTL", str(6 * 3600))),
+}
+MAX_BYTES = int(os.environ.get("YTM_RESOLUTION_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access);
+"""
+
+
+def artist_key(artist_url=None, artist_name=None) -> str:
+    """Cache key for an artist: the normalized name if known, otherwise the trimmed URL."""
+    if artist_name:
+        return "name:" + normalize_string(artist_name)
+    # Channel ids are case sensitive, so the URL is keyed like album_key
+    return "url:" + (artist_url or "").strip().rstrip("/")
+
+
+def search_key(query) -> str:
+    return "query:" + normalize_string(query)
+
+
+def album_key(url) -> str:
+    # URLs are case sensitive (browse ids), so don't normalize beyond trimming
+    return "url:" + (url or "").strip().rstrip("/")
+
+
+class ResolutionCache:
+    """
+    Persistent TTL cache for artist→albums, search→URL and album manifest resolutions.
+    Evicts least recently used entries once the stored values exceed max_bytes.
+    """
+
+    def __init__(self, path: str = RESOLUTION_CACHE_PATH, max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reopen in each process
+        if self._conn is None or self._pid != os.getpid():
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute(f"PRAGMA journal_mode={journal_mode(self.path)}")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT value, expires_at FROM entries WHERE kind = ? AND key = ?", (kind, key)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            self.conn.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+            return None
+        self.conn.execute(
+            "UPDATE entries SET last_access = ? WHERE kind = ? AND key = ?", (now, kind, key)
+        )
+        return json.loads(row[0])
+
+    def set(self, kind: str, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = DEFAULT_TTLS.get(kind, 3600) if ttl is None else ttl
+        data = json.dumps(value)
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries (kind, key, value, size, created_at, expires_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (kind, key, data, len(data), now, now + ttl, now),
+        )
+        self._evict()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        self.conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        rows = self.conn.execute("SELECT kind, key, size FROM entries ORDER BY last_access ASC").fetchall()
+        total = sum(r[2] for r in rows)
+        for kind, key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+            total -= size
+
+    def invalidate(self, kind: Optional[str] = None, key: Optional[str] = None) -> int:
+        """Deletes matching entries (everything when both are None). Returns the number removed."""
+        clauses, params = [], []
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if key is not None:
+            clauses.append("key = ?")
+            params.append(key)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self.conn.execute(f"DELETE FROM entries {where}", params).rowcount
+
+    def stats(self) -> Dict:
+        count, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        expired = self.conn.execute(
+            "SELECT COUNT(*) FROM entries WHERE expires_at <= ?", (time.time(),)
+        ).fetchone()[0]
+        return {"entries": count, "bytes": size, "expired": expired, "max_bytes": self.max_bytes}
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._pid = None
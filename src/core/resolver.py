@@ -0,0 +1,366 @@
+import json
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+from typing import Iterator, List, Optional, Tuple
+
+from .dom_extract import ALBUM_SHELF_TITLES
+from .log_transport import report_metrics
+from .rate_limiter import RateLimiter, get_rate_limiter
+from .resolution_cache import ResolutionCache, artist_key, search_key
+from .scraper_pool import connect_scraper_service, resolve_driver_path
+
+# Which backend(s) to use: "auto" (HTTP first, browser fallback), "http" or "browser"
+RESOLVER_MODE = os.environ.get("YTM_RESOLVER", "auto")
+
+INNERTUBE_BASE_URL = os.environ.get("YTM_INNERTUBE_URL", "https://music.youtube.com")
+INNERTUBE_CLIENT_NAME = "WEB_REMIX"
+INNERTUBE_CLIENT_VERSION = "1.20240101.01.00"
+# X-YouTube-Client-Name value for WEB_REMIX
+INNERTUBE_CLIENT_ID = "67"
+
+PAGE_TYPE_ARTIST = "MUSIC_PAGE_TYPE_ARTIST"
+PAGE_TYPE_ALBUM = "MUSIC_PAGE_TYPE_ALBUM"
+
+CHANNEL_ID_RE = re.compile(r"/(?:channel|browse)/(UC[\w-]+)")
+
+
+class ResolverError(Exception):
+    pass
+
+
+class Resolver:
+    """
+    Turns artist names/URLs into album URLs and search queries into a single result.
+    """
+    name = "base"
+
+    def get_artist_albums(self, artist_url, artist_name=None) -> List[str]:
+        raise NotImplementedError
+
+    def get_search_results(self, query) -> Tuple[Optional[str], Optional[str]]:
+        raise NotImplementedError
+
+
+def walk(node) -> Iterator[dict]:
+    """Yields every dict in a JSON tree, depth first, in document order."""
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from walk(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from walk(value)
+
+
+def page_type(endpoint: dict) -> Optional[str]:
+    return (endpoint.get("browseEndpointContextSupportedConfigs", {})
+            .get("browseEndpointContextMusicConfig", {})
+            .get("pageType"))
+
+
+def browse_endpoints(node, wanted_type: Optional[str] = None) -> Iterator[dict]:
+    for d in walk(node):
+        endpoint = d.get("browseEndpoint")
+        if isinstance(endpoint, dict) and endpoint.get("browseId"):
+            if wanted_type is None or page_type(endpoint) == wanted_type:
+                yield endpoint
+
+
+def watch_video_ids(node) -> Iterator[str]:
+    for d in walk(node):
+        endpoint = d.get("watchEndpoint")
+        if isinstance(endpoint, dict) and endpoint.get("videoId"):
+            yield endpoint["videoId"]
+
+
+def runs_text(node) -> str:
+    runs = (node or {}).get("runs") or []
+    return "".join(run.get("text", "") for run in runs).strip()
+
+
+def album_url(browse_id: str) -> str:
+    return f"https://music.youtube.com/browse/{browse_id}"
+
+
+def song_url(video_id: str) -> str:
+    return f"https://music.youtube.com/watch?v={video_id}"
+
+
+def is_album_shelf(title: str) -> bool:
+    return title in ALBUM_SHELF_TITLES or "Album" in title
+
+
+class InnertubeResolver(Resolver):
+    """
+    Browserless resolver using YouTube Music's JSON API (the one the web app calls).
+    A few HTTP requests per artist instead of a full Chromium session.
+    """
+    name = "http"
+
+    def __init__(self, base_url: str = INNERTUBE_BASE_URL, timeout: float = 15, language: str = "en",
+                 limiter: Optional[RateLimiter] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.language = language
+        self.limiter = limiter
+        self.requests = 0
+
+    def _post(self, endpoint: str, payload: dict) -> dict:
+        body = {
+            "context": {"client": {
+                "clientName": INNERTUBE_CLIENT_NAME,
+                "clientVersion": INNERTUBE_CLIENT_VERSION,
+                "hl": self.language,
+            }},
+            **payload,
+        }
+        request = urllib.request.Request(
+            f"{self.base_url}/youtubei/v1/{endpoint}?prettyPrint=false",
+            data=json.dumps(body).encode("utf-8"),
+            headers={
+                "Content-Type": "application/json",
+                "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                "Origin": "https://music.youtube.com",
+                "X-YouTube-Client-Name": INNERTUBE_CLIENT_ID,
+                "X-YouTube-Client-Version": INNERTUBE_CLIENT_VERSION,
+            },
+            method="POST",
+        )
+        limiter = self.limiter or get_rate_limiter()
+        limiter.acquire()
+        self.requests += 1
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            limiter.observe(e.code)
+            raise ResolverError(f"{endpoint} request failed: {e}") from e
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise ResolverError(f"{endpoint} request failed: {e}") from e
+
+    def search(self, query: str) -> dict:
+        return self._post("search", {"query": query})
+
+    def browse(self, browse_id: str, params: Optional[str] = None) -> dict:
+        payload = {"browseId": browse_id}
+        if params:
+            payload["params"] = params
+        return self._post("browse", payload)
+
+    def find_artist_channel(self, artist_name: str) -> str:
+        for endpoint in browse_endpoints(self.search(artist_name), PAGE_TYPE_ARTIST):
+            return endpoint["browseId"]
+        raise ResolverError(f"No artist found for '{artist_name}'")
+
+    def get_artist_albums(self, artist_url, artist_name=None) -> List[str]:
+        if artist_name:
+            channel_id = self.find_artist_channel(artist_name)
+        else:
+            match = CHANNEL_ID_RE.search(artist_url or "")
+            if not match:
+                raise ResolverError(f"Can't find a channel id in {artist_url}")
+            channel_id = match.group(1)
+
+        page = self.browse(channel_id)
+        urls: List[str] = []
+        found_shelf = False
+        for d in walk(page):
+            shelf = d.get("musicCarouselShelfRenderer")
+            if not isinstance(shelf, dict):
+                continue
+            header = shelf.get("header", {}).get("musicCarouselShelfBasicHeaderRenderer", {})
+            if not is_album_shelf(runs_text(header.get("title"))):
+                continue
+            found_shelf = True
+            more = (header.get("moreContentButton", {}).get("buttonRenderer", {})
+                    .get("navigationEndpoint", {}).get("browseEndpoint"))
+            # The "More" page lists the full discography for this shelf
+            source = self.browse(more["browseId"], more.get("params")) if more else shelf
+            urls.extend(album_url(e["browseId"]) for e in browse_endpoints(source, PAGE_TYPE_ALBUM))
+
+        if not found_shelf:
+            # Fallback: any album link on the artist page
+            urls.extend(album_url(e["browseId"]) for e in browse_endpoints(page, PAGE_TYPE_ALBUM))
+
+        # Keep first-seen order, drop duplicates
+        return list(dict.fromkeys(urls))
+
+    def get_search_results(self, query):
+        results = self.search(query)
+        found_song = None
+        for d in walk(results):
+            shelf = d.get("musicShelfRenderer")
+            if not isinstance(shelf, dict):
+                continue
+            title = runs_text(shelf.get("title")).lower()
+            if "albums" in title or "albümler" in title:
+                for endpoint in browse_endpoints(shelf.get("contents"), PAGE_TYPE_ALBUM):
+                    return album_url(endpoint["browseId"]), 'album'
+            if ("songs" in title or "şarkılar" in title) and not found_song:
+                found_song = next(watch_video_ids(shelf.get("contents")), None)
+        if found_song:
+            return song_url(found_song), 'song'
+
+        # Top result card
+        for d in walk(results):
+            card = d.get("musicCardShelfRenderer")
+            if isinstance(card, dict):
+                for endpoint in browse_endpoints(card, PAGE_TYPE_ALBUM):
+                    return album_url(endpoint["browseId"]), 'album'
+                video_id = next(watch_video_ids(card), None)
+                if video_id:
+                    return song_url(video_id), 'song'
+        return None, None
+
+
+class ScraperResolver(Resolver):
+    """
+    Selenium-backed resolver: the warm scraper service, or a local browser when it isn't running.
+    Step timings are reported to the job as the 'scraper' metrics section.
+    """
+    name = "browser"
+
+    def get_artist_albums(self, artist_url, artist_name=None):
+        # A scrape is a handful of page loads; count it as one request
+        get_rate_limiter().acquire()
+        service = connect_scraper_service()
+        if service is not None:
+            album_urls, timings = service.get_artist_albums(artist_url, artist_name)
+            report_scrape_timings(timings)
+            return album_urls
+
+        from .scraper import MusicScraper
+        # Use headless=False because running with xvfb (virtual display)
+        # This avoids bot detection that blocks headless browsers.
+        scraper = MusicScraper(headless=False, driver_path=resolve_driver_path())
+        try:
+            return scraper.get_artist_albums(artist_url, artist_name)
+        finally:
+            report_scrape_timings(scraper.last_timings)
+            scraper.close()
+
+    def get_search_results(self, query):
+        get_rate_limiter().acquire()
+        service = connect_scraper_service()
+        if service is not None:
+            result, timings = service.get_search_results(query)
+            report_scrape_timings(timings)
+            return result
+
+        from .scraper import MusicScraper
+        scraper = MusicScraper(headless=False, driver_path=resolve_driver_path())
+        try:
+            return scraper.get_search_results(query)
+        finally:
+            report_scrape_timings(scraper.last_timings)
+            scraper.close()
+
+
+def report_scrape_timings(timings):
+    if not timings:
+        return
+    steps = ", ".join(f"{step}={duration:.2f}s" for step, duration in timings.get("steps", {}).items())
+    print(f"Scrape timings ({timings.get('name')}): total={timings.get('total', 0):.2f}s {steps}")
+    report_metrics("scraper", timings)
+
+
+class FallbackResolver(Resolver):
+    """
+    Tries resolvers in order; an error or an empty result moves on to the next one.
+    """
+    name = "fallback"
+
+    def __init__(self, resolvers: List[Resolver]):
+        self.resolvers = resolvers
+
+    def _run(self, method: str, *args):
+        empty = None
+        for resolver in self.resolvers:
+            start = time.perf_counter()
+            try:
+                result = getattr(resolver, method)(*args)
+            except Exception as e:
+                print(f"Resolver '{resolver.name}' failed: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            if result and (not isinstance(result, tuple) or result[0]):
+                print(f"Resolved with '{resolver.name}' in {elapsed:.2f}s.")
+                report_metrics("resolver", {"backend": resolver.name, "method": method, "seconds": round(elapsed, 4)})
+                return result
+            print(f"Resolver '{resolver.name}' returned nothing, trying next.")
+            empty = result
+        return empty if empty is not None else ([] if method == "get_artist_albums" else (None, None))
+
+    def get_artist_albums(self, artist_url, artist_name=None):
+        return self._run("get_artist_albums", artist_url, artist_name)
+
+    def get_search_results(self, query):
+        return self._run("get_search_results", query)
+
+
+class CachingResolver(Resolver):
+    """
+    Serves repeated artist/search resolutions from the persistent ResolutionCache.
+    Hit/miss counters are reported to the job as the 'resolution_cache' metrics section.
+    """
+    name = "cache"
+
+    def __init__(self, inner: Resolver, cache: Optional[ResolutionCache] = None):
+        self.inner = inner
+        self.cache = cache or ResolutionCache()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, kind, key, compute, is_empty):
+        try:
+            value = self.cache.get(kind, key)
+        except Exception as e:
+            print(f"Warning: Resolution cache unavailable: {e}")
+            value = None
+        if value is not None:
+            self.hits += 1
+            print(f"Resolution cache hit for {key}.")
+            self._report()
+            return value
+
+        self.misses += 1
+        value = compute()
+        # Empty results are not cached so a transient failure doesn't stick around
+        if not is_empty(value):
+            try:
+                self.cache.set(kind, key, value)
+            except Exception as e:
+                print(f"Warning: Could not store resolution for {key}: {e}")
+        self._report()
+        return value
+
+    def _report(self):
+        report_metrics("resolution_cache", {"hits": self.hits, "misses": self.misses})
+
+    def get_artist_albums(self, artist_url, artist_name=None):
+        return self._cached(
+            "artist", artist_key(artist_url, artist_name),
+            lambda: self.inner.get_artist_albums(artist_url, artist_name),
+            lambda albums: not albums,
+        )
+
+    def get_search_results(self, query):
+        url, result_type = self._cached(
+            "search", search_key(query),
+            lambda: list(self.inner.get_search_results(query)),
+            lambda result: not result[0],
+        )
+        return url, result_type
+
+
+def get_resolver(mode: str = RESOLVER_MODE, use_cache: bool = True) -> Resolver:
+    if mode == "http":
+        resolver = FallbackResolver([InnertubeResolver()])
+    elif mode == "browser":
+        resolver = FallbackResolver([ScraperResolver()])
+    else:
+        resolver = FallbackResolver([InnertubeResolver(), ScraperResolver()])
+    return CachingResolver(resolver) if use_cache else resolver
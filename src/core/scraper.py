@@ -8,9 +8,22 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from .timing import StepTimer
+from .dom_extract import (
+    extract_grid_items, album_urls_from_items, extract_shelves, find_album_shelf,
+    extract_search_results, pick_search_result, click_popups,
+)
+
+# Short polling interval used by all condition waits
+POLL_INTERVAL = 0.1
+# How long the resource count must stay flat to consider the page idle
+NETWORK_IDLE_TIME = 0.5
+# Max time to wait for lazy content to extend the page after a scroll
+SCROLL_SETTLE_TIMEOUT = 2.0
+MAX_SCROLLS = 5
 
 class MusicScraper:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, driver_path=None):
         self.options = ChromeOptions()
         self.options.binary_location = "/usr/bin/chromium"
         if headless:
@@ -23,7 +36,20 @@ class MusicScraper:
         self.options.add_experimental_option("excludeSwitches", ["enable-automation"])
         self.options.add_experimental_option('useAutomationExtension', False)
         
+        self.warmed = False
+        self.timer = StepTimer()
+        self.last_timings = None
+        self.last_items = []
+
         # Initialize driver
+        # A resolved driver path skips the webdriver_manager lookup entirely
+        if driver_path:
+            self.driver = webdriver.Chrome(
+                service=ChromeService(driver_path),
+                options=self.options
+            )
+            return
+
         try:
             self.driver = webdriver.Chrome(
                 service=ChromeService(ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()),
@@ -40,12 +66,17 @@ class MusicScraper:
         """
         Scrapes the artist page to find all albums using DOM selectors.
         If artist_name is provided, uses search navigation.
+        Per-step timings of the scrape are left in self.last_timings.
         """
-        # Warm up
-        print("DEBUG: Warming up with home page...")
-        self.driver.get("https://music.youtube.com")
-        time.sleep(3)
-        self._handle_popups()
+        self.timer = StepTimer("get_artist_albums")
+        try:
+            return self._get_artist_albums(artist_url, artist_name)
+        finally:
+            self.last_timings = self.timer.to_dict()
+
+    def _get_artist_albums(self, artist_url, artist_name=None):
+        if not self.warmed:
+            self.warm_up()
         
         if artist_name:
             print(f"DEBUG: Searching for artist '{artist_name}'...")
@@ -56,9 +87,7 @@ class MusicScraper:
                 from urllib.parse import quote
                 # Force English for consistent "Albums" title match
                 search_url = f"https://music.youtube.com/search?q={quote(artist_name)}&hl=en"
-                self.driver.get(search_url)
-                
-                time.sleep(3)
+                self._navigate(search_url)
                 self._handle_popups()
                 
                 # Wait for results
@@ -67,6 +96,7 @@ class MusicScraper:
                 )
                 
                 results = self.driver.find_elements(By.TAG_NAME, "ytmusic-responsive-list-item-renderer")
+                search_page_url = self.driver.current_url
                 for res in results:
                      # Check if it is an artist
                      # Can check the secondary text or icon?
@@ -83,7 +113,7 @@ class MusicScraper:
                      
                      break
                 
-                time.sleep(5) # Wait for navigation
+                self._wait_for_navigation(search_page_url)
                 self._handle_popups()
                 print(f"DEBUG: Post-search URL: {self.driver.current_url}")
                 print(f"DEBUG: Page Title: {self.driver.title}")
@@ -109,8 +139,9 @@ class MusicScraper:
                         artist_link = self.driver.find_element(By.CSS_SELECTOR, ".byline.style-scope.ytmusic-player-bar a")
                         if artist_link:
                             print(f"DEBUG: Found artist link on song page: {artist_link.get_attribute('href')}")
+                            song_page_url = self.driver.current_url
                             self.driver.execute_script("arguments[0].click();", artist_link)
-                            time.sleep(3)
+                            self._wait_for_navigation(song_page_url)
                             self._handle_popups()
                             print(f"DEBUG: Redirected URL: {self.driver.current_url}")
                     except Exception as e:
@@ -125,7 +156,7 @@ class MusicScraper:
                 return []
         else:
             print(f"Scraping {artist_url} with Selenium...")
-            self.driver.get(artist_url)
+            self._navigate(artist_url)
         
         album_urls = set()
 
@@ -140,7 +171,8 @@ class MusicScraper:
                 self.driver.save_screenshot("debug_timeout.png")
                 return []
 
-            time.sleep(3) # Initial buffer
+            # Let the shelves finish loading instead of a fixed buffer
+            self._wait_network_idle()
             self._handle_popups()
 
             # 2. Check if we need to click "Albums" -> "More"
@@ -151,40 +183,27 @@ class MusicScraper:
             print("DEBUG: Scrolling to load lazy content...")
             self._scroll_page()
             
-            # Find all shelves (carousel or normal)
-            shelves = self.driver.find_elements(By.CSS_SELECTOR, "ytmusic-carousel-shelf-renderer, ytmusic-shelf-renderer")
-            albums_shelf = None
-            
-            for shelf in shelves:
-                try:
-                    title_el = shelf.find_element(By.CSS_SELECTOR, "h2.title yt-formatted-string")
-                    title_text = title_el.text.strip()
-                    # Check for English or Turkish or loose match
-                    if title_text in ["Albums", "Albümler", "Singles", "Tekliler"] or "Album" in title_text:
-                        print(f"Found 'Albums' shelf: {title_text}")
-                        albums_shelf = shelf
-                        break
-                except (NoSuchElementException, Exception):
-                    continue
+            # Find all shelves (carousel or normal) with their titles and "More" buttons in one call
+            with self.timer.span("extract"):
+                albums_shelf = find_album_shelf(extract_shelves(self.driver))
             
             if albums_shelf:
+                print(f"Found 'Albums' shelf: {albums_shelf['title']}")
                 # Check for "More" button
-                try:
-                    more_btn = albums_shelf.find_element(By.CSS_SELECTOR, ".more-button")
-                    if more_btn.is_displayed():
-                        print("Found 'More' button. Clicking...")
-                        self.driver.execute_script("arguments[0].scrollIntoView(true);", more_btn)
-                        time.sleep(1)
-                        more_btn.click()
-                        time.sleep(3)
-                        self._scroll_page()
-                        self._scrape_grid_items(album_urls)
-                        return list(album_urls)
-                except NoSuchElementException:
+                more_btn = albums_shelf["more"]
+                if more_btn is not None:
+                    print("Found 'More' button. Clicking...")
+                    self.driver.execute_script("arguments[0].scrollIntoView(true);", more_btn)
+                    self._wait_until(EC.element_to_be_clickable(more_btn), timeout=5)
+                    artist_page_url = self.driver.current_url
+                    more_btn.click()
+                    self._wait_for_navigation(artist_page_url)
+                    self._scroll_page()
+                    self._scrape_grid_items(album_urls)
+                    return list(album_urls)
+                else:
                     print("No 'More' button found, scraping carousel items directly.")
-                    items = albums_shelf.find_elements(By.TAG_NAME, "ytmusic-two-row-item-renderer")
-                    for item in items:
-                        self._extract_url_from_renderer(item, album_urls)
+                    self._scrape_grid_items(album_urls, root=albums_shelf["element"])
             
             # Fallback for direct page scraping if specific shelf logic didn't return
             if not album_urls:
@@ -195,8 +214,7 @@ class MusicScraper:
             if not album_urls and artist_url and "/channel/" in artist_url:
                 print("No items found on /channel/ URL. Retrying with /browse/ variant...")
                 browse_url = artist_url.replace("/channel/", "/browse/")
-                self.driver.get(browse_url)
-                time.sleep(3)
+                self._navigate(browse_url)
                 self._handle_popups()
                 self._scrape_grid_items(album_urls)
 
@@ -206,63 +224,147 @@ class MusicScraper:
         
         return list(album_urls)
 
-    def _scrape_grid_items(self, url_set):
-        """Scrapes ytmusic-two-row-item-renderer elements from the current view."""
-        items = self.driver.find_elements(By.TAG_NAME, "ytmusic-two-row-item-renderer")
-        print(f"DEBUG: Found {len(items)} items in grid/list.")
-        for item in items:
-            self._extract_url_from_renderer(item, url_set)
+    def warm_up(self):
+        """
+        Visits the home page once so cookies/consent are settled before real work.
+        """
+        print("DEBUG: Warming up with home page...")
+        with self.timer.span("warm_up"):
+            self.driver.get("https://music.youtube.com")
+            self._wait_ready()
+            self._wait_until(EC.presence_of_element_located((By.TAG_NAME, "ytmusic-app-layout")), timeout=15)
+            self._wait_network_idle()
+        self._handle_popups()
+        self.warmed = True
 
-    def _extract_url_from_renderer(self, item, url_set):
+    def _wait_until(self, condition, timeout=10):
+        """
+        Polls condition(driver) until it is truthy. Returns its value, or None on timeout.
+        """
         try:
-            # Look for the link
-            # Browser subagent: a.image-wrapper or .title-column a
-            links = item.find_elements(By.TAG_NAME, "a")
-            for link in links:
-                href = link.get_attribute("href")
-                if href and ("browse/MPREb" in href or "playlist?list=OL" in href):
-                    # print(f"DEBUG: Found URL: {href}")
-                    url_set.add(href)
-        except:
-            pass
+            return WebDriverWait(self.driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+        except TimeoutException:
+            return None
+
+    def _wait_ready(self, timeout=15):
+        """Waits for the DOM to finish loading."""
+        return self._wait_until(
+            lambda d: d.execute_script("return document.readyState") == "complete", timeout
+        )
+
+    def _wait_network_idle(self, idle_time=NETWORK_IDLE_TIME, timeout=10):
+        """
+        Waits until the page stops requesting resources for idle_time seconds.
+        YTM is a single page app, so readyState alone doesn't cover in-page navigation.
+        """
+        deadline = time.monotonic() + timeout
+        last_count, last_change = -1, time.monotonic()
+        while time.monotonic() < deadline:
+            try:
+                count = self.driver.execute_script("return performance.getEntriesByType('resource').length")
+            except Exception:
+                return
+            now = time.monotonic()
+            if count != last_count:
+                last_count, last_change = count, now
+            elif now - last_change >= idle_time:
+                return
+            time.sleep(POLL_INTERVAL)
+
+    def _navigate(self, url):
+        with self.timer.span("navigate"):
+            self.driver.get(url)
+            self._wait_ready()
+            self._wait_network_idle()
+
+    def _wait_for_navigation(self, old_url, timeout=10):
+        """Waits for a click to move the page away from old_url and for the new page to settle."""
+        with self.timer.span("navigate"):
+            self._wait_until(EC.url_changes(old_url), timeout)
+            self._wait_ready()
+            self._wait_network_idle()
+
+    def is_healthy(self):
+        """
+        Returns True if the browser still answers WebDriver commands.
+        """
+        try:
+            self.driver.execute_script("return document.readyState")
+            return True
+        except Exception:
+            return False
+
+    def browser_pid(self):
+        try:
+            return self.driver.service.process.pid
+        except Exception:
+            return None
+
+    def _scrape_grid_items(self, url_set, root=None):
+        """
+        Scrapes ytmusic-two-row-item-renderer elements from the current view (or under root).
+        All hrefs/titles are collected in a single script call; records are kept in self.last_items.
+        """
+        with self.timer.span("extract"):
+            try:
+                items = extract_grid_items(self.driver, root)
+            except Exception as e:
+                print(f"DEBUG: Grid extraction failed: {e}")
+                return
+            print(f"DEBUG: Found {len(items)} items in grid/list.")
+            self.last_items = items
+            url_set.update(album_urls_from_items(items))
 
     def _handle_popups(self):
         # Dismiss "Install YouTube Music" or generic consent
         # Selector suggestions: caption or aria-label="Dismiss"
-        try:
-             # Heuristic for "No thanks" buttons
-             buttons = self.driver.find_elements(By.TAG_NAME, "button")
-             for btn in buttons:
-                 text = btn.text.lower()
-                 if "no thanks" in text or "reject" in text or "dismiss" in text:
-                     btn.click()
-                     time.sleep(1)
-        except:
-            pass
+        with self.timer.span("popups"):
+            try:
+                 # Heuristic for "No thanks" buttons, matched and clicked in one script call
+                 clicked = click_popups(self.driver)
+                 if clicked:
+                     # Wait for the dialog to go away rather than a fixed pause
+                     self._wait_until(EC.invisibility_of_element(clicked[-1]), timeout=2)
+            except:
+                pass
 
     def _scroll_page(self):
         """Scrolls to the bottom of the page to load lazy content."""
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
-        for _ in range(5): # Limit scroll to avoid infinite loops
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
+        with self.timer.span("scroll"):
+            last_height = self.driver.execute_script("return document.body.scrollHeight")
+            for _ in range(MAX_SCROLLS): # Limit scroll to avoid infinite loops
+                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                # Stop as soon as the height stops growing instead of sleeping a fixed time
+                new_height = self._wait_until(
+                    lambda d: self._height_if_grown(last_height), timeout=SCROLL_SETTLE_TIMEOUT
+                )
+                if not new_height:
+                    break
+                last_height = new_height
+
+    def _height_if_grown(self, last_height):
+        height = self.driver.execute_script("return document.body.scrollHeight")
+        return height if height != last_height else None
 
     def get_search_results(self, query):
         """
         Searches for a query and returns the first result, prioritizing Albums.
         Returns: (url, type) where type is 'album' or 'song' or None
+        Per-step timings of the scrape are left in self.last_timings.
         """
+        self.timer = StepTimer("get_search_results")
+        try:
+            return self._get_search_results(query)
+        finally:
+            self.last_timings = self.timer.to_dict()
+
+    def _get_search_results(self, query):
         print(f"DEBUG: Searching for '{query}'...")
         from urllib.parse import quote
         
         # Search URL
         search_url = f"https://music.youtube.com/search?q={quote(query)}&hl=en"
-        self.driver.get(search_url)
-        time.sleep(3)
+        self._navigate(search_url)
         self._handle_popups()
         
         try:
@@ -274,91 +376,21 @@ class MusicScraper:
             print("DEBUG: No results found or timeout.")
             return None, None
 
-        # Look for shelves
-        shelves = self.driver.find_elements(By.TAG_NAME, "ytmusic-shelf-renderer")
-        
-        album_url = None
-        song_url = None
-        
-        for shelf in shelves:
-            try:
-                title_el = shelf.find_element(By.CSS_SELECTOR, "h2.title yt-formatted-string")
-                title_text = title_el.text.strip().lower()
-                
-                # Check for "Albums"
-                if "albums" in title_text or "albümler" in title_text:
-                    print("DEBUG: Found Albums section.")
-                    # Get first item
-                    items = shelf.find_elements(By.TAG_NAME, "ytmusic-responsive-list-item-renderer")
-                    if items:
-                         # Link is usually in the first 'a' tag inside 'div.title-column' or similar
-                         # Let's try to find 'a' with href containing 'browse'
-                         links = items[0].find_elements(By.TAG_NAME, "a")
-                         for link in links:
-                             href = link.get_attribute("href")
-                             if href and "browse" in href:
-                                 album_url = href
-                                 break
-                    if album_url: break
+        with self.timer.span("extract"):
+            return self._extract_search_results()
 
-                # Check for "Songs" (only if we haven't found an album yet? Or keep looking?)
-                # We prioritize albums, so we can save song url as fallback.
-                if ("songs" in title_text or "şarkılar" in title_text) and not song_url:
-                    print("DEBUG: Found Songs section.")
-                    items = shelf.find_elements(By.TAG_NAME, "ytmusic-responsive-list-item-renderer")
-                    if items:
-                         # Song links usually contain 'watch'
-                         links = items[0].find_elements(By.TAG_NAME, "a")
-                         for link in links:
-                             href = link.get_attribute("href")
-                             if href and "watch" in href:
-                                 song_url = href
-                                 break
-            except:
-                continue
-        
-        if album_url:
-            print(f"DEBUG: Selected Album URL: {album_url}")
-            return album_url, 'album'
-        elif song_url:
-            print(f"DEBUG: Selected Song URL: {song_url}")
-            return song_url, 'song'
-        
-        # If specific shelves not found, try "Top result" logic?
-        # For now, let's return None if strict sections aren't found, OR check the top result.
-        
-        print("DEBUG: No specific Album or Song section found. Checking Top Result...")
-        try:
-             # Top result usually in 'ytmusic-card-shelf-renderer'
-             card = self.driver.find_element(By.TAG_NAME, "ytmusic-card-shelf-renderer")
-             title = card.find_element(By.CLASS_NAME, "title").text.lower()
-             print(f"DEBUG: Top result is '{title}'")
-             
-             # Extract link
-             link = card.find_element(By.TAG_NAME, "a").get_attribute("href")
-             
-             # Extract link
-             link = card.find_element(By.TAG_NAME, "a").get_attribute("href")
-             
-             if "watch" in link:
-                 print(f"DEBUG: Top result is a Song based on URL.")
-                 return link, 'song'
-             elif "browse" in link and "channel" not in link:
-                 # It might be an album or artist. 
-                 # Albums often have MPREb or OLAK
-                 print(f"DEBUG: Top result is likely an Album based on URL.")
-                 return link, 'album'
-             
-             # If "album" or "song" text was in title, fallback to that (though link is better)
-             if "album" in title or "albüm" in title:
-                  return link, 'album'
-             elif "song" in title or "şarkı" in title:
-                  return link, 'song'
-             
-        except:
-            pass
+    def _extract_search_results(self):
+        # Shelf titles, first-item links and the top result card in one call
+        results = extract_search_results(self.driver)
+        for shelf in results.get("shelves", []):
+            print(f"DEBUG: Found '{shelf['title']}' section.")
+        if results.get("top"):
+            print(f"DEBUG: Top result is '{results['top']['title']}'")
 
-        return None, None
+        url, result_type = pick_search_result(results)
+        if url:
+            print(f"DEBUG: Selected {result_type.capitalize()} URL: {url}")
+        return url, result_type
 
     def close(self):
         self.driver.quit()
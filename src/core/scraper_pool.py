@@ -0,0 +1,331 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import current_process
+from multiprocessing.managers import BaseManager
+from typing import Callable, List, Optional
+
+from .config import DATA_DIR, data_path
+
+POOL_SIZE = int(os.environ.get("YTM_SCRAPER_POOL_SIZE", "2"))
+MAX_USES = int(os.environ.get("YTM_SCRAPER_MAX_USES", "25"))
+MAX_RSS_MB = int(os.environ.get("YTM_SCRAPER_MAX_RSS_MB", "1500"))
+LEASE_TIMEOUT = float(os.environ.get("YTM_SCRAPER_LEASE_TIMEOUT", "600"))
+
+SERVICE_ADDRESS = os.environ.get("YTM_SCRAPER_SERVICE_ADDRESS", os.path.join(DATA_DIR, "scraper.sock"))
+# Shared secret for the service socket. Unset, each API run uses its process's random
+# authkey, which the job processes it forks inherit
+SERVICE_AUTHKEY = os.environ.get("YTM_SCRAPER_SERVICE_AUTHKEY", "").encode() or None
+
+DRIVER_CACHE_FILE = "chromedriver.json"
+# Debian's chromium-driver package, installed in the Docker image
+SYSTEM_DRIVER_PATHS = ["/usr/bin/chromedriver", "/usr/lib/chromium/chromedriver"]
+
+
+def resolve_driver_path() -> Optional[str]:
+    """
+    Returns a chromedriver path, resolving it at most once per install.
+    The result is cached on disk so webdriver_manager never runs on the hot path.
+    """
+    cache_file = os.path.join(DATA_DIR, DRIVER_CACHE_FILE)
+    try:
+        with open(cache_file) as f:
+            path = json.load(f).get("path")
+        if path and os.access(path, os.X_OK):
+            return path
+    except (OSError, ValueError):
+        pass
+
+    path = next((p for p in SYSTEM_DRIVER_PATHS if os.access(p, os.X_OK)), None)
+    if path is None:
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            from webdriver_manager.core.os_manager import ChromeType
+            try:
+                path = ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()
+            except Exception:
+                path = ChromeDriverManager().install()
+        except Exception as e:
+            print(f"Warning: Could not resolve chromedriver: {e}")
+            return None
+
+    try:
+        with open(data_path(DRIVER_CACHE_FILE), "w") as f:
+            json.dump({"path": path, "resolved_at": time.time()}, f)
+    except OSError:
+        pass
+    return path
+
+
+def process_tree_rss(pid: Optional[int]) -> int:
+    """
+    Resident memory (bytes) of a process and all of its descendants, read from /proc.
+    Returns 0 where /proc is unavailable.
+    """
+    if not pid or not os.path.isdir("/proc"):
+        return 0
+    children = {}
+    rss = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Field 4 is ppid; the command name may contain spaces, so split after ')'
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/statm") as f:
+                rss[int(entry)] = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += rss.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total
+
+
+class PooledSession:
+    def __init__(self, scraper):
+        self.scraper = scraper
+        self.uses = 0
+        self.created_at = time.time()
+
+
+class ScraperPool:
+    """
+    Size-limited pool of warmed MusicScraper sessions.
+
+    Sessions are health-checked when leased and recycled after max_uses
+    leases or when the browser's memory grows past max_rss_mb.
+    """
+
+    def __init__(self, factory: Callable, size: int = POOL_SIZE, max_uses: int = MAX_USES, max_rss_mb: int = MAX_RSS_MB):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self._idle: List[PooledSession] = []
+        self._total = 0
+        self._cond = threading.Condition()
+        self.created = 0
+        self.recycled = 0
+        self.leases = 0
+
+    def _create(self) -> PooledSession:
+        scraper = self.factory()
+        try:
+            scraper.warm_up()
+        except Exception as e:
+            print(f"Warning: Scraper warm-up failed: {e}")
+        self.created += 1
+        return PooledSession(scraper)
+
+    def _destroy(self, session: PooledSession):
+        try:
+            session.scraper.close()
+        except Exception:
+            pass
+
+    def prewarm(self, count: Optional[int] = None):
+        """Fills the pool with up to `count` warmed idle sessions."""
+        count = self.size if count is None else min(count, self.size)
+        while True:
+            with self._cond:
+                if self._total >= count:
+                    return
+                self._total += 1
+            try:
+                session = self._create()
+            except Exception as e:
+                with self._cond:
+                    self._total -= 1
+                print(f"Warning: Could not prewarm scraper session: {e}")
+                return
+            with self._cond:
+                self._idle.append(session)
+                self._cond.notify()
+
+    def acquire(self, timeout: float = LEASE_TIMEOUT) -> PooledSession:
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._total >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        raise TimeoutError("No scraper session available")
+                if self._idle:
+                    session = self._idle.pop()
+                else:
+                    session = None
+                    self._total += 1
+
+            if session is None:
+                try:
+                    session = self._create()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+            elif not session.scraper.is_healthy():
+                print("Scraper session failed health check, replacing it.")
+                self._retire(session)
+                continue
+
+            self.leases += 1
+            return session
+
+    def release(self, session: PooledSession):
+        session.uses += 1
+        rss = process_tree_rss(session.scraper.browser_pid())
+        if session.uses >= self.max_uses or (self.max_rss and rss > self.max_rss):
+            print(f"Recycling scraper session after {session.uses} uses ({rss // (1024 * 1024)} MB).")
+            self._retire(session)
+            return
+        with self._cond:
+            self._idle.append(session)
+            self._cond.notify()
+
+    def _retire(self, session: PooledSession):
+        self._destroy(session)
+        with self._cond:
+            self._total -= 1
+            self.recycled += 1
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: float = LEASE_TIMEOUT):
+        session = self.acquire(timeout)
+        try:
+            yield session.scraper
+        except Exception:
+            # A failing scrape may leave the browser in a bad state; don't hand it out again
+            self._retire(session)
+            raise
+        else:
+            self.release(session)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self.size,
+                "total": self._total,
+                "idle": len(self._idle),
+                "created": self.created,
+                "recycled": self.recycled,
+                "leases": self.leases,
+            }
+
+    def close(self):
+        with self._cond:
+            sessions, self._idle = self._idle, []
+            self._total -= len(sessions)
+        for session in sessions:
+            self._destroy(session)
+
+
+def _make_scraper():
+    from .scraper import MusicScraper
+    # Use headless=False because running with xvfb (virtual display)
+    # This avoids bot detection that blocks headless browsers.
+    return MusicScraper(headless=False, driver_path=resolve_driver_path())
+
+
+class ScraperService:
+    """
+    Lives in the dedicated scraper process and serves scrape calls from jobs.
+    """
+
+    def __init__(self, size: int = POOL_SIZE):
+        self.pool = ScraperPool(_make_scraper, size=size)
+        threading.Thread(target=self.pool.prewarm, name="scraper-prewarm", daemon=True).start()
+
+    def get_artist_albums(self, artist_url, artist_name=None):
+        """Returns (album_urls, timings)."""
+        start = time.perf_counter()
+        with self.pool.lease() as scraper:
+            waited = time.perf_counter() - start
+            albums = scraper.get_artist_albums(artist_url, artist_name)
+            return albums, self._timings(scraper, waited)
+
+    def get_search_results(self, query):
+        """Returns ((url, result_type), timings)."""
+        start = time.perf_counter()
+        with self.pool.lease() as scraper:
+            waited = time.perf_counter() - start
+            result = scraper.get_search_results(query)
+            return result, self._timings(scraper, waited)
+
+    @staticmethod
+    def _timings(scraper, lease_wait):
+        timings = dict(scraper.last_timings or {})
+        timings["lease_wait"] = round(lease_wait, 4)
+        return timings
+
+    def stats(self):
+        return self.pool.stats()
+
+
+_service: Optional[ScraperService] = None
+_service_lock = threading.Lock()
+
+
+def _get_service() -> ScraperService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ScraperService()
+        return _service
+
+
+class ScraperServiceManager(BaseManager):
+    pass
+
+
+ScraperServiceManager.register("ScraperService", callable=_get_service)
+
+
+def service_authkey() -> bytes:
+    return SERVICE_AUTHKEY or bytes(current_process().authkey)
+
+
+def start_scraper_service(address: str = SERVICE_ADDRESS) -> Optional[ScraperServiceManager]:
+    """
+    Starts the scraper service process. Called once by the API server.
+    """
+    if os.path.exists(address):
+        # Stale socket from a previous run
+        os.remove(address)
+    os.makedirs(os.path.dirname(address), exist_ok=True)
+    manager = ScraperServiceManager(address=address, authkey=service_authkey())
+    # The socket accepts pickles: only our own user may connect to it
+    umask = os.umask(0o077)
+    try:
+        manager.start()
+    finally:
+        os.umask(umask)
+    os.chmod(address, 0o600)
+    # Instantiate the service right away so the pool starts warming up
+    manager.ScraperService()
+    print(f"Scraper service started at {address}")
+    return manager
+
+
+def connect_scraper_service(address: str = SERVICE_ADDRESS):
+    """
+    Returns a proxy to the running scraper service, or None if it isn't running
+    (e.g. CLI usage), in which case callers fall back to a local MusicScraper.
+    """
+    if not os.path.exists(address):
+        return None
+    manager = ScraperServiceManager(address=address, authkey=service_authkey())
+    try:
+        manager.connect()
+        return manager.ScraperService()
+    except Exception as e:
+        print(f"Warning: Scraper service unavailable ({e}), using a local browser.")
+        return None
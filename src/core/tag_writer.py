@@ -0,0 +1,169 @@
+import base64
+import os
+from typing import Dict, Optional, Tuple
+
+from mutagen.easyid3 import EasyID3
+from mutagen.easymp4 import EasyMP4, EasyMP4Tags
+from mutagen.flac import Picture
+from mutagen.id3 import APIC, PictureType
+from mutagen.mp3 import EasyMP3
+from mutagen.mp4 import MP4Cover
+from mutagen.oggopus import OggOpus
+from mutagen.oggvorbis import OggVorbis
+
+from .artwork import COVER_TYPES, image_type, sniff_image
+
+# Tag padding reserved when a file is first tagged (and whenever a write has to grow
+# the tag anyway), so later edits fit in place instead of rewriting the whole file
+TAG_PADDING = int(os.environ.get("YTM_TAG_PADDING", "8192"))
+
+
+class CountingFile:
+    """
+    File object wrapper counting the bytes mutagen writes through it.
+    It deliberately has no fileno(), so mutagen moves data with plain writes that get counted.
+    """
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.written = 0
+
+    def read(self, size=-1):
+        return self.fileobj.read(size)
+
+    def write(self, data):
+        self.written += len(data)
+        return self.fileobj.write(data)
+
+    def seek(self, offset, whence=0):
+        return self.fileobj.seek(offset, whence)
+
+    def tell(self):
+        return self.fileobj.tell()
+
+    def truncate(self, size=None):
+        return self.fileobj.truncate(size)
+
+    def flush(self):
+        return self.fileobj.flush()
+
+
+class DryRunFile(CountingFile):
+    """
+    Read-only stand-in for the file during a dry run: reads come from the real file,
+    writes are only counted (the position still advances as if they happened).
+    """
+
+    def write(self, data):
+        self.written += len(data)
+        self.fileobj.seek(len(data), os.SEEK_CUR)
+        return len(data)
+
+    def truncate(self, size=None):
+        return size
+
+
+class FullRewrite(Exception):
+    """Raised by the dry-run padding policy to stop mutagen before it moves any audio."""
+
+
+def padding_policy(reserve: bool, result: Dict, file_size: Optional[int] = None):
+    """
+    mutagen padding callback. Keeps whatever padding is left when the new tags fit
+    (an in-place write), otherwise grows the tag with TAG_PADDING of headroom.
+    With reserve, also grows tags that have less than TAG_PADDING left (new files).
+    Given file_size (dry runs), a full rewrite is not carried out but estimated as the
+    whole resized file and signalled with FullRewrite.
+    """
+    def policy(info):
+        in_place = info.padding >= 0 and not (reserve and info.padding < TAG_PADDING)
+        result["in_place"] = in_place
+        padding = info.padding if in_place else max(info.padding, TAG_PADDING)
+        if file_size is not None and not in_place:
+            result["bytes_written"] = file_size + padding - info.padding
+            raise FullRewrite()
+        return padding
+    return policy
+
+
+def write_tags(audio, reserve: bool = False, dry_run: bool = False) -> Dict:
+    """
+    Saves the (already modified) tags of a mutagen file in a single write.
+    Returns {'in_place': bool, 'bytes_written': int}. A dry run writes nothing and reads
+    no audio: in-place writes are counted exactly, full rewrites estimated from the
+    padding mutagen reports.
+    """
+    result = {"in_place": False, "bytes_written": 0}
+    if dry_run:
+        with open(audio.filename, "rb") as f:
+            target = DryRunFile(f)
+            try:
+                audio.save(target, padding=padding_policy(reserve, result, os.fstat(f.fileno()).st_size))
+            except FullRewrite:
+                return result
+    else:
+        with open(audio.filename, "rb+") as f:
+            target = CountingFile(f)
+            audio.save(target, padding=padding_policy(reserve, result))
+    result["bytes_written"] = target.written
+    return result
+
+
+# Album art as an easy tag ('cover', a one-item list of image bytes) for ID3 and MP4,
+# so it is diffed and saved in the same single write as the text tags
+
+def _id3_cover_get(id3, key):
+    frames = id3.getall('APIC')
+    if not frames:
+        raise KeyError(key)
+    return [frames[0].data]
+
+
+def _id3_cover_set(id3, key, value):
+    id3.delall('APIC')
+    id3.add(APIC(encoding=3, mime=image_type(value[0])[1], type=PictureType.COVER_FRONT, desc='Cover', data=value[0]))
+
+
+def _id3_cover_delete(id3, key):
+    id3.delall('APIC')
+
+
+def _mp4_cover_get(mp4, key):
+    covers = mp4.get('covr')
+    if not covers:
+        raise KeyError(key)
+    return [bytes(covers[0])]
+
+
+def _mp4_cover_set(mp4, key, value):
+    fmt = MP4Cover.FORMAT_PNG if image_type(value[0])[0] == '.png' else MP4Cover.FORMAT_JPEG
+    mp4['covr'] = [MP4Cover(value[0], imageformat=fmt)]
+
+
+def _mp4_cover_delete(mp4, key):
+    del mp4['covr']
+
+
+EasyID3.RegisterKey('cover', _id3_cover_get, _id3_cover_set, _id3_cover_delete)
+EasyMP4Tags.RegisterKey('cover', _mp4_cover_get, _mp4_cover_set, _mp4_cover_delete)
+
+
+def cover_tag(audio, data: bytes) -> Optional[Tuple[str, list]]:
+    """
+    (key, value) that embeds image bytes as the front cover of an easy mutagen file:
+    'cover' for ID3/MP4, a METADATA_BLOCK_PICTURE comment for Ogg Opus/Vorbis.
+    None when the container or image format can't carry it.
+    """
+    kind = sniff_image(data)
+    if kind is None or kind[0] not in COVER_TYPES:
+        return None
+    ext, mime = kind
+    if isinstance(audio, (EasyMP3, EasyMP4)) or isinstance(audio.tags, (EasyID3, EasyMP4Tags)):
+        return 'cover', [data]
+    if isinstance(audio, (OggOpus, OggVorbis)):
+        picture = Picture()
+        picture.type = PictureType.COVER_FRONT
+        picture.mime = mime
+        picture.data = data
+        return 'metadata_block_picture', [base64.b64encode(picture.write()).decode('ascii')]
+    return None
@@ -0,0 +1,43 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+class StepTimer:
+    """
+    Records named timing spans (e.g. navigate, popups, scroll, extract) for one operation.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self.spans: List[Dict] = []
+
+    @contextmanager
+    def span(self, step: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans.append({
+                "step": step,
+                "start": round(start - self._origin, 4),
+                "duration": round(end - start, 4),
+            })
+
+    def totals(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span["step"]] = round(totals.get(span["step"], 0.0) + span["duration"], 4)
+        return totals
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "total": round(time.perf_counter() - self._origin, 4),
+            "steps": self.totals(),
+            "spans": self.spans,
+        }
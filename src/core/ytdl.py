@@ -0,0 +1,29 @@
+import yt_dlp
+from yt_dlp.networking.exceptions import HTTPError
+
+from .rate_limiter import RateLimiter, get_rate_limiter
+
+
+class ThrottledYoutubeDL(yt_dlp.YoutubeDL):
+    """
+    YoutubeDL whose HTTP requests (extractor API calls and media downloads alike)
+    draw from the shared rate limiter. Throttling responses and bot-check errors
+    slow down every worker sharing the bucket.
+    """
+
+    def __init__(self, params=None, auto_init=True, limiter: RateLimiter = None):
+        self.limiter = limiter or get_rate_limiter()
+        super().__init__(params, auto_init)
+
+    def urlopen(self, req):
+        self.limiter.acquire()
+        try:
+            return super().urlopen(req)
+        except HTTPError as e:
+            self.limiter.observe(e)
+            raise
+
+    def report_error(self, message, *args, **kwargs):
+        # Extraction errors (e.g. "Sign in to confirm you're not a bot") only surface here
+        self.limiter.observe(message)
+        return super().report_error(message, *args, **kwargs)
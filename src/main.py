@@ -1,5 +1,7 @@
 import click
-from .core.downloader import download_artist_albums, download_search_query, scan_and_fix_library
+from .core.downloader import download_artist_albums, download_search_query, scan_and_fix_library, find_library_duplicates
+from .core.ledger import DownloadLedger
+from .core.engine import AUDIO_PROFILES
 
 @click.command()
 @click.option('--artist-url', required=False, help='URL of the artist on music.youtube.com')
@@ -9,18 +11,36 @@ from .core.downloader import download_artist_albums, download_search_query, scan
 @click.option('--max-album-length', default=None, type=int, help='Skip albums with more than this number of tracks')
 @click.option('--search', required=False, help='Search and download an album or song')
 @click.option('--fix-library', is_flag=True, help='Scan music folder and fix metadata for all files')
-@click.option('--dry-run', is_flag=True, help='List albums without downloading')
-def main(artist_url, artist_name, limit, song_limit, max_album_length, dry_run, search, fix_library):
+@click.option('--full-scan', is_flag=True, help='With --fix-library, re-examine every file instead of only new or changed ones')
+@click.option('--scan-workers', default=None, type=int, help='Processes fixing tags during --fix-library or hashing during --find-duplicates (default: CPU count; use 1-2 for spinning disks)')
+@click.option('--scan-io-depth', default=None, type=int, help='File chunks in flight during --fix-library (default: YTM_SCAN_IO_DEPTH or 2 per worker)')
+@click.option('--find-duplicates', is_flag=True, help='Report tracks stored more than once (same audio, whatever the tags)')
+@click.option('--link-duplicates', is_flag=True, help='With --find-duplicates, replace byte-identical copies with hard links')
+@click.option('--dry-run', is_flag=True, help='List albums without downloading; with --fix-library, list planned tag changes and write volume without writing')
+@click.option('--io-workers', default=None, type=int, help='Number of threads downloading tracks (default: YTM_IO_WORKERS or 4)')
+@click.option('--cpu-workers', default=None, type=int, help='Number of processes post-processing (transcoding) downloaded tracks (default: YTM_CPU_WORKERS or CPU count)')
+@click.option('--audio-profile', default=None, type=click.Choice(list(AUDIO_PROFILES)), help='Output audio: m4a (AAC remuxed when available), opus (Opus passthrough) or transcode (always AAC); default: YTM_AUDIO_PROFILE or m4a')
+@click.option('--import-archive', default=None, type=click.Path(exists=True, dir_okay=False), help='Import a yt-dlp download_archive.txt into the download ledger')
+def main(artist_url, artist_name, limit, song_limit, max_album_length, dry_run, search, fix_library, full_scan, scan_workers, scan_io_depth, find_duplicates, link_duplicates, io_workers, cpu_workers, audio_profile, import_archive):
     """
     Download all albums from a YouTube Music artist URL or Name, or search for a specific album/song.
     """
+    if import_archive:
+        added = DownloadLedger().import_text_archive(import_archive)
+        click.echo(f"Imported {added} entries into the download ledger.")
+        return
+
     if fix_library:
-        scan_and_fix_library()
+        scan_and_fix_library(full=full_scan, workers=scan_workers, io_depth=scan_io_depth, dry_run=dry_run)
+        return
+
+    if find_duplicates:
+        find_library_duplicates(link=link_duplicates, workers=scan_workers)
         return
 
     if search:
         click.echo(f"Searching for: {search}")
-        download_search_query(search, song_limit=song_limit)
+        download_search_query(search, song_limit=song_limit, io_workers=io_workers, cpu_workers=cpu_workers, audio_profile=audio_profile)
         return
 
     if not artist_url and not artist_name:
@@ -28,7 +48,7 @@ def main(artist_url, artist_name, limit, song_limit, max_album_length, dry_run,
         return
 
     click.echo(f"Processing artist: {artist_name or artist_url}")
-    download_artist_albums(artist_url, artist_name, limit=limit, song_limit=song_limit, max_album_length=max_album_length, dry_run=dry_run)
+    download_artist_albums(artist_url, artist_name, limit=limit, song_limit=song_limit, max_album_length=max_album_length, dry_run=dry_run, io_workers=io_workers, cpu_workers=cpu_workers, audio_profile=audio_profile)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,56 @@
+"""Minimal audio files for tests that need real containers but no encoder."""
+import os
+import struct
+
+from mutagen import File as MutagenFile
+from mutagen.ogg import OggPage
+
+# One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz); enough for mutagen
+MP3_FRAME = b'\xff\xfb\x90\x00' + b'\x00' * 413
+
+
+def write_mp3(path, frames=10, **tags):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(MP3_FRAME * frames)
+    tag(path, **tags)
+
+
+def tag(path, **tags):
+    audio = MutagenFile(path, easy=True)
+    audio.add_tags()
+    for key, value in tags.items():
+        audio[key] = value
+    audio.save()
+
+
+def atom(kind, payload=b''):
+    return struct.pack('>I', 8 + len(payload)) + kind + payload
+
+
+def write_m4a(path, audio=b'\x01' * 4000, **tags):
+    # Just enough of an MP4 for mutagen: ftyp, moov with a sound track header, and payload
+    mvhd = atom(b'mvhd', b'\x00' * 4 + struct.pack('>IIII', 0, 0, 1000, 10000) + b'\x00' * 80)
+    mdhd = atom(b'mdhd', b'\x00' * 4 + struct.pack('>IIII', 0, 0, 44100, 441000) + b'\x00' * 4)
+    hdlr = atom(b'hdlr', b'\x00' * 8 + b'soun' + b'\x00' * 13)
+    moov = atom(b'moov', mvhd + atom(b'trak', atom(b'mdia', mdhd + hdlr)))
+    with open(path, 'wb') as f:
+        f.write(atom(b'ftyp', b'M4A \x00\x00\x00\x00M4A mp42isom') + moov + atom(b'mdat', audio))
+    if tags:
+        tag(path, **tags)
+
+
+def write_opus(path, packets=20):
+    head = b'OpusHead' + struct.pack('<BBHIhB', 1, 2, 312, 48000, 0, 0)
+    tags = b'OpusTags' + struct.pack('<I', 4) + b'test' + struct.pack('<I', 0)
+    pages = []
+    for sequence, (packet, granule) in enumerate([(head, 0), (tags, 0)] +
+                                                 [(bytes([i]) * 300, 960 * (i + 1)) for i in range(packets)]):
+        page = OggPage()
+        page.serial, page.sequence, page.position = 1, sequence, granule
+        page.first = sequence == 0
+        page.last = sequence == packets + 1
+        page.packets = [packet]
+        pages.append(page)
+    with open(path, 'wb') as f:
+        f.write(b''.join(page.write() for page in pages))
@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from src.core.album import AlbumState, clean_album_folder
+from src.core.artwork import best_thumbnail_url
+
+class TestAlbumState(unittest.TestCase):
+    def test_completes_once_after_last_track(self):
+        completed = []
+        album = AlbumState("url", {"title": "A", "entries": [{}] * 20}, on_complete=completed.append)
+        threads = [threading.Thread(target=album.track_done, args=(f"/m/A/{i}.m4a" if i % 4 else None,)) for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(completed, [album])
+        self.assertEqual(len(album.filepaths), 15)
+        self.assertEqual(album.failed, 5)
+        self.assertEqual(album.directory, "/m/A")
+
+    def test_best_thumbnail(self):
+        manifest = {"thumbnails": [
+            {"url": "small", "width": 60, "height": 60},
+            {"url": "large", "width": 544, "height": 544},
+            {"url": "medium", "width": 226, "height": 226},
+        ]}
+        self.assertEqual(best_thumbnail_url(manifest), "large")
+        self.assertEqual(best_thumbnail_url({"thumbnails": [{"url": "a"}, {"url": "b"}]}), "b")
+        self.assertIsNone(best_thumbnail_url({}))
+
+class TestCleanAlbumFolder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def touch(self, name):
+        open(os.path.join(self.tmp, name), "w").close()
+
+    def test_removes_leftovers_only(self):
+        for name in ("Song.m4a", "Song.webp", "Other.m4a", "Other.temp.m4a", "Lost.webm.part",
+                     "cover.jpg", "Orphan.jpg"):
+            self.touch(name)
+        self.assertEqual(clean_album_folder(self.tmp), 3)
+        self.assertEqual(sorted(os.listdir(self.tmp)), ["Orphan.jpg", "Other.m4a", "Song.m4a", "cover.jpg"])
+
+if __name__ == '__main__':
+    unittest.main()
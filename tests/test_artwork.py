@@ -0,0 +1,97 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from mutagen import File as MutagenFile
+
+from src.core.artwork import ArtworkCache, ArtworkStats, fetch_album_art, sniff_image
+from src.core.downloader import fix_metadata
+from src.core.rate_limiter import RateLimiter
+from tests.helpers import write_mp3
+
+JPEG = b'\xff\xd8\xff' + b'\x01' * 1000
+PNG = b'\x89PNG' + b'\x02' * 1000
+WEBP = b'RIFF' + b'\x00' * 4 + b'WEBPVP8 ' + b'\x04' * 1000
+
+
+class TestArtworkCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = ArtworkCache(os.path.join(self.tmp, "artwork"), max_bytes=2500)
+        patcher = mock.patch("src.core.artwork.get_rate_limiter", return_value=RateLimiter(rate=0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp)
+
+    def test_same_content_stored_once(self):
+        self.assertEqual(self.cache.put(JPEG, "a"), self.cache.put(JPEG, "b"))
+        self.assertEqual(self.cache.stats()["images"], 1)
+        self.assertEqual(self.cache.get_url("b"), JPEG)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.put(JPEG, "jpeg")
+        self.cache.put(PNG, "png")
+        self.cache.get_url("jpeg")
+        self.cache.put(b'\xff\xd8\xff' + b'\x03' * 1000, "other")
+        self.assertIsNone(self.cache.get_url("png"))
+        self.assertEqual(self.cache.get_url("jpeg"), JPEG)
+
+    def test_fetch_once_per_url(self):
+        manifest = {"thumbnails": [{"url": "http://img/cover"}]}
+        with mock.patch("urllib.request.urlopen", return_value=io.BytesIO(JPEG)) as urlopen, \
+                mock.patch("src.core.artwork.artwork_stats", ArtworkStats()) as stats:
+            self.assertEqual(fetch_album_art(manifest, 12, self.cache), JPEG)
+            self.assertEqual(fetch_album_art(manifest, 8, self.cache), JPEG)
+        self.assertEqual(urlopen.call_count, 1)
+        self.assertEqual((stats.requests, stats.cache_hits, stats.requests_saved), (1, 1, 19))
+        self.assertEqual(stats.bytes_saved, 19 * len(JPEG))
+
+    def test_other_formats_cached_as_jpeg(self):
+        self.assertEqual(sniff_image(WEBP)[0], '.webp')
+        self.assertIsNone(sniff_image(b'RIFF\x00\x00\x00\x00WAVEfmt '))
+        converted = mock.Mock(returncode=0, stdout=JPEG, stderr=b'')
+        with mock.patch("subprocess.run", return_value=converted) as run:
+            digest = self.cache.put(WEBP, "webp")
+        self.assertEqual(run.call_args.kwargs["input"], WEBP)
+        self.assertTrue(os.path.exists(self.cache.blob_path(digest, '.jpg')))
+        self.assertEqual(self.cache.get_url("webp"), JPEG)
+
+    def test_unconvertible_images_are_not_cached(self):
+        with mock.patch("subprocess.run", side_effect=FileNotFoundError("ffmpeg")), \
+                mock.patch("builtins.print"):
+            self.assertIsNone(self.cache.put(WEBP, "webp"))
+        self.assertIsNone(self.cache.get_url("webp"))
+
+
+class TestEmbedCover(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "Artist", "one.mp3")
+        write_mp3(self.path, artist=["Artist"], albumartist=["Artist"])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_embeds_once(self):
+        with mock.patch("builtins.print"):
+            first = fix_metadata(self.path, "Artist", cover=JPEG)
+            second = fix_metadata(self.path, "Artist", cover=JPEG)
+        self.assertEqual(list(first["changes"]), ["cover"])
+        self.assertFalse(second["rewritten"])
+        self.assertEqual(MutagenFile(self.path).tags.getall("APIC")[0].data, JPEG)
+
+    def test_skips_unknown_image_formats(self):
+        with mock.patch("builtins.print"):
+            result = fix_metadata(self.path, "Artist", cover=WEBP)
+        self.assertNotIn("cover", result["changes"])
+        self.assertEqual(MutagenFile(self.path).tags.getall("APIC"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
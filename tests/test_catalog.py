@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.core import downloader
+from src.core.catalog import LibraryCatalog, fts_query, track_fields
+from src.core.downloader import open_easy
+from src.core.library_index import LibraryIndex
+from tests.helpers import write_mp3
+
+
+def fields(artist, album, title, albumartist=None, year=None):
+    return {"artist": artist, "albumartist": albumartist, "album": album, "title": title,
+            "year": year, "duration": 200.0, "codec": "mp4a.40.2"}
+
+
+class TestLibraryCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.catalog = LibraryCatalog(os.path.join(self.tmp, "catalog.db"))
+        st = os.stat(self.tmp)
+        self.catalog.record_many([
+            ("/m/Sezen Aksu/Gülümse/1.m4a", st, fields("Sezen Aksu", "Gülümse", "Hadi Bakalım", "Sezen Aksu", 1991)),
+            ("/m/Sezen Aksu/Gülümse/2.m4a", st, fields("Sezen Aksu", "Gülümse", "Gülümse", "Sezen Aksu", 1991)),
+            ("/m/Sezen Aksu/Deniz Yıldızı/1.m4a", st, fields("Sezen Aksu", "Deniz Yıldızı", "Vazgeçtim")),
+            ("/m/Tarkan/Karma/1.m4a", st, fields("Tarkan", "Karma", "Kuzu Kuzu", "Tarkan", 2001)),
+            ("/m/NA/NA/x.m4a", st, fields("Unknown", None, "Demo")),
+        ])
+
+    def tearDown(self):
+        self.catalog.close()
+        shutil.rmtree(self.tmp)
+
+    def test_full_text_search(self):
+        tracks, total = self.catalog.search(q="gulumse")
+        self.assertEqual(total, 2)
+        # The title match ranks above the album-only match
+        self.assertEqual(tracks[0]["title"], "Gülümse")
+        tracks, total = self.catalog.search(q="tark kuz")
+        self.assertEqual([t["title"] for t in tracks], ["Kuzu Kuzu"])
+        self.assertEqual(self.catalog.search(q='" OR *'), ([], 0))
+
+    def test_filters_and_pagination(self):
+        tracks, total = self.catalog.search(artist="sezen aksu", limit=2, offset=1)
+        self.assertEqual(total, 3)
+        self.assertEqual(len(tracks), 2)
+        tracks, _ = self.catalog.search(missing="albumartist")
+        self.assertEqual(sorted(t["title"] for t in tracks), ["Demo", "Vazgeçtim"])
+        with self.assertRaises(ValueError):
+            self.catalog.search(missing="path; DROP TABLE tracks")
+
+    def test_albums(self):
+        albums, total = self.catalog.albums(artist="Sezen Aksu")
+        self.assertEqual(total, 2)
+        self.assertEqual([(a["album"], a["tracks"]) for a in albums], [("Deniz Yıldızı", 1), ("Gülümse", 2)])
+        self.assertEqual(albums[1]["year"], 1991)
+        self.assertEqual(albums[1]["directory"], "/m/Sezen Aksu/Gülümse")
+        albums, total = self.catalog.albums(q="kuzu")
+        self.assertEqual([a["album"] for a in albums], ["Karma"])
+        # Tracks without an album tag aren't albums
+        self.assertEqual(self.catalog.albums()[1], 3)
+
+    def test_updates_and_prune_keep_search_in_sync(self):
+        st = os.stat(self.tmp)
+        self.catalog.record("/m/Tarkan/Karma/1.m4a", st, fields("Tarkan", "Karma", "Şımarık", "Tarkan"))
+        self.assertEqual(self.catalog.search(q="kuzu")[1], 0)
+        self.assertEqual(self.catalog.search(q="Şımarık")[1], 1)
+        self.assertEqual(self.catalog.prune({"/m/Tarkan/Karma/1.m4a"}, "/m/Sezen Aksu/"), 3)
+        self.assertEqual(len(self.catalog), 2)
+        self.assertEqual(self.catalog.search(q="sezen")[1], 0)
+
+    def test_fts_query_quotes_words(self):
+        self.assertEqual(fts_query('AC/DC "live"'), '"AC"* "DC"* "live"*')
+        self.assertIsNone(fts_query("  -- "))
+
+
+class TestCatalogScan(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.music = os.path.join(self.tmp, "music")
+        self.index = LibraryIndex(os.path.join(self.tmp, "index.db"))
+        self.catalog = LibraryCatalog(os.path.join(self.tmp, "catalog.db"))
+        self.path = os.path.join(self.music, "Artist", "Album", "one.mp3")
+        write_mp3(self.path, artist=["Artist"], album=["Album"], title=["One"], date=["2003-05-01"])
+
+    def tearDown(self):
+        self.index.close()
+        self.catalog.close()
+        shutil.rmtree(self.tmp)
+
+    def scan(self):
+        with mock.patch("builtins.print"):
+            return downloader.scan_and_fix_library(base_path=self.music, index=self.index, catalog=self.catalog)
+
+    def test_track_fields(self):
+        track = track_fields(open_easy(self.path))
+        self.assertEqual((track["artist"], track["album"], track["year"], track["codec"]), ("Artist", "Album", 2003, "mp3"))
+        self.assertGreater(track["duration"], 0)
+
+    def test_scan_fills_catalog(self):
+        self.scan()
+        tracks, _ = self.catalog.search(q="one")
+        self.assertEqual(tracks[0]["path"], os.path.abspath(self.path))
+        # Fixed tags are catalogued, not the ones found on disk
+        self.assertEqual(tracks[0]["albumartist"], "Artist")
+        self.assertEqual(tracks[0]["size"], os.path.getsize(self.path))
+
+    def test_indexed_files_missing_from_catalog_are_examined(self):
+        self.scan()
+        self.catalog.prune(set())
+        stats = self.scan()
+        self.assertEqual((stats["examined"], stats["rewritten"]), (1, 0))
+        self.assertEqual(len(self.catalog), 1)
+        self.assertEqual(self.scan()["skipped"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.album import AlbumState
+from src.core.checkpoint import CheckpointStore, JobCheckpoint, func_path, resolve_func, TRACK_DONE, TRACK_FAILED
+from src.core.job_manager import JobManager, JobStatus, INTERRUPTED_ERROR
+
+
+def noop(*args, **kwargs):
+    pass
+
+
+class FakeManager(JobManager):
+    """JobManager that records starts instead of spawning processes."""
+    def __new__(cls, store):
+        return object.__new__(cls)
+
+    def __init__(self, store):
+        self._init()
+        self.enable_checkpoints(store)
+        self.started = []
+
+    def _start_job(self, job, func):
+        job.status = JobStatus.RUNNING
+        job.started_at = 0
+        self.started.append(job.id)
+        self._publish_job(job)
+
+
+class TestCheckpointStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = CheckpointStore(os.path.join(self.tmp, "checkpoints.db"))
+        self.checkpoint = JobCheckpoint("job-1", self.store)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp)
+
+    def test_albums_unresolved_until_saved(self):
+        self.assertIsNone(self.checkpoint.albums())
+        self.checkpoint.save_albums(["a", "b", "c"])
+        self.checkpoint.album_done("b")
+        self.assertEqual(self.checkpoint.albums(), ["a", "b", "c"])
+        self.assertEqual(self.checkpoint.albums(include_done=False), ["a", "c"])
+
+    def test_manifest_round_trip(self):
+        self.checkpoint.save_albums(["a"])
+        manifest = {"title": "A", "entries": [{"id": "x", "ie_key": "Youtube"}]}
+        self.checkpoint.save_manifest("a", manifest)
+        self.assertEqual(self.checkpoint.manifest("a"), manifest)
+        self.assertIsNone(self.checkpoint.manifest("b"))
+        # Expanding an album doesn't change its place in the list
+        self.assertEqual(self.checkpoint.albums(include_done=False), ["a"])
+
+    def test_track_states_and_partial_offsets(self):
+        self.checkpoint.track_state("youtube x", "a", "downloading")
+        self.checkpoint.progress_hook("youtube x")({"status": "downloading", "tmpfilename": "x.part", "downloaded_bytes": 1024})
+        track = self.checkpoint.tracks("a")["youtube x"]
+        self.assertEqual((track["partial_path"], track["partial_bytes"]), ("x.part", 1024))
+        self.checkpoint.track_state("youtube x", "a", TRACK_DONE, "x.m4a")
+        self.assertEqual(self.checkpoint.tracks("a")["youtube x"]["state"], TRACK_DONE)
+        self.assertEqual(self.checkpoint.summary()["tracks"], {TRACK_DONE: 1})
+
+    def test_clear_keeps_other_jobs(self):
+        other = JobCheckpoint("job-2", self.store)
+        self.checkpoint.save_albums(["a"])
+        other.save_albums(["b"])
+        self.checkpoint.clear()
+        self.assertIsNone(self.checkpoint.albums())
+        self.assertEqual(other.albums(), ["b"])
+
+    def test_func_round_trip(self):
+        self.assertIs(resolve_func(func_path(noop)), noop)
+
+    def test_album_records_tracks(self):
+        self.checkpoint.save_albums(["a"])
+        album = AlbumState("a", {"entries": [{}, {}]}, checkpoint=self.checkpoint)
+        album.track_done("one.m4a", {"id": "1", "extractor_key": "Youtube"})
+        album.track_done(None, {"id": "2", "extractor_key": "Youtube"})
+        tracks = self.checkpoint.tracks("a")
+        self.assertEqual(tracks["youtube 1"]["state"], TRACK_DONE)
+        self.assertEqual(tracks["youtube 2"]["state"], TRACK_FAILED)
+        # A failed track keeps the album pending for the next resume
+        self.assertEqual(self.checkpoint.albums(include_done=False), ["a"])
+
+
+class TestResumeJob(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = CheckpointStore(os.path.join(self.tmp, "checkpoints.db"))
+        self.manager = FakeManager(self.store)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp)
+
+    def test_resume_failed_job_keeps_id(self):
+        job_id = self.manager.create_job("artist", "a1", noop, "url", limit=2)
+        job = self.manager.get_job(job_id)
+        self.assertIsNone(self.manager.resume_job(job_id))  # still running
+        job.status = JobStatus.FAILED
+        self.manager._release_slot(job)
+        self.assertIs(self.manager.resume_job(job_id), job)
+        self.assertEqual(self.manager.started, [job_id, job_id])
+        self.assertEqual(self.store.get_job(job_id)["status"], JobStatus.RUNNING.value)
+
+    def test_recover_interrupted_after_restart(self):
+        job_id = self.manager.create_job("artist", "a1", noop, "url", limit=2)
+        restarted = FakeManager(self.store)
+        recovered = restarted.recover_interrupted()
+        self.assertEqual([job.id for job in recovered], [job_id])
+        job = restarted.get_job(job_id)
+        self.assertEqual((job.status, job.error), (JobStatus.FAILED, INTERRUPTED_ERROR))
+        self.assertEqual((job.args, job.kwargs, job.func), (("url",), {"limit": 2}, noop))
+
+        restarted.resume_job(job_id)
+        self.assertEqual(restarted.started, [job_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
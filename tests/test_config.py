@@ -0,0 +1,34 @@
+import unittest
+from unittest import mock
+
+from src.core import config
+
+MOUNTS = """overlay / overlay rw 0 0
+server:/export/music /app/music nfs4 rw 0 0
+/dev/sda1 /app/music/local ext4 rw 0 0
+//nas/share /mnt/my\\040share cifs rw 0 0
+"""
+
+
+class TestJournalMode(unittest.TestCase):
+    def setUp(self):
+        config.filesystem_type.cache_clear()
+        patcher = mock.patch("builtins.open", mock.mock_open(read_data=MOUNTS))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(config.filesystem_type.cache_clear)
+
+    def test_longest_mount_point_wins(self):
+        self.assertEqual(config.filesystem_type("/app/music/Artist"), "nfs4")
+        self.assertEqual(config.filesystem_type("/app/music/local/x"), "ext4")
+        self.assertEqual(config.filesystem_type("/app/musicians"), "overlay")
+        self.assertEqual(config.filesystem_type("/mnt/my share/a"), "cifs")
+
+    def test_network_filesystems_skip_wal(self):
+        self.assertEqual(config.journal_mode("/app/music/.ytm/ledger.db"), "DELETE")
+        self.assertEqual(config.journal_mode("/mnt/my share/ledger.db"), "DELETE")
+        self.assertEqual(config.journal_mode("/app/data/ledger.db"), "WAL")
+
+
+if __name__ == "__main__":
+    unittest.main()
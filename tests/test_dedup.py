@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from mutagen import File as MutagenFile
+
+from src.core.dedup import DedupIndex, find_duplicates, keeper_rank, payload_digest, track_key
+from tests.helpers import write_m4a, write_mp3, write_opus
+
+
+class TestPayloadDigest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def retag(self, path, **tags):
+        audio = MutagenFile(path, easy=True)
+        if audio.tags is None:
+            audio.add_tags()
+        for key, value in tags.items():
+            audio[key] = value
+        audio.save()
+
+    def assert_stable(self, path):
+        before = payload_digest(path, chunk_size=1000)
+        size = os.path.getsize(path)
+        self.retag(path, title=["A title"], album=["x" * 70000])
+        self.assertNotEqual(os.path.getsize(path), size)
+        self.assertEqual(payload_digest(path), before)
+
+    def test_mp3_ignores_id3(self):
+        path = os.path.join(self.tmp, "a", "one.mp3")
+        write_mp3(path, artist=["Artist"])
+        self.assert_stable(path)
+
+    def test_m4a_hashes_mdat_only(self):
+        path = os.path.join(self.tmp, "one.m4a")
+        write_m4a(path)
+        self.assert_stable(path)
+        other = os.path.join(self.tmp, "two.m4a")
+        write_m4a(other, b'\x02' * 4000)
+        self.assertNotEqual(payload_digest(other), payload_digest(path))
+
+    def test_opus_ignores_header_pages(self):
+        path = os.path.join(self.tmp, "one.opus")
+        write_opus(path)
+        # Big enough to spill the comment header over several pages, renumbering the audio pages
+        self.assert_stable(path)
+
+    def test_track_key(self):
+        self.assertEqual(track_key("Oğuz Aksaç, Sezen Aksu", " Yalan "), track_key("oguz aksac", "YALAN"))
+        self.assertIsNone(track_key("Artist", None))
+
+
+class TestFindDuplicates(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.music = os.path.join(self.tmp, "music")
+        self.index = DedupIndex(os.path.join(self.tmp, "dedup.db"))
+        self.album = os.path.join(self.music, "Artist", "Album", "Song.mp3")
+        self.na = os.path.join(self.music, "Artist", "NA", "Song.mp3")
+        self.single = os.path.join(self.music, "Artist", "Song - Single", "Song.mp3")
+        write_mp3(self.album, artist=["Artist"], title=["Song"], album=["Album"])
+        os.makedirs(os.path.dirname(self.na))
+        shutil.copyfile(self.album, self.na)
+        write_mp3(self.single, artist=["Artist"], title=["Song"], album=["Song - Single"])
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmp)
+
+    def find(self, **kwargs):
+        with mock.patch("builtins.print"):
+            return find_duplicates(self.music, index=self.index, workers=1, **kwargs)
+
+    def test_reports_copies_regardless_of_tags(self):
+        stats = self.find()
+        self.assertEqual((stats["hashed"], stats["duplicate_groups"], stats["duplicate_files"]), (3, 1, 2))
+        group = stats["groups"][0]
+        # The copy in the NA folder never wins
+        self.assertNotEqual(group["keep"], os.path.abspath(self.na))
+        self.assertIn(os.path.abspath(self.na), group["duplicates"])
+
+    def test_second_run_uses_cache(self):
+        self.find()
+        stats = self.find()
+        self.assertEqual((stats["hashed"], stats["cached"]), (0, 3))
+
+    def test_links_identical_copies_only(self):
+        stats = self.find(link=True)
+        self.assertEqual(stats["linked"], 1)
+        keep = stats["groups"][0]["keep"]
+        self.assertEqual(keep, os.path.abspath(self.album))
+        self.assertEqual(os.stat(self.album).st_ino, os.stat(self.na).st_ino)
+        self.assertNotEqual(os.stat(self.album).st_ino, os.stat(self.single).st_ino)
+        # Hard links count as one copy, and their digest comes from the cache
+        stats = self.find()
+        self.assertEqual((stats["duplicate_files"], stats["hashed"]), (1, 0))
+
+    def test_same_song_with_different_audio(self):
+        with open(self.single, "ab") as f:
+            f.write(b'\xff\xfb\x90\x00' + b'\x01' * 413)
+        stats = self.find()
+        self.assertEqual((stats["duplicate_files"], stats["same_song_groups"]), (1, 1))
+
+    def test_keeper_rank(self):
+        paths = ["/m/UCabcdefghijklmnopqrstuv/NA/x.m4a", "/m/A/Long Album Name/x.m4a", "/m/A/NA/x.m4a"]
+        self.assertEqual(sorted(paths, key=keeper_rank)[0], "/m/A/Long Album Name/x.m4a")
+
+
+if __name__ == "__main__":
+    unittest.main()
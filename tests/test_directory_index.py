@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.core.directory_index import DirectoryIndex, InvalidCursor, encode_cursor
+
+
+class TestDirectoryIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        for name in ("b-album", "A-album"):
+            os.makedirs(os.path.join(self.tmp, name))
+        for i, name in enumerate(("c.m4a", "a.m4a", "B.m4a", "d.m4a")):
+            with open(os.path.join(self.tmp, name), "wb") as f:
+                f.write(b"x" * (10 * (i + 1)))
+        self.index = DirectoryIndex()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def names(self, items):
+        return [item["name"] for item in items]
+
+    def walk(self, sort, limit):
+        listing = self.index.listing(self.tmp, "Artist")
+        names, cursor = [], None
+        while True:
+            items, cursor = listing.page(sort, limit, cursor)
+            names += self.names(items)
+            if cursor is None:
+                return names
+
+    def test_sorts_directories_first(self):
+        self.assertEqual(self.walk("name", 2), ["A-album", "b-album", "a.m4a", "B.m4a", "c.m4a", "d.m4a"])
+        self.assertEqual(self.walk("-name", 4), ["b-album", "A-album", "d.m4a", "c.m4a", "B.m4a", "a.m4a"])
+        self.assertEqual(self.walk("-size", 3), ["b-album", "A-album", "d.m4a", "B.m4a", "a.m4a", "c.m4a"])
+        items, _ = self.index.listing(self.tmp, "Artist").page("name", 10)
+        self.assertEqual(items[2]["path"], os.path.join("Artist", "a.m4a"))
+
+    def test_cached_until_directory_changes(self):
+        first = self.index.listing(self.tmp)
+        with mock.patch("os.scandir", side_effect=AssertionError("rescanned")):
+            self.assertIs(self.index.listing(self.tmp), first)
+        self.assertEqual(self.index.stats()["hits"], 1)
+
+        open(os.path.join(self.tmp, "e.m4a"), "w").close()
+        os.utime(self.tmp, ns=(0, first.mtime_ns + 1_000_000))
+        second = self.index.listing(self.tmp)
+        self.assertEqual(len(second.items), 7)
+        self.assertNotEqual(second.etag, first.etag)
+
+    def test_expired_rescan_keeps_etag_when_unchanged(self):
+        index = DirectoryIndex(ttl=0)
+        first = index.listing(self.tmp)
+        second = index.listing(self.tmp)
+        self.assertIsNot(first, second)
+        self.assertEqual(first.etag, second.etag)
+
+    def test_cursor_survives_insertions(self):
+        listing = self.index.listing(self.tmp)
+        page, cursor = listing.page("name", 3)
+        self.assertEqual(self.names(page), ["A-album", "b-album", "a.m4a"])
+        open(os.path.join(self.tmp, "0.m4a"), "w").close()
+        os.utime(self.tmp, ns=(0, listing.mtime_ns + 1_000_000))
+        page, _ = self.index.listing(self.tmp).page("name", 3, cursor)
+        self.assertEqual(self.names(page), ["B.m4a", "c.m4a", "d.m4a"])
+
+    def test_cursor_must_match_sort(self):
+        listing = self.index.listing(self.tmp)
+        _, cursor = listing.page("name", 1)
+        with self.assertRaises(InvalidCursor):
+            listing.page("size", 1, cursor)
+        with self.assertRaises(InvalidCursor):
+            listing.page("name", 1, "not-a-cursor")
+        for key in ([0, 5, "a", "a"], [0, "a"], "key", [0, "a", "a", None]):
+            with self.assertRaises(InvalidCursor):
+                listing.page("name", 1, encode_cursor("name", key))
+        with self.assertRaises(InvalidCursor):
+            listing.page("-size", 1, encode_cursor("-size", [0, "5", "a", "a"]))
+
+    def test_evicts_least_recently_used(self):
+        index = DirectoryIndex(max_entries=1)
+        index.listing(self.tmp)
+        index.listing(os.path.join(self.tmp, "A-album"))
+        self.assertEqual(index.stats()["directories"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
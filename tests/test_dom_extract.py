@@ -0,0 +1,35 @@
+import unittest
+from src.core.dom_extract import album_urls_from_items, find_album_shelf, pick_search_result
+
+class TestDomExtractRecords(unittest.TestCase):
+    def test_album_urls_from_items(self):
+        items = [
+            {"hrefs": ["https://music.youtube.com/browse/MPREb_a", "https://music.youtube.com/channel/UC1"]},
+            {"hrefs": ["https://music.youtube.com/playlist?list=OLAK5uy_b"]},
+            {"hrefs": ["https://music.youtube.com/watch?v=x"]},
+            {"hrefs": None},
+        ]
+        self.assertEqual(album_urls_from_items(items), [
+            "https://music.youtube.com/browse/MPREb_a",
+            "https://music.youtube.com/playlist?list=OLAK5uy_b",
+        ])
+
+    def test_find_album_shelf(self):
+        shelves = [{"title": "Top songs"}, {"title": "Albümler"}, {"title": "Albums"}]
+        self.assertEqual(find_album_shelf(shelves)["title"], "Albümler")
+        self.assertIsNone(find_album_shelf([{"title": "Videos"}]))
+
+    def test_pick_search_result_prefers_albums(self):
+        results = {"shelves": [
+            {"title": "Songs", "hrefs": ["https://music.youtube.com/watch?v=s1"]},
+            {"title": "Albums", "hrefs": ["https://music.youtube.com/channel/UC1", "https://music.youtube.com/browse/MPREb_a"]},
+        ], "top": None}
+        self.assertEqual(pick_search_result(results), ("https://music.youtube.com/browse/MPREb_a", "album"))
+
+    def test_pick_search_result_falls_back_to_top_card(self):
+        results = {"shelves": [], "top": {"title": "Song", "href": "https://music.youtube.com/watch?v=t"}}
+        self.assertEqual(pick_search_result(results), ("https://music.youtube.com/watch?v=t", "song"))
+        self.assertEqual(pick_search_result({"shelves": [], "top": None}), (None, None))
+
+if __name__ == '__main__':
+    unittest.main()
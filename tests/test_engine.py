@@ -0,0 +1,113 @@
+import functools
+import os
+import pickle
+import threading
+import time
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+from src.core.engine import (DownloadEngine, get_profile, is_stream_copy, postprocess_info,
+                             postprocessors_for, transcode_track)
+
+def _kill_worker(*args):
+    os._exit(1)
+
+class TestDownloadEngine(unittest.TestCase):
+    def test_io_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0, "done": 0}
+
+        def fetch(item, engine=None):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+                state["done"] += 1
+
+        with DownloadEngine(io_workers=3, cpu_workers=1) as engine:
+            engine.run(fetch, range(9))
+        self.assertEqual(state["done"], 9)
+        self.assertEqual(state["peak"], 3)
+
+    def test_tracks_of_a_long_album_spread_across_threads(self):
+        threads_by_album = {}
+        lock = threading.Lock()
+
+        def track(album):
+            time.sleep(0.02)
+            with lock:
+                threads_by_album.setdefault(album, set()).add(threading.current_thread().name)
+
+        def expand(item, engine=None):
+            album, tracks = item
+            return [functools.partial(track, album) for _ in range(tracks)]
+
+        with DownloadEngine(io_workers=3, cpu_workers=1) as engine:
+            start = time.perf_counter()
+            engine.run(expand, [("compilation", 12), ("single-a", 1), ("single-b", 1)])
+            elapsed = time.perf_counter() - start
+        self.assertEqual(len(threads_by_album["compilation"]), 3)
+        # 14 tracks of 20ms on 3 threads, not 12 in a row on one
+        self.assertLess(elapsed, 12 * 0.02)
+
+    def test_postprocess_info_is_picklable(self):
+        entry = {
+            "id": "abc", "title": "Song", "formats": [{"url": "x"}],
+            "__post_extractor": lambda: {}, "requested_downloads": [{"filepath": "a.webm"}],
+        }
+        info = postprocess_info(entry, {"filepath": "a.webm", "ext": "webm"})
+        self.assertEqual(info["filepath"], "a.webm")
+        self.assertNotIn("formats", info)
+        self.assertNotIn("__post_extractor", info)
+        pickle.dumps(info)
+
+    def test_transcode_failure_is_reported(self):
+        filepath, output, _ = transcode_track({"filepath": "/nonexistent/track.webm", "ext": "webm", "title": "Missing"})
+        self.assertIsNone(filepath)
+        self.assertIn("track.webm", output)
+
+    def test_failed_transcode_never_reaches_tagging(self):
+        engine = DownloadEngine(io_workers=1, cpu_workers=1).start()
+        pipeline = engine.pipeline
+        engine.submit({"filepath": "/nonexistent/track.webm", "ext": "webm", "title": "Missing", "id": "x", "extractor_key": "Youtube"})
+        engine.close()
+        stats = pipeline.stats()
+        self.assertEqual(stats["transcode"]["failed"], 1)
+        self.assertEqual(stats["tag"]["processed"], 0)
+
+    def test_broken_pool_finishes_track_and_recovers(self):
+        engine = DownloadEngine(io_workers=1, cpu_workers=1).start()
+        album = mock.Mock()
+        info = {"filepath": "a.webm", "ext": "webm", "title": "A"}
+        try:
+            with mock.patch("src.core.engine.transcode_track", _kill_worker):
+                with self.assertRaises(BrokenProcessPool):
+                    engine._transcode({"info": info, "artist_name": None, "album": album})
+            album.track_done.assert_called_once_with(None, info)
+            # Later tracks get a fresh pool
+            self.assertEqual(engine._run_in_pool(abs, -1), 1)
+        finally:
+            engine.close()
+
+class TestAudioProfiles(unittest.TestCase):
+    def test_stream_copy_detection(self):
+        m4a, opus = get_profile("m4a"), get_profile("opus")
+        self.assertTrue(is_stream_copy({"acodec": "mp4a.40.2"}, m4a))
+        self.assertFalse(is_stream_copy({"acodec": "opus"}, m4a))
+        self.assertTrue(is_stream_copy({"acodec": "opus"}, opus))
+        self.assertFalse(is_stream_copy({}, opus))
+
+    def test_profiles_prefer_copyable_streams(self):
+        self.assertTrue(get_profile("m4a")["format"].startswith("bestaudio[acodec^=mp4a]"))
+        self.assertTrue(get_profile("opus")["format"].startswith("bestaudio[acodec=opus]"))
+        extract = postprocessors_for(get_profile("opus"))[0]
+        self.assertEqual((extract["key"], extract["preferredcodec"]), ("FFmpegExtractAudio", "opus"))
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            get_profile("flac")
+
+if __name__ == '__main__':
+    unittest.main()
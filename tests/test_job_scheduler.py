@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+import time
+import unittest
+from unittest import mock
+from src.core.job_manager import JobManager, JobStatus, TERMINAL_STATUSES
+
+def noop():
+    pass
+
+def crash():
+    os._exit(3)
+
+def fail():
+    raise ValueError("boom")
+
+class FakeManager(JobManager):
+    """JobManager that records starts instead of spawning processes."""
+    def __new__(cls):
+        return object.__new__(cls)
+
+    def __init__(self):
+        self._init()
+        self.started = []
+
+    def _start_job(self, job, func):
+        job.status = JobStatus.RUNNING
+        job.started_at = 0
+        self.started.append(job.target)
+
+    def finish(self, target):
+        job = next(j for j in self.jobs.values() if j.target == target)
+        job.status = JobStatus.COMPLETED
+        self._release_slot(job)
+
+class TestJobScheduler(unittest.TestCase):
+    def setUp(self):
+        self.manager = FakeManager()
+        self.manager.configure(max_concurrent=2, lane_limits={"search": 1, "artist": 1, "library_scan": 1})
+
+    def test_jobs_stay_queued_until_slot_opens(self):
+        self.manager.create_job("artist", "a1", noop)
+        job_id = self.manager.create_job("artist", "a2", noop)
+        self.assertEqual(self.manager.started, ["a1"])
+        self.assertEqual(self.manager.get_job(job_id).status, JobStatus.QUEUED)
+        self.manager.finish("a1")
+        self.assertEqual(self.manager.started, ["a1", "a2"])
+
+    def test_global_budget_across_lanes(self):
+        self.manager.create_job("artist", "a1", noop)
+        self.manager.create_job("library_scan", "scan", noop)
+        self.manager.create_job("search", "s1", noop)
+        self.assertEqual(self.manager.started, ["a1", "scan"])
+        self.manager.finish("scan")
+        self.assertEqual(self.manager.started, ["a1", "scan", "s1"])
+
+    def test_priority_then_fifo(self):
+        self.manager.configure(max_concurrent=1)
+        self.manager.create_job("artist", "blocker", noop)
+        self.manager.create_job("artist", "low", noop)
+        self.manager.create_job("artist", "high", noop, priority=5)
+        self.manager.create_job("artist", "low2", noop)
+        self.manager.create_job("search", "search", noop)
+        for target in ["blocker", "search", "high", "low"]:
+            self.manager.finish(target)
+        self.assertEqual(self.manager.started, ["blocker", "search", "high", "low", "low2"])
+
+    def test_cancel_queued_job(self):
+        self.manager.create_job("artist", "a1", noop)
+        job_id = self.manager.create_job("artist", "a2", noop)
+        self.assertEqual(self.manager.queue_position(self.manager.get_job(job_id)), 1)
+        self.assertTrue(self.manager.cancel_job(job_id))
+        self.manager.finish("a1")
+        self.assertEqual(self.manager.started, ["a1"])
+        self.assertEqual(self.manager.get_job(job_id).status, JobStatus.CANCELLED)
+
+class TestJobMonitor(unittest.TestCase):
+    def setUp(self):
+        self.manager = object.__new__(JobManager)
+        self.manager._init()
+
+    def tearDown(self):
+        if self.manager._monitor:
+            self.manager._monitor.stop()
+
+    def wait_for(self, job_id, timeout=10):
+        job = self.manager.get_job(job_id)
+        deadline = time.time() + timeout
+        while job.status not in TERMINAL_STATUSES and time.time() < deadline:
+            time.sleep(0.05)
+        return job
+
+    def test_completion_detected_without_polling(self):
+        job = self.wait_for(self.manager.create_job("search", "ok", noop))
+        self.assertEqual(job.status, JobStatus.COMPLETED)
+        self.assertTrue(any("completed successfully" in line for line in job.logs))
+
+    def test_failure_carries_error(self):
+        job = self.wait_for(self.manager.create_job("search", "fail", fail))
+        self.assertEqual(job.status, JobStatus.FAILED)
+        self.assertEqual(job.error, "boom")
+
+    def test_dead_process_marked_failed_and_slot_released(self):
+        job = self.wait_for(self.manager.create_job("search", "crash", crash))
+        self.assertEqual(job.status, JobStatus.FAILED)
+        self.assertIn("exit code 3", job.error)
+        self.assertEqual(self.manager.scheduler_state()["running"], 0)
+
+    def test_failed_start_leaves_monitor_working(self):
+        with mock.patch.object(multiprocessing.Process, "start", side_effect=OSError("no fork")):
+            job = self.manager.get_job(self.manager.create_job("search", "unstarted", noop))
+        self.assertEqual((job.status, job.error), (JobStatus.FAILED, "no fork"))
+        self.assertIsNone(job.process)
+        self.assertEqual(self.manager._active_jobs(), [])
+        job = self.wait_for(self.manager.create_job("search", "ok", noop))
+        self.assertEqual(job.status, JobStatus.COMPLETED)
+
+if __name__ == '__main__':
+    unittest.main()
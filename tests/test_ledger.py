@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+from src.core.ledger import DownloadLedger, open_ledger, archive_id_for
+
+class TestDownloadLedger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "ledger.db")
+        self.ledger = DownloadLedger(self.path)
+
+    def tearDown(self):
+        self.ledger.close()
+        shutil.rmtree(self.tmp)
+
+    def test_archive_protocol(self):
+        self.assertFalse("youtube abc" in self.ledger)
+        self.ledger.add("youtube abc")
+        self.assertTrue("youtube abc" in self.ledger)
+        self.assertTrue("Youtube abc" in self.ledger)
+        self.assertFalse(None in self.ledger)
+        self.assertEqual(len(self.ledger), 1)
+
+    def test_record_and_query(self):
+        self.ledger.add("youtube abc")
+        self.ledger.record("youtube abc", filepath="/m/A/B/t.m4a", album="B", artist="A")
+        self.ledger.record("youtube def", filepath="/m/A/C/u.m4a", album="C", artist="A")
+        row = self.ledger.get("youtube abc")
+        self.assertEqual(row["filepath"], "/m/A/B/t.m4a")
+        self.assertEqual(len(self.ledger.find(artist="A")), 2)
+        self.assertEqual([r["video_id"] for r in self.ledger.find(artist="A", album="C")], ["def"])
+
+    def test_import_text_archive_skips_corrupt_lines(self):
+        archive = os.path.join(self.tmp, "download_archive.txt")
+        with open(archive, "w") as f:
+            f.write("youtube aaa\n\nyoutube bbb\nyoutube cccyoutube ddd youtube\nyoutube aaa\n")
+        self.assertEqual(self.ledger.import_text_archive(archive), 2)
+        self.assertTrue("youtube bbb" in self.ledger)
+
+    def test_open_ledger_imports_once(self):
+        archive = os.path.join(self.tmp, "download_archive.txt")
+        with open(archive, "w") as f:
+            f.write("youtube aaa\n")
+        ledger = open_ledger(self.path, archive)
+        ledger.remove("youtube aaa")
+        ledger = open_ledger(self.path, archive)
+        self.assertFalse("youtube aaa" in ledger)
+
+    def test_yt_dlp_uses_ledger_as_archive(self):
+        import yt_dlp
+        info = {"id": "xyz", "extractor_key": "Youtube"}
+        with yt_dlp.YoutubeDL({"download_archive": self.ledger, "quiet": True}) as ydl:
+            self.assertFalse(ydl.in_download_archive(info))
+            ydl.record_download_archive(info)
+            self.assertTrue(ydl.in_download_archive(info))
+        self.assertEqual(archive_id_for(info), "youtube xyz")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from mutagen import File as MutagenFile
+
+from src.core import downloader
+from src.core.catalog import LibraryCatalog
+from src.core.library_index import LibraryIndex
+from src.core.library_scan import ScanProgress, walk_audio_files
+from tests.helpers import write_mp3
+
+
+class TestLibraryIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.index = LibraryIndex(os.path.join(self.tmp, "index.db"))
+        self.file = os.path.join(self.tmp, "a.mp3")
+        with open(self.file, 'wb') as f:
+            f.write(b"data")
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmp)
+
+    def test_current_until_file_or_rules_change(self):
+        st = os.stat(self.file)
+        self.assertFalse(self.index.is_current(self.file, st, 1))
+        self.index.record(self.file, st, "hash", 1)
+        self.assertTrue(self.index.is_current(self.file, st, 1))
+        self.assertFalse(self.index.is_current(self.file, st, 2))
+
+        with open(self.file, 'ab') as f:
+            f.write(b"more")
+        self.assertFalse(self.index.is_current(self.file, os.stat(self.file), 1))
+
+    def test_prune_only_under_prefix(self):
+        st = os.stat(self.file)
+        self.index.record_many([("/lib/a", st, None, 1), ("/lib/b", st, None, 1), ("/other/c", st, None, 1)])
+        self.assertEqual(self.index.prune({"/lib/a"}, "/lib/"), 1)
+        self.assertEqual(self.index.paths(), {"/lib/a", "/other/c"})
+
+
+class TestIncrementalScan(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.music = os.path.join(self.tmp, "music")
+        self.index = LibraryIndex(os.path.join(self.tmp, "index.db"))
+        self.catalog = LibraryCatalog(os.path.join(self.tmp, "catalog.db"))
+        write_mp3(os.path.join(self.music, "Artist", "Album", "one.mp3"), artist=["Artist, Artist"], albumartist=["Artist"])
+        write_mp3(os.path.join(self.music, "Artist", "Album", "two.mp3"), artist=["Artist"], albumartist=["Artist"])
+
+    def tearDown(self):
+        self.index.close()
+        self.catalog.close()
+        shutil.rmtree(self.tmp)
+
+    def scan(self, **kwargs):
+        with mock.patch("builtins.print"):
+            return downloader.scan_and_fix_library(base_path=self.music, index=self.index,
+                                                   catalog=self.catalog, **kwargs)
+
+    def test_second_scan_skips_unchanged_files(self):
+        stats = self.scan()
+        self.assertEqual((stats['examined'], stats['rewritten'], stats['skipped']), (2, 1, 0))
+        stats = self.scan()
+        self.assertEqual((stats['examined'], stats['skipped']), (0, 2))
+
+    def test_changed_new_and_removed_files(self):
+        self.scan()
+        write_mp3(os.path.join(self.music, "Artist", "Album", "three.mp3"), artist=["Artist"])
+        os.remove(os.path.join(self.music, "Artist", "Album", "two.mp3"))
+        stats = self.scan()
+        self.assertEqual((stats['examined'], stats['rewritten'], stats['skipped'], stats['removed']), (1, 1, 1, 1))
+
+    def test_parallel_scan_matches_inline(self):
+        write_mp3(os.path.join(self.music, "Other", "Album", "three.mp3"), artist=["Other, Other"])
+        stats = self.scan(workers=2, io_depth=1)
+        self.assertEqual((stats['examined'], stats['rewritten'], stats['errors']), (3, 2, 0))
+        self.assertEqual(MutagenFile(os.path.join(self.music, "Other", "Album", "three.mp3"), easy=True)['artist'], ["Other"])
+        self.assertEqual(self.scan(workers=1)['skipped'], 3)
+
+    def test_walk_skips_hidden_and_root_files(self):
+        os.makedirs(os.path.join(self.music, ".ytm"))
+        write_mp3(os.path.join(self.music, ".ytm", "x.mp3"))
+        write_mp3(os.path.join(self.music, "loose.mp3"))
+        found = [(os.path.basename(path), artist) for path, artist, _ in walk_audio_files(self.music)]
+        self.assertEqual(found, [("one.mp3", "Artist"), ("two.mp3", "Artist")])
+
+    def test_dry_run_writes_nothing(self):
+        stats = self.scan(dry_run=True, workers=1)
+        self.assertEqual((stats['examined'], stats['rewritten']), (2, 1))
+        self.assertGreater(stats['bytes_written'], 0)
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(MutagenFile(os.path.join(self.music, "Artist", "Album", "one.mp3"), easy=True)['artist'], ["Artist, Artist"])
+
+    def test_rule_change_and_full_scan(self):
+        self.scan()
+        self.assertEqual(self.scan(full=True)['examined'], 2)
+        with mock.patch.object(downloader, "FIX_RULES_VERSION", downloader.FIX_RULES_VERSION + 1):
+            self.assertEqual(self.scan()['examined'], 2)
+
+
+class TestScanProgress(unittest.TestCase):
+    def test_eta_only_after_walk(self):
+        progress = ScanProgress()
+        progress.queued, progress.examined = 10, 5
+        progress.started_at -= 10
+        self.assertIsNone(progress.to_dict()["eta_seconds"])
+        progress.walk_complete = True
+        data = progress.to_dict()
+        self.assertEqual(data["pending"], 5)
+        self.assertAlmostEqual(data["eta_seconds"], 10, delta=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
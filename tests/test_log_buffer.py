@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from src.core.log_buffer import LogBuffer, prune_spill_files
+
+class TestLogBuffer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.spill = os.path.join(self.tmp, "logs", "job.log.gz")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_memory_is_capped_by_lines(self):
+        buf = LogBuffer(self.spill, max_lines=100, max_bytes=10**6)
+        for i in range(1000):
+            buf.append(f"line {i}")
+        self.assertEqual(len(buf), 1000)
+        self.assertLessEqual(len(buf._lines), 100)
+        self.assertTrue(os.path.exists(self.spill))
+
+    def test_memory_is_capped_by_bytes(self):
+        buf = LogBuffer(self.spill, max_lines=10**6, max_bytes=1000)
+        for i in range(100):
+            buf.append("x" * 100)
+        self.assertLessEqual(buf._bytes, 1000)
+
+    def test_byte_cap_counts_encoded_size(self):
+        buf = LogBuffer(self.spill, max_lines=10**6, max_bytes=1000)
+        for i in range(20):
+            buf.append("ğ" * 40)
+        # 80 bytes a line: only 12 fit, though 25 would by character count
+        self.assertLessEqual(len(buf) - buf.first_in_memory, 12)
+        self.assertEqual(buf.read(0)[0][0], "ğ" * 40)
+
+    def test_read_across_spill_and_memory(self):
+        buf = LogBuffer(self.spill, max_lines=50, max_bytes=10**6)
+        for i in range(500):
+            buf.append(f"line {i}")
+        lines, next_offset = buf.read(10, 5)
+        self.assertEqual(lines, [f"line {i}" for i in range(10, 15)])
+        self.assertEqual(next_offset, 15)
+        lines, next_offset = buf.read(440, 100)
+        self.assertEqual(lines, [f"line {i}" for i in range(440, 500)])
+        self.assertEqual(next_offset, 500)
+        self.assertEqual(list(buf), [f"line {i}" for i in range(500)])
+
+    def test_negative_offset_and_past_end(self):
+        buf = LogBuffer(None, max_lines=10, max_bytes=10**6)
+        for i in range(30):
+            buf.append(f"line {i}")
+        self.assertEqual(buf.tail(3), ["line 27", "line 28", "line 29"])
+        self.assertEqual(buf.read(100), ([], 30))
+        # Without a spill file evicted lines are gone; reading resumes at the oldest kept line
+        lines, _ = buf.read(0, 2)
+        self.assertEqual(lines[0], f"line {buf.first_in_memory}")
+
+    def test_multiline_messages_split(self):
+        buf = LogBuffer(None)
+        buf.append("a\nb\n")
+        self.assertEqual(list(buf), ["a", "b"])
+
+    def test_prune_spill_files(self):
+        logs = os.path.join(self.tmp, "logs")
+        os.makedirs(logs)
+        now = time.time()
+        for i, age_days in enumerate((0, 1, 2, 30, 30)):
+            path = os.path.join(logs, f"{i}.log.gz")
+            with open(path, "wb") as f:
+                f.write(b"x" * 100)
+            os.utime(path, (now - age_days * 86400, now - age_days * 86400))
+        removed = prune_spill_files(logs, max_age_days=7, max_total_bytes=200, keep=[os.path.join(logs, "4.log.gz")])
+        # Expired files go, then the oldest until the rest fit; kept files stay regardless
+        self.assertEqual(removed, 3)
+        self.assertEqual(sorted(os.listdir(logs)), ["0.log.gz", "4.log.gz"])
+        self.assertEqual(prune_spill_files(os.path.join(self.tmp, "missing")), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import queue
+import unittest
+from src.core.log_transport import LogTransport, MSG_LOGS, MSG_METRICS, MSG_STATUS, STATUS_FAILED
+
+class TestLogTransport(unittest.TestCase):
+    def setUp(self):
+        self.queue = queue.Queue()
+        self.transport = LogTransport(self.queue, max_lines=10, max_delay=60)
+
+    def messages(self):
+        items = []
+        while not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+    def test_lines_are_batched(self):
+        for i in range(25):
+            print(f"line {i}", file=self.transport.stream())
+        self.transport.flush()
+        msgs = self.messages()
+        self.assertEqual(len(msgs), 3)
+        self.assertEqual(sum(len(m["lines"]) for m in msgs), 25)
+
+    def test_byte_threshold_counts_encoded_size(self):
+        transport = LogTransport(self.queue, max_lines=1000, max_bytes=100, max_delay=60)
+        # 60 bytes each in UTF-8, 30 characters
+        transport.write("Ş" * 30 + "\n")
+        self.assertEqual(self.messages(), [])
+        transport.write("ğ" * 30 + "\n")
+        self.assertEqual(len(self.messages()), 1)
+
+    def test_carriage_return_progress_collapses(self):
+        stream = self.transport.stream()
+        stream.write("[download] Destination: a.webm\n")
+        for pct in range(0, 100):
+            stream.write(f"\r[download] {pct:5.1f}% of 3.00MiB")
+        self.transport.flush()
+        msg = self.messages()[0]
+        self.assertEqual(msg["lines"], ["[download] Destination: a.webm"])
+        self.assertEqual(msg["progress"], "[download]  99.0% of 3.00MiB")
+        stream.write("\r[download] 100% of 3.00MiB in 00:01\n")
+        self.transport.flush()
+        msg = self.messages()[0]
+        self.assertEqual(msg["lines"], ["[download] 100% of 3.00MiB in 00:01"])
+        self.assertIsNone(msg["progress"])
+
+    def test_status_is_structured_and_flushes_first(self):
+        stream = self.transport.stream()
+        stream.write("partial without newline")
+        self.transport.send_status(STATUS_FAILED, "boom")
+        logs, status = self.messages()
+        self.assertEqual(logs["type"], MSG_LOGS)
+        self.assertEqual(logs["lines"], ["partial without newline"])
+        self.assertEqual(status, {"type": MSG_STATUS, "status": STATUS_FAILED, "error": "boom"})
+
+    def test_metrics_sent_after_pending_logs(self):
+        self.transport.stream().write("resolving\n")
+        self.transport.send_metrics("scraper", {"steps": {"navigate": 0.5}})
+        logs, metrics = self.messages()
+        self.assertEqual(logs["lines"], ["resolving"])
+        self.assertEqual(metrics, {"type": MSG_METRICS, "section": "scraper", "data": {"steps": {"navigate": 0.5}}})
+
+if __name__ == '__main__':
+    unittest.main()
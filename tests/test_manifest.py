@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+from src.core.manifest import extract_manifest, filter_manifest, get_manifest
+from src.core.resolution_cache import ResolutionCache
+
+ALBUM_URL = "https://music.youtube.com/browse/MPREb_album"
+PLAYLIST_URL = "https://music.youtube.com/playlist?list=OLAK5uy_album"
+
+def track(video_id):
+    return {"_type": "url", "ie_key": "Youtube", "id": video_id, "url": f"https://music.youtube.com/watch?v={video_id}", "title": video_id}
+
+class FakeYDL:
+    """Mimics YoutubeDL.extract_info(process=False) for an album browse page."""
+
+    def __init__(self, tracks=3):
+        self.tracks = tracks
+        self.calls = []
+
+    def extract_info(self, url, download=True, ie_key=None, process=True):
+        self.calls.append(url)
+        if url == ALBUM_URL:
+            return {"_type": "url", "url": PLAYLIST_URL, "ie_key": "YoutubeTab"}
+        return {
+            "_type": "playlist", "id": "OLAK5uy_album", "title": "Album",
+            "extractor": "youtube:tab", "extractor_key": "YoutubeTab", "webpage_url": url,
+            "entries": (track(f"v{i}") for i in range(self.tracks)),
+        }
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = ResolutionCache(os.path.join(self.tmp, "cache.db"))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp)
+
+    def test_follows_redirect_and_materializes_entries(self):
+        ydl = FakeYDL()
+        manifest = extract_manifest(ydl, ALBUM_URL)
+        self.assertEqual(ydl.calls, [ALBUM_URL, PLAYLIST_URL])
+        self.assertEqual(manifest["track_count"], 3)
+        self.assertEqual([e["id"] for e in manifest["entries"]], ["v0", "v1", "v2"])
+
+    def test_manifest_is_cached(self):
+        ydl = FakeYDL()
+        first, cached = get_manifest(ydl, ALBUM_URL, self.cache)
+        self.assertFalse(cached)
+        second, cached = get_manifest(ydl, ALBUM_URL, self.cache)
+        self.assertTrue(cached)
+        self.assertEqual(first, second)
+        self.assertEqual(len(ydl.calls), 2)
+
+    def test_max_album_length(self):
+        manifest = extract_manifest(FakeYDL(tracks=30), ALBUM_URL)
+        filtered, reason = filter_manifest(manifest, max_album_length=20)
+        self.assertIsNone(filtered)
+        self.assertIn("30 tracks", reason)
+
+    def test_song_limit_skips_archived_tracks(self):
+        manifest = extract_manifest(FakeYDL(tracks=5), ALBUM_URL)
+        filtered, _ = filter_manifest(manifest, song_limit=2, archive={"youtube v0"})
+        self.assertEqual([e["id"] for e in filtered["entries"]], ["v1", "v2"])
+        # The original manifest is untouched
+        self.assertEqual(len(manifest["entries"]), 5)
+
+    def test_everything_archived(self):
+        manifest = extract_manifest(FakeYDL(tracks=1), ALBUM_URL)
+        filtered, _ = filter_manifest(manifest, archive={"youtube v0"})
+        self.assertIsNone(filtered)
+
+if __name__ == '__main__':
+    unittest.main()
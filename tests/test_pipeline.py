@@ -0,0 +1,73 @@
+import threading
+import time
+import unittest
+from src.core.pipeline import Pipeline, Stage
+
+class TestPipeline(unittest.TestCase):
+    def test_items_flow_through_stages_in_order(self):
+        out = []
+        lock = threading.Lock()
+
+        def collect(item):
+            with lock:
+                out.append(item)
+            return item
+
+        pipeline = Pipeline([
+            Stage("double", lambda x: x * 2, workers=1),
+            Stage("collect", collect, workers=1),
+        ]).start()
+        for i in range(20):
+            pipeline.put(i)
+        pipeline.close()
+        self.assertEqual(out, [i * 2 for i in range(20)])
+        stats = pipeline.stats()
+        self.assertEqual(stats["double"]["processed"], 20)
+        self.assertEqual(stats["collect"]["processed"], 20)
+        self.assertEqual(stats["collect"]["queue_depth"], 0)
+
+    def test_full_queue_blocks_the_producer(self):
+        release = threading.Event()
+        slow = Stage("slow", lambda x: release.wait(), workers=1, queue_size=2)
+        pipeline = Pipeline([slow]).start()
+
+        done = threading.Event()
+        def produce():
+            for i in range(5):
+                pipeline.put(i)
+            done.set()
+
+        threading.Thread(target=produce, daemon=True).start()
+        # One item in the worker, two in the queue, the producer waits on the rest
+        self.assertFalse(done.wait(0.2))
+        self.assertLessEqual(slow.queue.qsize(), 2)
+        release.set()
+        self.assertTrue(done.wait(2))
+        pipeline.close()
+        self.assertGreater(slow.stats.blocked, 0.1)
+        self.assertEqual(slow.stats.peak_depth, 2)
+
+    def test_failures_and_drops_are_counted(self):
+        def flaky(x):
+            if x == 1:
+                raise ValueError("boom")
+            return None if x == 2 else x
+
+        tail = Stage("tail", lambda x: x)
+        pipeline = Pipeline([Stage("flaky", flaky), tail]).start()
+        for i in range(4):
+            pipeline.put(i)
+        pipeline.close()
+        stats = pipeline.stats()
+        self.assertEqual(stats["flaky"]["failed"], 2)
+        self.assertEqual(stats["tail"]["processed"], 2)
+
+    def test_utilization(self):
+        pipeline = Pipeline([Stage("sleep", lambda x: time.sleep(0.05) or x, workers=1)]).start()
+        for i in range(4):
+            pipeline.put(i)
+        pipeline.close()
+        self.assertGreater(pipeline.stats()["sleep"]["utilization"], 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
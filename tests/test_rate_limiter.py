@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from src.core.rate_limiter import RateLimiter, is_throttle_error
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def take_tokens(path, count):
+    limiter = RateLimiter(path, rate=1, burst=10)
+    for _ in range(count):
+        limiter.acquire()
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "bucket.bin")
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def limiter(self, **kwargs):
+        options = dict(rate=2, burst=4, min_rate=0.1, recovery_seconds=100)
+        options.update(kwargs)
+        return RateLimiter(self.path, clock=self.clock, sleep=self.clock.sleep, **options)
+
+    def test_burst_then_steady_rate(self):
+        limiter = self.limiter()
+        for _ in range(4):
+            self.assertEqual(limiter.acquire(), 0.0)
+        start = self.clock.now
+        for _ in range(4):
+            limiter.acquire()
+        # 4 more tokens at 2/s
+        self.assertAlmostEqual(self.clock.now - start, 2.0, places=3)
+
+    def test_instances_share_the_bucket(self):
+        first, second = self.limiter(), self.limiter()
+        for _ in range(4):
+            first.acquire()
+        self.assertLess(second.state()["tokens"], 1)
+
+    def test_bucket_is_shared_across_processes(self):
+        child = multiprocessing.Process(target=take_tokens, args=(self.path, 6))
+        child.start()
+        child.join(10)
+        self.assertEqual(child.exitcode, 0)
+        state = RateLimiter(self.path, rate=1, burst=10).state()
+        self.assertLess(state["tokens"], 5)
+
+    def test_penalty_halves_rate_and_recovers(self):
+        limiter = self.limiter()
+        self.assertTrue(limiter.penalize("HTTP Error 429"))
+        self.assertEqual(limiter.state()["rate"], 1.0)
+        self.assertEqual(limiter.state()["tokens"], 0.0)
+        # Reports from other workers within the window don't compound
+        self.assertFalse(limiter.penalize("HTTP Error 429"))
+
+        for _ in range(10):
+            self.clock.now += 10
+            limiter.penalize("HTTP Error 429")
+        self.assertGreaterEqual(limiter.state()["rate"], 0.1)
+
+        self.clock.now += 1000
+        self.assertEqual(limiter.state()["rate"], 2.0)
+
+    def test_timeout(self):
+        limiter = self.limiter(rate=0.1, burst=1)
+        limiter.acquire()
+        with self.assertRaises(TimeoutError):
+            limiter.acquire(timeout=1)
+
+    def test_disabled(self):
+        limiter = RateLimiter(self.path, rate=0)
+        self.assertEqual(limiter.acquire(), 0.0)
+        self.assertFalse(limiter.penalize())
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_throttle_detection(self):
+        self.assertTrue(is_throttle_error(429))
+        self.assertTrue(is_throttle_error("ERROR: [youtube] abc: Sign in to confirm you're not a bot"))
+        self.assertTrue(is_throttle_error("HTTP Error 403: Forbidden"))
+        self.assertFalse(is_throttle_error("Video unavailable"))
+        self.assertFalse(is_throttle_error(404))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from src.core.resolution_cache import ResolutionCache, artist_key, search_key
+from src.core.resolver import CachingResolver, Resolver
+
+class CountingResolver(Resolver):
+    name = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_artist_albums(self, artist_url, artist_name=None):
+        self.calls += 1
+        return [] if artist_name == "Nobody" else ["https://music.youtube.com/browse/MPREb_a"]
+
+    def get_search_results(self, query):
+        self.calls += 1
+        return "https://music.youtube.com/watch?v=x", "song"
+
+class TestResolutionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = ResolutionCache(os.path.join(self.tmp, "cache.db"), max_bytes=200)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp)
+
+    def test_keys_are_normalized(self):
+        self.assertEqual(artist_key(artist_name="Oğuz  Aksaç"), artist_key(artist_name="oguz aksac"))
+        self.assertEqual(artist_key("https://music.youtube.com/channel/UCabC/ "), "url:https://music.youtube.com/channel/UCabC")
+        self.assertNotEqual(artist_key(".../channel/UCabc"), artist_key(".../channel/UCABC"))
+        self.assertEqual(search_key(" Şebnem Ferah "), "query:sebnem ferah")
+
+    def test_ttl_expiry(self):
+        self.cache.set("artist", "k", ["a"], ttl=0.05)
+        self.assertEqual(self.cache.get("artist", "k"), ["a"])
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get("artist", "k"))
+
+    def test_lru_eviction_by_size(self):
+        for i in range(4):
+            self.cache.set("artist", f"k{i}", ["x" * 60])
+            time.sleep(0.01)
+            # Touch k0 so it stays most recently used
+            self.cache.get("artist", "k0")
+        self.assertIsNotNone(self.cache.get("artist", "k0"))
+        self.assertIsNone(self.cache.get("artist", "k1"))
+        self.assertLessEqual(self.cache.stats()["bytes"], 200)
+
+    def test_invalidate(self):
+        self.cache.set("artist", "a", [1])
+        self.cache.set("search", "b", [2])
+        self.assertEqual(self.cache.invalidate("artist", "a"), 1)
+        self.assertEqual(self.cache.invalidate(), 1)
+
+    def test_caching_resolver_counts_hits_and_skips_empty(self):
+        inner = CountingResolver()
+        resolver = CachingResolver(inner, self.cache)
+        resolver.get_artist_albums(None, "Oğuz Aksaç")
+        resolver.get_artist_albums(None, "Oguz Aksac")
+        resolver.get_artist_albums(None, "Nobody")
+        resolver.get_artist_albums(None, "Nobody")
+        self.assertEqual(resolver.get_search_results("q"), resolver.get_search_results("Q"))
+        self.assertEqual(inner.calls, 4)
+        self.assertEqual((resolver.hits, resolver.misses), (2, 4))
+
+if __name__ == '__main__':
+    unittest.main()
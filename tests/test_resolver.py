@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.core.rate_limiter import RateLimiter
+from src.core.resolver import InnertubeResolver, FallbackResolver, Resolver, ResolverError
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "innertube")
+
+# (endpoint, query or browseId, params) -> recorded response
+ROUTES = {
+    ("search", "Fixture Artist", None): "search_artist.json",
+    ("search", "fixture album", None): "search_query.json",
+    ("browse", "UCfixtureArtist00000000", None): "browse_artist.json",
+    ("browse", "UCfixtureArtist00000000", "ggMIegYIARoCAQI%3D"): "browse_albums_more.json",
+}
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Stand-in for music.youtube.com that replays recorded innertube responses."""
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        endpoint = self.path.split("?")[0].rsplit("/", 1)[-1]
+        key = (endpoint, body.get("query") or body.get("browseId"), body.get("params"))
+        ReplayHandler.requests.append(key)
+        fixture = ROUTES.get(key)
+        if fixture is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        with open(os.path.join(FIXTURES, fixture), "rb") as f:
+            data = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+class StaticResolver(Resolver):
+    name = "static"
+
+    def __init__(self, albums):
+        self.albums = albums
+
+    def get_artist_albums(self, artist_url, artist_name=None):
+        return self.albums
+
+class TestInnertubeResolver(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ReplayHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ReplayHandler.requests = []
+        self.resolver = InnertubeResolver(base_url=self.base_url, limiter=RateLimiter(rate=0))
+
+    def test_artist_name_to_albums(self):
+        albums = self.resolver.get_artist_albums(None, "Fixture Artist")
+        self.assertEqual(albums, [f"https://music.youtube.com/browse/MPREb_fixture00{i}" for i in range(1, 6)] + [
+            "https://music.youtube.com/browse/MPREb_single0001",
+            "https://music.youtube.com/browse/MPREb_single0002",
+        ])
+        self.assertEqual(self.resolver.requests, 3)
+
+    def test_channel_url_to_albums(self):
+        albums = self.resolver.get_artist_albums("https://music.youtube.com/channel/UCfixtureArtist00000000")
+        self.assertEqual(len(albums), 7)
+        self.assertEqual(ReplayHandler.requests[0][0], "browse")
+
+    def test_search_prefers_album(self):
+        self.assertEqual(
+            self.resolver.get_search_results("fixture album"),
+            ("https://music.youtube.com/browse/MPREb_fixture001", "album"),
+        )
+
+    def test_unknown_artist_raises(self):
+        with self.assertRaises(ResolverError):
+            self.resolver.get_artist_albums(None, "Nobody")
+
+    def test_fallback_when_http_fails(self):
+        chain = FallbackResolver([self.resolver, StaticResolver(["https://music.youtube.com/browse/MPREb_x"])])
+        self.assertEqual(chain.get_artist_albums(None, "Nobody"), ["https://music.youtube.com/browse/MPREb_x"])
+        chain = FallbackResolver([self.resolver, StaticResolver(["unused"])])
+        self.assertEqual(len(chain.get_artist_albums(None, "Fixture Artist")), 7)
+
+if __name__ == '__main__':
+    unittest.main()
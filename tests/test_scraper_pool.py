@@ -0,0 +1,78 @@
+import threading
+import unittest
+from src.core.scraper_pool import ScraperPool
+
+class FakeScraper:
+    instances = 0
+
+    def __init__(self):
+        FakeScraper.instances += 1
+        self.healthy = True
+        self.closed = False
+        self.warmed = False
+
+    def warm_up(self):
+        self.warmed = True
+
+    def is_healthy(self):
+        return self.healthy
+
+    def browser_pid(self):
+        return None
+
+    def close(self):
+        self.closed = True
+
+class TestScraperPool(unittest.TestCase):
+    def setUp(self):
+        FakeScraper.instances = 0
+        self.pool = ScraperPool(FakeScraper, size=2, max_uses=3, max_rss_mb=0)
+
+    def test_sessions_are_warmed_and_reused(self):
+        with self.pool.lease() as first:
+            self.assertTrue(first.warmed)
+        with self.pool.lease() as second:
+            self.assertIs(first, second)
+        self.assertEqual(FakeScraper.instances, 1)
+
+    def test_recycled_after_max_uses(self):
+        for _ in range(3):
+            with self.pool.lease() as scraper:
+                pass
+        self.assertTrue(scraper.closed)
+        with self.pool.lease() as fresh:
+            self.assertIsNot(fresh, scraper)
+        self.assertEqual(self.pool.stats()["recycled"], 1)
+
+    def test_unhealthy_session_replaced_on_lease(self):
+        with self.pool.lease() as scraper:
+            pass
+        scraper.healthy = False
+        with self.pool.lease() as replacement:
+            self.assertIsNot(replacement, scraper)
+        self.assertTrue(scraper.closed)
+
+    def test_failed_scrape_discards_session(self):
+        with self.assertRaises(RuntimeError):
+            with self.pool.lease() as scraper:
+                raise RuntimeError("page crashed")
+        self.assertTrue(scraper.closed)
+        self.assertEqual(self.pool.stats()["total"], 0)
+
+    def test_size_limit_blocks_until_release(self):
+        a = self.pool.acquire()
+        b = self.pool.acquire()
+        with self.assertRaises(TimeoutError):
+            self.pool.acquire(timeout=0.05)
+        threading.Timer(0.05, self.pool.release, args=(a,)).start()
+        c = self.pool.acquire(timeout=2)
+        self.assertIs(c, a)
+        self.pool.release(b)
+        self.pool.release(c)
+
+    def test_prewarm(self):
+        self.pool.prewarm()
+        self.assertEqual(self.pool.stats()["idle"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
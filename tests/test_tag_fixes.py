@@ -0,0 +1,33 @@
+import unittest
+
+from src.core.downloader import plan_tag_fixes
+from src.core.normalize import normalize_name, normalize_string
+
+
+class TestPlanTagFixes(unittest.TestCase):
+    def test_clean_tags_need_no_write(self):
+        tags = {"artist": ["Oğuz Aksaç"], "album": ["Album"], "albumartist": ["Oğuz Aksaç"]}
+        self.assertEqual(plan_tag_fixes(tags, "Oğuz Aksaç"), {})
+
+    def test_artist_dedup_prefers_main_artist_spelling(self):
+        tags = {"artist": ["Oguz Aksac, Sezen Aksu", "Oğuz Aksaç"], "albumartist": ["Oğuz Aksaç"]}
+        self.assertEqual(plan_tag_fixes(tags, "Oğuz Aksaç"), {"artist": ["Oğuz Aksaç", "Sezen Aksu"]})
+
+    def test_album_trim_and_album_artist(self):
+        tags = {"artist": ["Tarkan"], "album": [" Karma "], "albumartist": ["Various"]}
+        self.assertEqual(plan_tag_fixes(tags, "Tarkan"), {"album": ["Karma"], "albumartist": ["Tarkan"]})
+
+    def test_without_main_artist(self):
+        tags = {"artist": ["A, A"]}
+        self.assertEqual(plan_tag_fixes(tags, None), {"artist": ["A"]})
+
+
+class TestNormalize(unittest.TestCase):
+    def test_ascii_fast_path_matches(self):
+        self.assertEqual(normalize_string("  Sezen   AKSU "), "sezen aksu")
+        self.assertEqual(normalize_string("Oğuz Aksaç"), "oguz aksac")
+        self.assertEqual(normalize_name("Şebnem Ferah"), normalize_string("Sebnem Ferah"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from mutagen import File as MutagenFile
+
+from src.core.downloader import fix_metadata
+from src.core.tag_writer import TAG_PADDING, write_tags
+from tests.helpers import write_mp3
+
+
+class TestTagWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "Artist", "one.mp3")
+        write_mp3(self.path, artist=["Artist"])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_reserved_padding_makes_later_edits_in_place(self):
+        audio = MutagenFile(self.path, easy=True)
+        first = write_tags(audio, reserve=True)
+        self.assertFalse(first["in_place"])
+        size = os.path.getsize(self.path)
+
+        audio = MutagenFile(self.path, easy=True)
+        audio["album"] = ["A much longer album title than before"]
+        second = write_tags(audio)
+        self.assertTrue(second["in_place"])
+        self.assertEqual(os.path.getsize(self.path), size)
+        # Only the tag block is written, not the audio behind it
+        self.assertLess(second["bytes_written"], TAG_PADDING * 2)
+
+    def test_dry_run_leaves_file_untouched(self):
+        with open(self.path, "rb") as f:
+            before = f.read()
+        with mock.patch("builtins.print"):
+            result = fix_metadata(self.path, "Artist", dry_run=True)
+        self.assertEqual(result["changes"], {"albumartist": ["Artist"]})
+        self.assertGreater(result["bytes_written"], 0)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), before)
+
+    def test_dry_run_estimates(self):
+        audio = MutagenFile(self.path, easy=True)
+        estimate = write_tags(audio, reserve=True, dry_run=True)
+        self.assertFalse(estimate["in_place"])
+        write_tags(audio, reserve=True)
+        # A full rewrite is estimated as the whole rewritten file
+        self.assertEqual(estimate["bytes_written"], os.path.getsize(self.path))
+
+        audio["album"] = ["Album"]
+        estimate = write_tags(audio, dry_run=True)
+        self.assertEqual(estimate, write_tags(audio))
+        self.assertTrue(estimate["in_place"])
+
+
+if __name__ == "__main__":
+    unittest.main()